@@ -0,0 +1,171 @@
+"""
+Audio Store - short-lived TTS clips served as binary instead of base64 in JSON
+Responses carry an audio id straight away; synthesis runs in the background
+and the audio endpoint streams the clip (with Range support) once it's ready.
+Clips come in network profiles (2g/3g/wifi) trading quality for size. With a
+shared cache backend, finished clips are published there so any worker can
+serve an id another worker handed out
+"""
+
+import asyncio
+import hashlib
+import re
+import secrets
+import time
+from typing import Callable, Optional, Tuple
+
+from cache_backend import CacheBackend
+from metrics import record_cache
+from structured_log import get_logger
+
+log = get_logger("audio_store")
+
+AUDIO_TTL = 600  # seconds a clip stays downloadable
+MAX_CLIPS = 1000
+CHUNK_SIZE = 32 * 1024
+SHARED_WAIT = 30  # seconds to wait for a clip another worker is still synthesizing
+SHARED_POLL_INTERVAL = 0.1
+RANGE_PATTERN = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+# Network profile -> Polly / Azure Speech output; on 2G the clip size dominates latency
+AUDIO_PROFILES = {
+    "2g": {"polly_format": "ogg_vorbis", "polly_sample_rate": "8000", "azure_format": "Ogg16Khz16BitMonoOpus", "media_type": "audio/ogg"},
+    "3g": {"polly_format": "mp3", "polly_sample_rate": "16000", "azure_format": "Audio16Khz32KBitRateMonoMp3", "media_type": "audio/mpeg"},
+    "wifi": {"polly_format": "mp3", "polly_sample_rate": "22050", "azure_format": "Audio24Khz48KBitRateMonoMp3", "media_type": "audio/mpeg"},
+}
+DEFAULT_AUDIO_PROFILE = "3g"
+# Effective connection types (ECT header / navigator.connection.effectiveType)
+ECT_PROFILES = {"slow-2g": "2g", "2g": "2g", "3g": "3g", "4g": "wifi"}
+
+def negotiate_audio_profile(requested: Optional[str], headers=None) -> str:
+    """Explicit profile (or ECT value) if valid, else Save-Data / ECT client hints, else the default"""
+    if requested:
+        requested = requested.strip().lower()
+        requested = ECT_PROFILES.get(requested, requested)
+        if requested in AUDIO_PROFILES:
+            return requested
+    headers = headers or {}
+    if headers.get("save-data", "").strip().lower() == "on":
+        return "2g"
+    return ECT_PROFILES.get(headers.get("ect", "").strip().lower(), DEFAULT_AUDIO_PROFILE)
+
+def parse_range(header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """(start, end) inclusive for a single-range `Range` header, None to send everything
+
+    Raises ValueError for a range that can't be satisfied (-> 416).
+    """
+    if not header:
+        return None
+    match = RANGE_PATTERN.match(header.strip())
+    if not match:
+        return None  # multi-range or unknown unit: ignore and send the whole clip
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:
+        length = int(last)  # suffix range: the last N bytes
+        if length == 0:
+            raise ValueError("empty suffix range")
+        return max(0, size - length), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        raise ValueError("range not satisfiable")
+    return start, end
+
+def iter_chunks(data: bytes, start: int, end: int):
+    """Yield data[start:end + 1] in CHUNK_SIZE pieces"""
+    view = memoryview(data)
+    for offset in range(start, end + 1, CHUNK_SIZE):
+        yield bytes(view[offset:min(offset + CHUNK_SIZE, end + 1)])
+
+def _log_failure(task: asyncio.Task):
+    if not task.cancelled() and task.exception():
+        log.error("audio_synthesis_error", error=task.exception())
+
+class AudioStore:
+    def __init__(self, synthesize: Callable[[str, str, str], Optional[bytes]], ttl: int = AUDIO_TTL, max_clips: int = MAX_CLIPS,
+                 cache: Optional[CacheBackend] = None):
+        """synthesize(text, language, profile) -> audio bytes or None; blocking, run in a worker thread"""
+        self.synthesize = synthesize
+        self.ttl = ttl
+        self.max_clips = max_clips
+        self.shared = cache if cache is not None and cache.shared else None  # only worth it across workers
+        self._clips = {}  # audio id -> (expires_at, profile, synthesis task)
+        self._by_content = {}  # hash of (profile, language, text) -> audio id, so repeated answers reuse a clip
+
+    def submit(self, text: str, language: str, profile: str = DEFAULT_AUDIO_PROFILE) -> Optional[str]:
+        """Start synthesizing `text` and return the id it will be served under"""
+        if not text:
+            return None
+        self._prune()
+        content_key = hashlib.sha256(f"{profile}:{language}:{text}".encode("utf-8")).hexdigest()
+        audio_id = self._by_content.get(content_key)
+        if audio_id in self._clips:
+            record_cache("tts", True)
+            _, _, task = self._clips[audio_id]
+            self._clips[audio_id] = (time.time() + self.ttl, profile, task)  # keep it alive for the new response
+            if self.shared is not None:
+                self.shared.touch(f"tts_clip:{audio_id}", self.ttl)
+            return audio_id
+        if self.shared is not None:
+            audio_id = self.shared.get(f"tts_content:{content_key}")
+            if audio_id and self.shared.touch(f"tts_clip:{audio_id}", self.ttl):
+                record_cache("tts", True)
+                self.shared.touch(f"tts_content:{content_key}", self.ttl)
+                return audio_id
+        record_cache("tts", False)
+
+        audio_id = secrets.token_urlsafe(16)  # unguessable: <audio src> can't send the auth header
+        task = asyncio.create_task(asyncio.to_thread(self.synthesize, text, language, profile))
+        task.add_done_callback(_log_failure)
+        self._clips[audio_id] = (time.time() + self.ttl, profile, task)
+        self._by_content[content_key] = audio_id
+        if self.shared is not None:
+            self.shared.set(f"tts_clip:{audio_id}", (profile, None), self.ttl)  # pending: other workers wait for it
+            self.shared.set(f"tts_content:{content_key}", audio_id, self.ttl)
+            task.add_done_callback(lambda t: self._publish(audio_id, profile, t))
+        return audio_id
+
+    def _publish(self, audio_id: str, profile: str, task: asyncio.Task):
+        audio = None if task.cancelled() or task.exception() else task.result()
+        if audio:
+            self.shared.set(f"tts_clip:{audio_id}", (profile, audio), self.ttl)
+        else:
+            self.shared.delete(f"tts_clip:{audio_id}")
+
+    async def get(self, audio_id: str) -> Optional[Tuple[bytes, str]]:
+        """(audio bytes, media type), waiting for synthesis if needed; None if unknown, expired or failed"""
+        clip = self._clips.get(audio_id)
+        if clip is None and self.shared is not None:
+            return await self._get_shared(audio_id)
+        if clip is None or clip[0] < time.time():
+            return None
+        try:
+            audio = await asyncio.shield(clip[2])
+        except Exception:
+            return None  # already logged by _log_failure
+        return (audio, AUDIO_PROFILES[clip[1]]["media_type"]) if audio else None
+
+    async def _get_shared(self, audio_id: str) -> Optional[Tuple[bytes, str]]:
+        """A clip submitted on another worker, polling while it's still being synthesized"""
+        deadline = time.monotonic() + SHARED_WAIT
+        while True:
+            entry = self.shared.get(f"tts_clip:{audio_id}")
+            if entry is None:
+                return None
+            profile, audio = entry
+            if audio is not None:
+                return audio, AUDIO_PROFILES[profile]["media_type"]
+            if time.monotonic() >= deadline:
+                return None
+            await asyncio.sleep(SHARED_POLL_INTERVAL)
+
+    def _prune(self):
+        now = time.time()
+        for audio_id in [a for a, (expires_at, _, _) in self._clips.items() if expires_at < now]:
+            del self._clips[audio_id]
+        while len(self._clips) >= self.max_clips:
+            del self._clips[next(iter(self._clips))]  # oldest first (insertion order)
+        for content_key in [k for k, audio_id in self._by_content.items() if audio_id not in self._clips]:
+            del self._by_content[content_key]
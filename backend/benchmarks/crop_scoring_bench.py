@@ -0,0 +1,100 @@
+"""
+Crop scoring benchmark - vectorized engine vs. per-crop calculate_compatibility
+
+Times both on a large random catalogue. The generators below (missing bounds,
+bad values, empty conditions) also drive the parity test in
+tests/test_crop_scoring.py, which checks that the two agree.
+
+    python benchmarks/crop_scoring_bench.py --crops 10000
+"""
+
+import argparse
+import contextlib
+import math
+import os
+import random
+import sys
+import time
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import structured_log
+from crop_scoring import SCORING_FIELDS, CropScoringEngine, calculate_compatibility
+
+PARAM_RANGES = {
+    "temperature": (-5, 50), "humidity": (0, 100), "rainfall": (0, 400),
+    "nitrogen": (0, 150), "phosphorus": (0, 150), "potassium": (0, 200), "ph": (3.0, 10.0),
+}
+
+@contextlib.contextmanager
+def reference_logging_off():
+    """The reference logs compatibility_calculation_error for every bad bound; thousands of lines here"""
+    level, structured_log.LOG_LEVEL = structured_log.LOG_LEVEL, structured_log.ERROR + 1
+    try:
+        yield
+    finally:
+        structured_log.LOG_LEVEL = level
+
+def random_bound(rng: random.Random, lo: float, hi: float):
+    roll = rng.random()
+    if roll < 0.02:
+        return rng.choice([None, "20", float("nan"), float("inf")])
+    if roll < 0.5:
+        return rng.randint(int(lo), int(hi))
+    return round(rng.uniform(lo, hi), rng.choice([0, 1, 2]))
+
+def random_crop(rng: random.Random, i: int) -> dict:
+    roll = rng.random()
+    if roll < 0.03:
+        return {"crop_name": f"crop-{i}"}
+    if roll < 0.05:
+        return {"crop_name": f"crop-{i}", "optimal_conditions": rng.choice([{}, None, [], "n/a"])}
+    optimal = {}
+    for prefix, attr, _, _, _ in SCORING_FIELDS:
+        lo, hi = PARAM_RANGES[attr]
+        if rng.random() < 0.85:
+            a, b = random_bound(rng, lo, hi), random_bound(rng, lo, hi)
+            if rng.random() < 0.8 and isinstance(a, (int, float)) and isinstance(b, (int, float)) and not math.isnan(a) and not math.isnan(b):
+                a, b = min(a, b), max(a, b)
+            optimal[f"{prefix}_min"] = a
+            if rng.random() < 0.95:
+                optimal[f"{prefix}_max"] = b
+    return {"crop_name": f"crop-{i}", "optimal_conditions": optimal}
+
+def random_params(rng: random.Random) -> SimpleNamespace:
+    values = {attr: rng.randint(int(lo), int(hi)) for attr, (lo, hi) in PARAM_RANGES.items() if attr != "ph"}
+    values["ph"] = round(rng.uniform(*PARAM_RANGES["ph"]), rng.choice([0, 1, 2]))
+    return SimpleNamespace(**values)
+
+def bench(rng: random.Random, n_crops: int, repeats: int):
+    crops = [random_crop(rng, i) for i in range(n_crops)]
+    params = random_params(rng)
+
+    start = time.perf_counter()
+    with reference_logging_off():
+        for _ in range(repeats):
+            sorted(((calculate_compatibility(params, c), i) for i, c in enumerate(crops)), key=lambda x: x[0], reverse=True)[:10]
+    reference_ms = (time.perf_counter() - start) * 1000 / repeats
+
+    start = time.perf_counter()
+    engine = CropScoringEngine(crops)
+    pack_ms = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    for _ in range(repeats):
+        engine.top_k(params, 10)
+    engine_ms = (time.perf_counter() - start) * 1000 / repeats
+
+    print(f"{n_crops:,} crops: reference {reference_ms:.1f} ms, engine {engine_ms:.2f} ms "
+          f"({reference_ms / engine_ms:.0f}x), one-off packing {pack_ms:.1f} ms")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--crops", type=int, default=10000)
+    parser.add_argument("--repeats", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    bench(rng, args.crops, args.repeats)
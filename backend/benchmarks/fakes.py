@@ -0,0 +1,356 @@
+"""
+Fakes - local stand-ins for every external service main.py talks to
+
+    AWS (DynamoDB, S3)         moto, in-process
+    AWS (Polly, Translate,     botocore before-call hook answering locally
+         Transcribe)
+    MongoDB                    mongomock (one shared in-memory server)
+    Azure OpenAI               httpx MockTransport behind the real SDK client
+    OpenWeather, Nominatim,    requests transport adapter answering by host;
+    WhatsApp Graph, ipapi      any other host fails, so nothing leaves the machine
+
+Every dependency gets configurable latency (with jitter) and an error rate, and
+counts its calls so a run shows which requests actually reached a dependency.
+"""
+
+import io
+import json
+import math
+import os
+import random
+import threading
+import time
+from collections import defaultdict
+from urllib.parse import parse_qs, urlparse
+
+DEPENDENCIES = (
+    "openai", "openweather", "nominatim", "whatsapp", "ipapi",
+    "dynamodb", "mongodb", "s3", "polly", "translate", "transcribe",
+)
+# Typical latency (ms) seen from an Indian region; --no-latency zeroes them
+DEFAULT_LATENCY_MS = {
+    "openai": 900, "openweather": 150, "nominatim": 250, "whatsapp": 200, "ipapi": 100,
+    "dynamodb": 8, "mongodb": 4, "s3": 40, "polly": 250, "translate": 90, "transcribe": 400,
+}
+HTTP_HOSTS = {
+    "api.openweathermap.org": "openweather",
+    "nominatim.openstreetmap.org": "nominatim",
+    "graph.facebook.com": "whatsapp",
+    "ipapi.co": "ipapi",
+    "transcripts.local": "transcribe",
+}
+REGION = "ap-south-1"
+
+class Faults:
+    """Latency and error injection per dependency, plus call/error counters"""
+
+    def __init__(self, latency_ms: dict = None, error_rate: dict = None, jitter: float = 0.25, seed: int = 0):
+        self.latency_ms = dict(DEFAULT_LATENCY_MS if latency_ms is None else latency_ms)
+        self.error_rate = dict(error_rate or {})
+        self.jitter = jitter
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.calls = defaultdict(int)
+        self.errors = defaultdict(int)
+
+    def hit(self, dependency: str) -> bool:
+        """Wait out the dependency's latency; True if this call should fail"""
+        with self._lock:
+            self.calls[dependency] += 1
+            spread = self._rng.uniform(1 - self.jitter, 1 + self.jitter)
+            failed = self._rng.random() < self.error_rate.get(dependency, 0.0)
+            if failed:
+                self.errors[dependency] += 1
+        delay = self.latency_ms.get(dependency, 0) * spread / 1000
+        if delay > 0:
+            time.sleep(delay)
+        return failed
+
+    def reset_counters(self):
+        with self._lock:
+            self.calls.clear()
+            self.errors.clear()
+
+# --- AWS -------------------------------------------------------------------
+
+def _aws_error(operation: str):
+    from botocore.exceptions import ClientError
+    return ClientError({"Error": {"Code": "ServiceUnavailable", "Message": "injected fault"}}, operation)
+
+def _fake_mp3(text: str, sample_rate: str) -> bytes:
+    """Roughly the size Polly would return: ~80 ms of speech per character"""
+    seconds = max(1.0, len(text) * 0.08)
+    bitrate = {"8000": 8000, "16000": 32000, "22050": 48000, "24000": 48000}.get(str(sample_rate), 48000)
+    return b"ID3" + os.urandom(16) + bytes(int(seconds * bitrate / 8))
+
+class AwsFakes:
+    """Polly, Translate and Transcribe answered in a botocore hook; DynamoDB/S3 pass through to moto"""
+
+    def __init__(self, faults: Faults):
+        self.faults = faults
+        self._jobs = {}
+
+    def before_parameter_build(self, params, model, context, **kwargs):
+        context["api_params"] = dict(params)  # before-call only sees the serialized request
+
+    def before_call(self, model, context, **kwargs):
+        from botocore.awsrequest import AWSResponse
+        from botocore.response import StreamingBody
+
+        service, operation = model.service_model.service_name, model.name
+        params = context.get("api_params", {})
+        if self.faults.hit(service):
+            raise _aws_error(operation)
+
+        parsed = None
+        if service == "translate" and operation == "TranslateText":
+            parsed = {
+                "TranslatedText": f"[{params['TargetLanguageCode']}] {params['Text']}",
+                "SourceLanguageCode": params["SourceLanguageCode"],
+                "TargetLanguageCode": params["TargetLanguageCode"],
+            }
+        elif service == "polly" and operation == "SynthesizeSpeech":
+            audio = _fake_mp3(params["Text"], params.get("SampleRate", "22050"))
+            content_type = "audio/ogg" if params.get("OutputFormat") == "ogg_vorbis" else "audio/mpeg"
+            parsed = {"AudioStream": StreamingBody(io.BytesIO(audio), len(audio)), "ContentType": content_type, "RequestCharacters": len(params["Text"])}
+        elif service == "transcribe" and operation == "StartTranscriptionJob":
+            self._jobs[params["TranscriptionJobName"]] = params.get("LanguageCode", "hi-IN")
+            parsed = {"TranscriptionJob": {"TranscriptionJobName": params["TranscriptionJobName"], "TranscriptionJobStatus": "IN_PROGRESS"}}
+        elif service == "transcribe" and operation == "GetTranscriptionJob":
+            name = params["TranscriptionJobName"]
+            parsed = {"TranscriptionJob": {
+                "TranscriptionJobName": name,
+                "TranscriptionJobStatus": "COMPLETED",
+                "Transcript": {"TranscriptFileUri": f"https://transcripts.local/{name}.json"},
+            }}
+        if parsed is None:
+            return None  # handled by moto
+        return AWSResponse(f"https://{service}.{REGION}.amazonaws.com/", 200, {}, None), parsed
+
+def create_aws_resources(bucket: str):
+    """Tables (with the GSIs the app queries) and the upload bucket, in moto"""
+    import boto3
+
+    s3 = boto3.client("s3", region_name=REGION)
+    s3.create_bucket(Bucket=bucket, CreateBucketConfiguration={"LocationConstraint": REGION})
+
+    dynamodb = boto3.client("dynamodb", region_name=REGION)
+
+    def create(name, key, gsis=()):
+        attributes = {}
+        def schema(hash_key, range_key=None):
+            attributes[hash_key] = "S"
+            keys = [{"AttributeName": hash_key, "KeyType": "HASH"}]
+            if range_key:
+                attributes[range_key] = "S"
+                keys.append({"AttributeName": range_key, "KeyType": "RANGE"})
+            return keys
+        kwargs = {"TableName": name, "KeySchema": schema(*key), "BillingMode": "PAY_PER_REQUEST"}
+        if gsis:
+            kwargs["GlobalSecondaryIndexes"] = [
+                {"IndexName": index, "KeySchema": schema(*index_key), "Projection": {"ProjectionType": "ALL"}}
+                for index, index_key in gsis
+            ]
+        kwargs["AttributeDefinitions"] = [{"AttributeName": a, "AttributeType": t} for a, t in attributes.items()]
+        dynamodb.create_table(**kwargs)
+
+    create("gramvaani_users", ("phone_number",))
+    create("gramvaani_user_querie", ("query_id",), [("user_phone-index", ("user_phone", "timestamp"))])
+    create("gramvaani_sessions", ("session_id",))
+    create("gramvaani_village_trust", ("village_id",))
+    create("gramvaani_community_reports", ("report_id",), [
+        ("village_id-timestamp-index", ("village_id", "timestamp")),
+        ("feed_bucket-timestamp-index", ("feed_bucket", "timestamp")),
+    ])
+    create("gramvaani_outbreak_aggregates", ("village_id", "day"), [("day-index", ("day",))])
+    create("gramvaani_report_counters", ("counter_key", "bucket"))
+
+# --- MongoDB ---------------------------------------------------------------
+
+MONGO_METHODS = (
+    "find", "find_one", "insert_one", "insert_many", "update_one", "update_many", "replace_one",
+    "delete_one", "delete_many", "find_one_and_update", "count_documents", "distinct",
+    "aggregate", "bulk_write", "create_index",
+)
+
+def install_mongo(faults: Faults):
+    """Point pymongo.MongoClient at one shared mongomock server with injected latency"""
+    import mongomock
+    import pymongo
+    from pymongo.errors import AutoReconnect
+
+    store = mongomock.store.ServerStore()
+    state = threading.local()
+
+    class FakeMongoClient(mongomock.MongoClient):
+        def __init__(self, *args, **kwargs):
+            super().__init__("mongodb://localhost:27017", _store=store)
+
+    def with_faults(method):
+        def wrapper(*args, **kwargs):
+            if getattr(state, "depth", 0):
+                return method(*args, **kwargs)  # mongomock calling itself: one round trip already counted
+            state.depth = 1
+            try:
+                if faults.hit("mongodb"):
+                    raise AutoReconnect("injected fault")
+                return method(*args, **kwargs)
+            finally:
+                state.depth = 0
+        return wrapper
+
+    # pymongo >= 4.11 passes sort= to bulk update builders; mongomock 4.3 predates it
+    add_update = mongomock.collection.BulkOperationBuilder.add_update
+    mongomock.collection.BulkOperationBuilder.add_update = (
+        lambda self, *args, sort=None, **kwargs: add_update(self, *args, **kwargs))
+
+    for name in MONGO_METHODS:
+        setattr(mongomock.collection.Collection, name, with_faults(getattr(mongomock.collection.Collection, name)))
+    pymongo.MongoClient = FakeMongoClient
+
+# --- HTTP (requests) -------------------------------------------------------
+
+def _weather(city: str) -> dict:
+    seed = sum(map(ord, city.lower()))
+    return {
+        "name": city.title(),
+        "main": {"temp": 22 + seed % 15, "feels_like": 24 + seed % 15, "humidity": 40 + seed % 50, "pressure": 1008},
+        "weather": [{"main": "Clouds", "description": "scattered clouds"}],
+        "wind": {"speed": 3.2},
+        "rain": {"1h": seed % 3},
+    }
+
+def _reverse(lat: float, lon: float) -> dict:
+    cell = f"{math.floor(lat * 20)}_{math.floor(lon * 20)}"
+    return {"address": {
+        "village": f"Village {cell}", "state_district": f"District {math.floor(lat)}",
+        "state": "Maharashtra", "postcode": "411001", "country": "India",
+    }}
+
+def install_http(faults: Faults):
+    """Answer the app's requests.get/post calls locally; unknown hosts raise"""
+    import requests
+    from requests.adapters import HTTPAdapter
+
+    def send(adapter, request, **kwargs):
+        url = urlparse(request.url)
+        dependency = HTTP_HOSTS.get(url.hostname)
+        if dependency is None:
+            raise requests.ConnectionError(f"hermetic run: {url.hostname} has no fake")
+
+        response = requests.Response()
+        response.request, response.url, response.encoding = request, request.url, "utf-8"
+        response.headers["Content-Type"] = "application/json"
+        if faults.hit(dependency):
+            response.status_code, response._content = 503, b'{"message": "injected fault"}'
+            return response
+
+        query = {k: v[0] for k, v in parse_qs(url.query).items()}
+        if dependency == "openweather":
+            payload = _weather(query.get("q", "Delhi"))
+        elif dependency == "nominatim":
+            payload = _reverse(float(query["lat"]), float(query["lon"]))
+        elif dependency == "whatsapp":
+            payload = {"messaging_product": "whatsapp", "messages": [{"id": f"wamid.{time.time_ns()}"}]}
+        elif dependency == "ipapi":
+            payload = {"city": "Pune", "region": "Maharashtra", "country_name": "India", "latitude": 18.52, "longitude": 73.86}
+        else:
+            payload = {"results": {"transcripts": [{"transcript": "what is the weather today and should I irrigate my wheat"}]}}
+        response.status_code, response._content = 200, json.dumps(payload).encode("utf-8")
+        return response
+
+    HTTPAdapter.send = send
+
+# --- Azure OpenAI ----------------------------------------------------------
+
+ANSWER = (
+    "For your area, irrigate wheat lightly every 10-12 days and avoid watering before expected rain. "
+    "Apply the second dose of nitrogen at crown root initiation, and watch for yellow rust on the lower leaves. "
+    "Local mandi prices are steady this week, so there is no need to rush the sale."
+)
+
+def _example(schema: dict):
+    """Smallest value satisfying a (strict) JSON schema"""
+    kind = schema.get("type")
+    if "enum" in schema:
+        return schema["enum"][0]
+    if kind == "object":
+        return {name: _example(prop) for name, prop in schema.get("properties", {}).items()}
+    if kind == "array":
+        return [_example(schema["items"]) for _ in range(4)]
+    if kind in ("number", "integer"):
+        return 1
+    if kind == "boolean":
+        return True
+    return "Drip irrigation"
+
+def openai_client(faults: Faults):
+    """The real AzureOpenAI SDK client, with its HTTP transport answered locally"""
+    import httpx
+    from openai import AzureOpenAI
+
+    from metrics import InstrumentedTransport
+
+    def handle(request: httpx.Request) -> httpx.Response:
+        if faults.hit("openai"):
+            return httpx.Response(503, json={"error": {"message": "injected fault", "type": "server_error"}})
+        body = json.loads(request.content)
+        response_format = body.get("response_format") or {}
+        if response_format.get("type") == "json_schema":
+            content = json.dumps(_example(response_format["json_schema"]["schema"]))
+        elif response_format.get("type") == "json_object":
+            content = "{}"
+        else:
+            content = ANSWER
+        return httpx.Response(200, json={
+            "id": f"chatcmpl-{time.time_ns()}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "gpt-4o-mini"),
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+            "usage": {"prompt_tokens": 400, "completion_tokens": 120, "total_tokens": 520},
+        })
+
+    return AzureOpenAI(
+        azure_endpoint="https://openai.local",
+        api_key="fake",
+        api_version="2024-12-01-preview",
+        http_client=httpx.Client(transport=InstrumentedTransport("openai", httpx.MockTransport(handle))),
+    )
+
+# --- Wiring ----------------------------------------------------------------
+
+def install(faults: Faults, workdir: str):
+    """Patch every dependency, then import and return the app module (main)
+
+    Must run before anything imports main, boto3 clients or pymongo.MongoClient.
+    """
+    os.environ.update({
+        "AWS_ACCESS_KEY_ID": "testing", "AWS_SECRET_ACCESS_KEY": "testing", "AWS_DEFAULT_REGION": REGION,
+        "AWS_S3_BUCKET": "gramvaani-loadtest",
+        "AZURE_OPENAI_ENDPOINT": "https://openai.local", "AZURE_OPENAI_API_KEY": "fake",
+        "OPENWEATHER_API_KEY": "fake", "MONGO_URL": "mongodb://localhost:27017",
+        "SECRET_KEY": "loadtest-secret",
+        "WHATSAPP_ACCESS_TOKEN": "fake", "WHATSAPP_PHONE_NUMBER_ID": "1000", "WHATSAPP_VERIFY_TOKEN": "fake",
+        "PLACE_NAMES_PATH": os.path.join(workdir, "place_names.json"),
+        "GEOCODE_CACHE_PATH": os.path.join(workdir, "reverse_geocode_cache.json"),
+        "VILLAGES_CSV_PATH": os.path.join(workdir, "villages.csv"),
+    })
+    os.environ.pop("AZURE_SPEECH_KEY", None)  # regional voices go through (fake) Polly
+
+    import boto3
+    from moto import mock_aws
+
+    mock_aws().start()
+    boto3.setup_default_session(region_name=REGION)
+    aws = AwsFakes(faults)
+    boto3.DEFAULT_SESSION.events.register("before-parameter-build", aws.before_parameter_build)
+    boto3.DEFAULT_SESSION.events.register_last("before-call", aws.before_call)  # after the app's timing hooks
+    create_aws_resources(os.environ["AWS_S3_BUCKET"])
+
+    install_mongo(faults)
+    install_http(faults)
+
+    import main
+    main.azure_client = openai_client(faults)
+    return main
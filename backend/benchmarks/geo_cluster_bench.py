@@ -0,0 +1,90 @@
+"""
+Geo cluster benchmark - synthetic pest reports around hotspots across India
+
+    python benchmarks/geo_cluster_bench.py --reports 1000000
+    python benchmarks/geo_cluster_bench.py --reports 1000000 --mongo   # also time 2dsphere queries (uses MONGO_URL)
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from geo_cluster import OutbreakClusterEngine, geo_point, within_km_filter
+
+PESTS = ["fall armyworm", "locust", "whitefly", "stem borer", "brown planthopper"]
+INDIA_BBOX = (8.0, 35.0, 68.0, 97.0)  # lat_min, lat_max, lon_min, lon_max
+
+def synthetic_reports(n: int, hotspots: int, seed: int):
+    """70% of reports near a hotspot, the rest scattered; timestamps over 14 days"""
+    rng = random.Random(seed)
+    lat_min, lat_max, lon_min, lon_max = INDIA_BBOX
+    centers = [(rng.uniform(lat_min, lat_max), rng.uniform(lon_min, lon_max), rng.choice(PESTS)) for _ in range(hotspots)]
+    now = datetime.utcnow()
+    for _ in range(n):
+        if rng.random() < 0.7:
+            lat, lon, pest = rng.choice(centers)
+            lat += rng.gauss(0, 0.05)
+            lon += rng.gauss(0, 0.05)
+        else:
+            lat, lon, pest = rng.uniform(lat_min, lat_max), rng.uniform(lon_min, lon_max), rng.choice(PESTS)
+        yield pest, lat, lon, now - timedelta(seconds=rng.uniform(0, 14 * 86400))
+
+def bench_engine(reports: list):
+    engine = OutbreakClusterEngine()
+    start = time.perf_counter()
+    for pest, lat, lon, ts in reports:
+        engine.add(pest, lat, lon, ts)
+    elapsed = time.perf_counter() - start
+    print(f"engine add: {len(reports):,} reports in {elapsed:.2f}s ({len(reports) / elapsed:,.0f}/s)")
+
+    for pest in PESTS:
+        start = time.perf_counter()
+        clusters = engine.clusters(pest, days=7)
+        elapsed = (time.perf_counter() - start) * 1000
+        print(f"engine clusters[{pest}]: {len(clusters)} clusters in {elapsed:.1f} ms")
+
+def bench_mongo(reports: list, samples: int):
+    from pymongo import MongoClient
+
+    collection = MongoClient(os.getenv("MONGO_URL")).gramvani_bench.pest_outbreaks
+    collection.drop()
+    collection.create_index([("geo", "2dsphere"), ("pest_name", 1), ("timestamp", -1)])
+    start = time.perf_counter()
+    batch = []
+    for pest, lat, lon, ts in reports:
+        batch.append({"pest_name": pest, "geo": geo_point(lat, lon), "timestamp": ts})
+        if len(batch) == 10000:
+            collection.insert_many(batch, ordered=False)
+            batch = []
+    if batch:
+        collection.insert_many(batch, ordered=False)
+    print(f"mongo insert: {time.perf_counter() - start:.1f}s")
+
+    week_ago = datetime.utcnow() - timedelta(days=7)
+    timings = []
+    for pest, lat, lon, _ in random.Random(1).sample(reports, samples):
+        start = time.perf_counter()
+        collection.count_documents({"geo": within_km_filter(lat, lon, 10), "pest_name": pest, "timestamp": {"$gte": week_ago}})
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    print(f"mongo 10km/7d count: p50 {timings[len(timings) // 2]:.1f} ms, p95 {timings[int(len(timings) * 0.95)]:.1f} ms")
+    collection.drop()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--reports", type=int, default=1_000_000)
+    parser.add_argument("--hotspots", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--mongo", action="store_true", help="also benchmark 2dsphere queries against MONGO_URL")
+    parser.add_argument("--samples", type=int, default=200)
+    args = parser.parse_args()
+
+    reports = list(synthetic_reports(args.reports, args.hotspots, args.seed))
+    bench_engine(reports)
+    if args.mongo:
+        bench_mongo(reports, args.samples)
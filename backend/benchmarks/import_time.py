@@ -0,0 +1,68 @@
+"""
+Import-time budget - how long `import main` takes in a fresh interpreter
+
+Imports main with no credentials in the environment (which must work now that
+clients are built lazily), reports the median wall time and the slowest
+top-level imports, and exits non-zero when the median is over budget.
+
+    python benchmarks/import_time.py
+    python benchmarks/import_time.py --runs 10 --budget-ms 1300 --top 15
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+IMPORT_BUDGET_MS = 1300  # fastapi, boto3 and numpy account for most of it; the clients and openai are lazy
+TIMED_IMPORT = "import time; start = time.perf_counter(); import main; print(time.perf_counter() - start)"
+
+def clean_env() -> dict:
+    """The environment minus anything that looks like a credential or service endpoint"""
+    prefixes = ("AWS_", "AZURE_", "MONGO", "OPENWEATHER", "WHATSAPP", "SECRET_KEY")
+    env = {k: v for k, v in os.environ.items() if not k.startswith(prefixes)}
+    env["PYTHONDONTWRITEBYTECODE"] = "1"
+    return env
+
+def run(args: list, env: dict) -> subprocess.CompletedProcess:
+    result = subprocess.run([sys.executable, *args], cwd=BACKEND_DIR, env=env, capture_output=True, text=True)
+    if result.returncode != 0:
+        sys.exit(f"import main failed:\n{result.stderr}")
+    return result
+
+def import_seconds(env: dict) -> float:
+    return float(run(["-c", TIMED_IMPORT], env).stdout.strip().splitlines()[-1])
+
+def slowest_imports(env: dict, top: int) -> list:
+    """(cumulative ms, module) for main's direct imports, from -X importtime"""
+    rows = []
+    for line in run(["-X", "importtime", "-c", "import main"], env).stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if name.startswith("   ") and not name.startswith("    ") and cumulative.strip().isdigit():
+            rows.append((int(cumulative) / 1000, name.strip()))
+    return sorted(rows, reverse=True)[:top]
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=IMPORT_BUDGET_MS)
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+
+    env = clean_env()
+    import_seconds(env)  # first run compiles and warms the OS file cache
+    samples = [import_seconds(env) * 1000 for _ in range(args.runs)]
+    median = statistics.median(samples)
+    print(f"import main: median {median:.0f} ms, min {min(samples):.0f} ms, max {max(samples):.0f} ms over {args.runs} runs")
+
+    print("slowest imports (cumulative ms):")
+    for ms, name in slowest_imports(env, args.top):
+        print(f"  {ms:8.1f}  {name}")
+
+    if median > args.budget_ms:
+        sys.exit(f"OVER BUDGET: {median:.0f} ms > {args.budget_ms:.0f} ms")
+    print(f"within budget ({args.budget_ms:.0f} ms)")
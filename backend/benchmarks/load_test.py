@@ -0,0 +1,409 @@
+"""
+Load test - mixed web, voice and WhatsApp traffic against the real app, offline
+
+Every external dependency is replaced by a local stand-in (see fakes.py) with
+configurable latency and error injection, the app is served by uvicorn on a
+local port, and virtual users replay a weighted mix of endpoints. Reports
+p50/p95/p99 latency and throughput per endpoint, and compares against a
+baseline file to catch regressions.
+
+    pip install -r benchmarks/requirements.txt
+    python benchmarks/load_test.py --users 20 --duration 30
+    python benchmarks/load_test.py --latency openai=2000 --errors nominatim=0.2
+    python benchmarks/load_test.py --no-latency --baseline benchmarks/load_test_baseline.json
+
+The committed baseline was recorded with --no-latency (the app's own cost, which
+is what a code change moves); compare with the same flags, on similar hardware.
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import random
+import socket
+import sys
+import tempfile
+import threading
+import time
+import wave
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import fakes
+import structured_log
+
+LOCATIONS = [
+    ("Pune", "Maharashtra"), ("Nashik", "Maharashtra"), ("Ludhiana", "Punjab"),
+    ("Guntur", "Andhra Pradesh"), ("Patna", "Bihar"), ("Indore", "Madhya Pradesh"),
+]
+LANGUAGES = ["en", "hi", "mr", "te", "pa"]
+QUESTIONS = [
+    "When should I sow wheat this season?",
+    "My tomato leaves are curling, what should I do?",
+    "What is the mandi price of onion today?",
+    "How much urea for one acre of paddy?",
+    "Is it going to rain this week?",
+]
+INDIA_BBOX = (8.0, 35.0, 68.0, 97.0)  # lat_min, lat_max, lon_min, lon_max
+# Web + voice + WhatsApp mix (relative weights)
+SCENARIO_WEIGHTS = {
+    "me": 8, "advisor_dashboard": 6, "crop_calendar": 6, "leaderboard": 6, "hyperlocal": 6,
+    "success_stories": 4, "community_feed": 6, "outbreak_map": 4, "query_history": 4,
+    "community_report": 3, "reverse_geocode": 5, "crop_recommendation": 4, "weather": 5,
+    "ask_text": 8, "ask_voice": 4, "whatsapp": 8,
+}
+# Regression thresholds for --baseline
+P95_TOLERANCE = 0.50  # relative growth allowed (run-to-run p95 noise is ~30%) ...
+P95_FLOOR_MS = 50.0  # ... once it is also bigger than this (timer noise on fast endpoints)
+ERROR_RATE_TOLERANCE = 0.01
+
+# --- Seed data -------------------------------------------------------------
+
+def seed(main, users: int, villages: int, workdir: str, rng: random.Random) -> list:
+    """Users (with tokens), Mongo collections and the village dataset; returns [(phone, token, location)]"""
+    import pymongo
+
+    db = pymongo.MongoClient("mongodb://localhost:27017").gramvani
+    db.hyperlocal_context.insert_many([{
+        "district": district, "state": state,
+        "soil_type": rng.choice(["Black cotton", "Alluvial", "Red loam"]),
+        "rainfall": f"{rng.randint(500, 1400)} mm", "climate_zone": "Semi-arid",
+        "crops": {"kharif": ["Soybean", "Cotton", "Rice"], "rabi": ["Wheat", "Gram", "Mustard"], "summer": ["Moong", "Groundnut"]},
+        "pest_alerts": [{"pest": "Pink bollworm", "crop": "Cotton", "severity": "medium"}],
+    } for district, state in LOCATIONS])
+    db.success_stories.insert_many([{
+        "farmer_name": f"Farmer {i}", "location": f"{district}, {state}", "crop": "Wheat",
+        "story": "Switched to drip irrigation and raised yield by 30% while using less water.",
+        "yield_increase": "30%",
+    } for i, (district, state) in enumerate(LOCATIONS * 3)])
+    crops = ["Rice", "Wheat", "Maize", "Cotton", "Soybean", "Gram", "Mustard", "Groundnut", "Sugarcane", "Onion", "Tomato", "Moong"]
+    db.crop_recommendations.insert_many([{
+        "crop_name": crop, "climate_zone": "Semi-arid", "season": rng.choice(["kharif", "rabi"]),
+        "suitable_regions": [state for _, state in rng.sample(LOCATIONS, 3)],
+        "optimal_conditions": {
+            "temperature_min": 15 + i % 5, "temperature_max": 32 + i % 5, "humidity_min": 40, "humidity_max": 80,
+            "rainfall_min": 400, "rainfall_max": 1200, "nitrogen_min": 40, "nitrogen_max": 120,
+            "phosphorus_min": 20, "phosphorus_max": 60, "potassium_min": 20, "potassium_max": 60,
+            "ph_min": 5.5, "ph_max": 7.5,
+        },
+    } for i, crop in enumerate(crops)])
+    db.agriculture_news.insert_many([{
+        "title": f"Advisory {i}", "summary": "Monsoon expected on time across central India.",
+        "published_at": datetime.utcnow().isoformat(),
+    } for i in range(20)])
+
+    lat_min, lat_max, lon_min, lon_max = INDIA_BBOX
+    with open(os.environ["VILLAGES_CSV_PATH"], "w", encoding="utf-8") as f:
+        f.write("village,district,state,latitude,longitude\n")
+        for i in range(villages):
+            f.write(f"village-{i},district-{i // 500},state-{i // 5000},{rng.uniform(lat_min, lat_max):.5f},{rng.uniform(lon_min, lon_max):.5f}\n")
+
+    accounts = []
+    for i in range(users):
+        phone = f"98{i:08d}"
+        district, state = LOCATIONS[i % len(LOCATIONS)]
+        location = f"{district}, {state}"
+        main.users_table.put_item(Item={
+            "phone_number": phone, "password": "", "language": LANGUAGES[i % len(LANGUAGES)],
+            "location": location, "created_at": datetime.utcnow().isoformat(),
+        })
+        token = main.jwt.encode({"sub": phone, "exp": datetime.utcnow() + timedelta(days=1)}, main.SECRET_KEY, algorithm=main.ALGORITHM)
+        accounts.append((phone, token, location))
+    return accounts
+
+def silent_wav(seconds: float = 2.0, rate: int = 16000) -> bytes:
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(rate)
+        f.writeframes(bytes(int(seconds * rate) * 2))
+    return buffer.getvalue()
+
+# --- Scenarios -------------------------------------------------------------
+
+class Recorder:
+    def __init__(self):
+        self.latencies = defaultdict(list)  # route -> seconds
+        self.errors = defaultdict(int)
+        self.enabled = False
+
+    async def call(self, route: str, request):
+        """Time one request; `route` is the template it's reported under"""
+        start = time.perf_counter()
+        try:
+            response = await request
+            failed = response.status_code >= 500 or response.status_code in (401, 404, 422)
+        except Exception:
+            response, failed = None, True
+        if self.enabled:
+            self.latencies[route].append(time.perf_counter() - start)
+            if failed:
+                self.errors[route] += 1
+        return response
+
+class VirtualUser:
+    def __init__(self, client, recorder: Recorder, account: tuple, rng: random.Random, audio: bytes):
+        self.client = client
+        self.recorder = recorder
+        self.phone, token, self.location = account
+        self.headers = {"Authorization": f"Bearer {token}", "Accept-Encoding": "gzip, br"}
+        self.rng = rng
+        self.audio = audio
+        self.language = rng.choice(LANGUAGES)
+        self.profile = rng.choice(["2g", "3g", "wifi"])
+
+    def get(self, route: str, path: str = None, **kwargs):
+        return self.recorder.call(route, self.client.get(path or route, headers=self.headers, **kwargs))
+
+    def post(self, route: str, path: str = None, **kwargs):
+        return self.recorder.call(route, self.client.post(path or route, headers=self.headers, **kwargs))
+
+    async def fetch_audio(self, response):
+        if response is None or response.status_code != 200:
+            return
+        url = response.json().get("audio_url")
+        if url:
+            await self.get("/api/audio/{audio_id}", url)
+
+    async def me(self):
+        await self.get("/api/me")
+
+    async def advisor_dashboard(self):
+        await self.get("/api/advisor-dashboard")
+
+    async def crop_calendar(self):
+        await self.get("/api/crop-calendar", params={"language": self.language})
+
+    async def leaderboard(self):
+        await self.get("/api/village-leaderboard")
+
+    async def hyperlocal(self):
+        await self.get("/api/hyperlocal-context", params={"language": self.language})
+
+    async def success_stories(self):
+        await self.get("/api/success-stories")
+
+    async def community_feed(self):
+        await self.get("/api/community-reports", params={"limit": 20})
+
+    async def outbreak_map(self):
+        await self.get("/api/outbreak-map", params={"language": self.language})
+
+    async def query_history(self):
+        await self.get("/api/query-history", params={"limit": 20, "view": "compact"})
+
+    async def community_report(self):
+        await self.post("/api/community-report", json={
+            "report_type": self.rng.choice(["pest", "disease", "weather", "success"]),
+            "crop": self.rng.choice(["Wheat", "Cotton", "Rice"]),
+            "description": "Leaves turning yellow in the lower canopy",
+            "severity": self.rng.choice(["low", "medium", "high"]),
+            "language": self.language,
+        })
+
+    async def reverse_geocode(self):
+        lat_min, lat_max, lon_min, lon_max = INDIA_BBOX
+        await self.post("/api/reverse-geocode", json={
+            "latitude": self.rng.uniform(lat_min, lat_max), "longitude": self.rng.uniform(lon_min, lon_max),
+        })
+
+    async def crop_recommendation(self):
+        await self.post("/api/get-crop-recommendation", json={
+            "nitrogen": self.rng.randint(20, 140), "phosphorus": self.rng.randint(10, 80), "potassium": self.rng.randint(10, 80),
+            "temperature": self.rng.randint(12, 40), "humidity": self.rng.randint(30, 90),
+            "ph": round(self.rng.uniform(5.0, 8.5), 1), "rainfall": self.rng.randint(300, 1500),
+        })
+
+    async def weather(self):
+        response = await self.post("/api/weather", json={
+            "city": self.location.split(",")[0], "language": self.language, "audio_profile": self.profile,
+        })
+        await self.fetch_audio(response)
+
+    async def ask_text(self):
+        response = await self.post("/process-text", json={
+            "text": self.rng.choice(QUESTIONS), "language": self.language, "audio_profile": self.profile,
+        })
+        await self.fetch_audio(response)
+
+    async def ask_voice(self):
+        response = await self.post(
+            "/process-audio",
+            params={"language": self.language, "audio_profile": self.profile},
+            files={"file": ("question.wav", self.audio, "audio/wav")},
+        )
+        await self.fetch_audio(response)
+
+    async def whatsapp(self):
+        await self.recorder.call("/webhook", self.client.post("/webhook", json={
+            "object": "whatsapp_business_account",
+            "entry": [{"changes": [{"value": {"messages": [{
+                "from": f"91{self.phone}", "id": f"wamid.{self.rng.getrandbits(64)}", "type": "text",
+                "text": {"body": self.rng.choice(QUESTIONS)},
+            }]}}]}],
+        }))
+
+async def run_load(base_url: str, accounts: list, recorder: Recorder, args, rng: random.Random):
+    import httpx
+
+    audio = silent_wav()
+    names, weights = zip(*SCENARIO_WEIGHTS.items())
+    limits = httpx.Limits(max_connections=args.users, max_keepalive_connections=args.users)
+    async with httpx.AsyncClient(base_url=base_url, timeout=120, limits=limits) as client:
+        deadline = time.monotonic() + args.warmup + args.duration
+
+        async def user_loop(account):
+            user = VirtualUser(client, recorder, account, random.Random(rng.random()), audio)
+            while time.monotonic() < deadline:
+                await getattr(user, user.rng.choices(names, weights)[0])()
+                if args.think_ms:
+                    await asyncio.sleep(user.rng.expovariate(1000 / args.think_ms))
+
+        async def start_measuring():
+            await asyncio.sleep(args.warmup)
+            recorder.enabled = True
+
+        await asyncio.gather(start_measuring(), *(user_loop(accounts[i % len(accounts)]) for i in range(args.users)))
+
+# --- Server ----------------------------------------------------------------
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def start_server(app, port: int):
+    import uvicorn
+
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning", lifespan="on"))
+    thread = threading.Thread(target=server.run, name="uvicorn", daemon=True)
+    thread.start()
+    while not server.started:
+        if not thread.is_alive():
+            raise RuntimeError("server failed to start")
+        time.sleep(0.05)
+    return server, thread
+
+# --- Report ----------------------------------------------------------------
+
+def percentile(sorted_values: list, q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(round(q * (len(sorted_values) - 1))))]
+
+def summarize(recorder: Recorder, duration: float) -> dict:
+    routes = {}
+    for route, samples in sorted(recorder.latencies.items()):
+        samples = sorted(samples)
+        routes[route] = {
+            "count": len(samples),
+            "error_rate": round(recorder.errors[route] / len(samples), 4),
+            "rps": round(len(samples) / duration, 2),
+            "p50_ms": round(percentile(samples, 0.50) * 1000, 1),
+            "p95_ms": round(percentile(samples, 0.95) * 1000, 1),
+            "p99_ms": round(percentile(samples, 0.99) * 1000, 1),
+            "max_ms": round(samples[-1] * 1000, 1),
+        }
+    return routes
+
+def print_report(routes: dict, faults: fakes.Faults, duration: float):
+    print(f"{'endpoint':34} {'count':>7} {'rps':>7} {'err%':>6} {'p50':>8} {'p95':>8} {'p99':>8} {'max':>8}  (ms)")
+    for route, r in routes.items():
+        print(f"{route:34} {r['count']:>7} {r['rps']:>7.2f} {r['error_rate'] * 100:>6.1f} "
+              f"{r['p50_ms']:>8.1f} {r['p95_ms']:>8.1f} {r['p99_ms']:>8.1f} {r['max_ms']:>8.1f}")
+    total = sum(r["count"] for r in routes.values())
+    print(f"total: {total} requests in {duration:.0f}s = {total / duration:.1f} req/s")
+    print("dependency calls: " + ", ".join(
+        f"{d}={faults.calls[d]}" + (f" ({faults.errors[d]} failed)" if faults.errors[d] else "")
+        for d in fakes.DEPENDENCIES if faults.calls[d]
+    ))
+
+def compare(routes: dict, baseline: dict) -> list:
+    """Human-readable regressions against a baseline report"""
+    regressions = []
+    for route, base in baseline["routes"].items():
+        current = routes.get(route)
+        if current is None:
+            regressions.append(f"{route}: no samples (baseline had {base['count']})")
+            continue
+        if current["p95_ms"] > base["p95_ms"] * (1 + P95_TOLERANCE) and current["p95_ms"] - base["p95_ms"] > P95_FLOOR_MS:
+            regressions.append(f"{route}: p95 {base['p95_ms']:.1f} -> {current['p95_ms']:.1f} ms")
+        if current["error_rate"] > base["error_rate"] + ERROR_RATE_TOLERANCE:
+            regressions.append(f"{route}: error rate {base['error_rate']:.2%} -> {current['error_rate']:.2%}")
+    return regressions
+
+def parse_overrides(values: list, cast) -> dict:
+    overrides = {}
+    for value in values:
+        dependency, _, amount = value.partition("=")
+        if dependency not in fakes.DEPENDENCIES or not amount:
+            raise SystemExit(f"expected dependency=value with dependency in {', '.join(fakes.DEPENDENCIES)}, got {value!r}")
+        overrides[dependency] = cast(amount)
+    return overrides
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=20, help="concurrent virtual users")
+    parser.add_argument("--duration", type=float, default=30, help="measured seconds")
+    parser.add_argument("--warmup", type=float, default=5, help="unmeasured seconds before that")
+    parser.add_argument("--think-ms", type=float, default=200, help="mean pause between a user's requests")
+    parser.add_argument("--villages", type=int, default=20000)
+    parser.add_argument("--latency", action="append", default=[], metavar="DEP=MS", help="override a dependency's latency")
+    parser.add_argument("--errors", action="append", default=[], metavar="DEP=RATE", help="fail this fraction of a dependency's calls")
+    parser.add_argument("--no-latency", action="store_true", help="zero every dependency's latency (measures the app alone)")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--baseline", help="fail (exit 1) on regressions against this report")
+    parser.add_argument("--write-baseline", help="save this run's report as a baseline")
+    parser.add_argument("--app-log", help="keep the app's stdout here (default: discarded)")
+    args = parser.parse_args()
+
+    latency = {} if args.no_latency else dict(fakes.DEFAULT_LATENCY_MS)
+    latency.update(parse_overrides(args.latency, float))
+    faults = fakes.Faults(latency, parse_overrides(args.errors, float), seed=args.seed)
+    rng = random.Random(args.seed)
+
+    workdir = tempfile.mkdtemp(prefix="gramvaani-load-")
+    os.chdir(BACKEND_DIR)  # crop_calendar.json and friends are opened relative to the backend
+    app_log = open(args.app_log or os.devnull, "w", encoding="utf-8")
+    with contextlib.redirect_stdout(app_log):
+        main = fakes.install(faults, workdir)
+        accounts = seed(main, max(args.users, 10), args.villages, workdir, rng)
+        server, thread = start_server(main.app, free_port())
+        recorder = Recorder()
+        asyncio.run(run_load(f"http://127.0.0.1:{server.config.port}", accounts, recorder, args, rng))
+        server.should_exit = True
+        thread.join(timeout=10)
+        structured_log.flush_logging()  # its writer thread holds app_log
+    app_log.close()
+
+    routes = summarize(recorder, args.duration)
+    print(f"{args.users} users, {args.duration:.0f}s measured after {args.warmup:.0f}s warmup, "
+          f"latency {'off' if args.no_latency else 'on'}, errors {dict(faults.error_rate) or 'off'}")
+    print_report(routes, faults, args.duration)
+
+    report = {
+        "config": {"users": args.users, "duration": args.duration, "think_ms": args.think_ms,
+                   "latency_ms": faults.latency_ms, "error_rate": faults.error_rate},
+        "routes": routes,
+    }
+    if args.write_baseline:
+        with open(args.write_baseline, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+        print(f"baseline written to {args.write_baseline}")
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        if baseline["config"] != report["config"]:
+            print("warning: baseline was recorded with different settings")
+        regressions = compare(routes, baseline)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        sys.exit(1 if regressions else 0)
@@ -0,0 +1,74 @@
+"""
+Village index benchmark - KD-tree nearest village vs. a brute-force haversine scan
+
+Checks that the tree finds the same village as a full scan for random points
+across India, then times tree construction and lookups.
+
+    python benchmarks/village_index_bench.py --villages 600000
+    python benchmarks/village_index_bench.py --csv villages.csv   # use a real dataset
+"""
+
+import argparse
+import math
+import os
+import random
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from village_index import EARTH_RADIUS_KM, VILLAGE_MATCH_KM, VillageKDTree, load_villages_csv
+
+INDIA_BBOX = (8.0, 35.0, 68.0, 97.0)  # lat_min, lat_max, lon_min, lon_max
+
+def synthetic_villages(n: int, rng: random.Random):
+    lat_min, lat_max, lon_min, lon_max = INDIA_BBOX
+    latitudes = [rng.uniform(lat_min, lat_max) for _ in range(n)]
+    longitudes = [rng.uniform(lon_min, lon_max) for _ in range(n)]
+    villages = [(f"village-{i}", f"district-{i // 500}", f"state-{i // 20000}") for i in range(n)]
+    return villages, latitudes, longitudes
+
+def brute_force(lat_rad: np.ndarray, lon_rad: np.ndarray, latitude: float, longitude: float):
+    """(index, km) of the nearest point by haversine over every village"""
+    la, lo = math.radians(latitude), math.radians(longitude)
+    a = np.sin((lat_rad - la) / 2) ** 2 + math.cos(la) * np.cos(lat_rad) * np.sin((lon_rad - lo) / 2) ** 2
+    distances = 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(a))
+    index = int(distances.argmin())
+    return index, float(distances[index])
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--villages", type=int, default=600_000)
+    parser.add_argument("--csv", help="village dataset to load instead of synthetic points")
+    parser.add_argument("--queries", type=int, default=20000)
+    parser.add_argument("--checks", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=11)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    start = time.perf_counter()
+    if args.csv:
+        tree = load_villages_csv(args.csv)
+    else:
+        tree = VillageKDTree(*synthetic_villages(args.villages, rng))
+    print(f"build: {len(tree):,} villages in {time.perf_counter() - start:.2f}s")
+
+    lat_min, lat_max, lon_min, lon_max = INDIA_BBOX
+    points = [(rng.uniform(lat_min, lat_max), rng.uniform(lon_min, lon_max)) for _ in range(args.queries)]
+
+    lat_rad, lon_rad = np.radians(tree.latitudes), np.radians(tree.longitudes)
+    for latitude, longitude in points[:args.checks]:
+        match = tree.nearest(latitude, longitude)
+        index, km = brute_force(lat_rad, lon_rad, latitude, longitude)
+        if km <= VILLAGE_MATCH_KM:
+            assert match and match["village"] == tree.villages[index][0], f"mismatch at {latitude}, {longitude}"
+        else:
+            assert match is None, f"unexpected match at {latitude}, {longitude}"
+    print(f"parity: {args.checks} lookups match brute force")
+
+    start = time.perf_counter()
+    hits = sum(tree.nearest(latitude, longitude) is not None for latitude, longitude in points)
+    elapsed = time.perf_counter() - start
+    print(f"lookup: {elapsed / len(points) * 1e6:.1f} us/query, {hits:,}/{len(points):,} within {VILLAGE_MATCH_KM:g} km")
@@ -0,0 +1,184 @@
+"""
+Cache Backend - where cached context, LLM output and TTS clips are kept
+MemoryCache keeps them per process (the default); RedisCache keeps them on a
+Redis-protocol server (CACHE_URL) so every uvicorn worker shares one warm cache
+"""
+
+import os
+import pickle
+import time
+from abc import ABC, abstractmethod
+from typing import Optional
+
+from metrics import record_external
+from structured_log import get_logger
+
+try:
+    import redis
+except ImportError:
+    redis = None
+
+log = get_logger("cache_backend")
+
+CACHE_URL = os.getenv("CACHE_URL", "")  # e.g. redis://localhost:6379/0 or unix:///tmp/gramvaani-cache.sock
+CACHE_KEY_PREFIX = "gramvaani:"
+REDIS_TIMEOUT = 0.25  # seconds; the server is local, anything slower means it's in trouble
+REDIS_RETRY_AFTER = 5  # seconds of treating every lookup as a miss after a failure
+
+class CacheBackend(ABC):
+    """Values with a TTL plus integer counters (cache generations); a miss is None"""
+
+    shared = False  # True when other worker processes see the same entries
+
+    @abstractmethod
+    def get(self, key: str):
+        """The stored value, or None on a miss"""
+
+    @abstractmethod
+    def set(self, key: str, value, ttl: int):
+        """Store `value` for `ttl` seconds"""
+
+    @abstractmethod
+    def delete(self, key: str):
+        """Drop an entry (no error if it's gone)"""
+
+    @abstractmethod
+    def touch(self, key: str, ttl: int) -> bool:
+        """Restart an entry's TTL; False if it's gone"""
+
+    @abstractmethod
+    def counter(self, key: str) -> int:
+        """Current value of a counter; 0 if never incremented"""
+
+    @abstractmethod
+    def incr(self, key: str, ttl: int) -> int:
+        """Add one to a counter, keep it `ttl` seconds longer and return the new value"""
+
+    @abstractmethod
+    def claim(self, key: str, ttl: float) -> float:
+        """Take `key` for `ttl` seconds: 0 if taken now, else seconds until the current holder's claim lapses"""
+
+    def ping(self):
+        """Raise if the backend can't be reached"""
+
+class MemoryCache(CacheBackend):
+    """Dicts in this process; expired entries are dropped when they're next read"""
+
+    def __init__(self):
+        self._values = {}
+        self._expires = {}
+        self._counters = {}
+        self._claims = {}
+
+    def get(self, key: str):
+        if key in self._values:
+            if time.time() < self._expires.get(key, 0):
+                return self._values[key]
+            self.delete(key)
+        return None
+
+    def set(self, key: str, value, ttl: int):
+        self._values[key] = value
+        self._expires[key] = time.time() + ttl
+
+    def delete(self, key: str):
+        self._values.pop(key, None)
+        self._expires.pop(key, None)
+
+    def touch(self, key: str, ttl: int) -> bool:
+        if self.get(key) is None:
+            return False
+        self._expires[key] = time.time() + ttl
+        return True
+
+    def counter(self, key: str) -> int:
+        return self._counters.get(key, 0)
+
+    def incr(self, key: str, ttl: int) -> int:
+        self._counters[key] = self._counters.get(key, 0) + 1  # a few per user/village; kept for the process lifetime
+        return self._counters[key]
+
+    def claim(self, key: str, ttl: float) -> float:
+        now = time.monotonic()
+        held_until = self._claims.get(key, 0.0)
+        if held_until > now:
+            return held_until - now
+        self._claims[key] = now + ttl
+        return 0.0
+
+class RedisCache(CacheBackend):
+    """Pickled values on a Redis-protocol server shared by the workers
+
+    Calls are synchronous: against a local server a round trip is ~0.1 ms. If
+    the server fails, lookups are misses and writes are dropped for
+    REDIS_RETRY_AFTER seconds instead of stalling requests. Values are pickled,
+    so CACHE_URL must point at a server only this deployment can write to.
+    """
+
+    shared = True
+
+    def __init__(self, url: str):
+        if redis is None:
+            raise RuntimeError("CACHE_URL is set but the redis package is not installed")
+        self.client = redis.Redis.from_url(url, socket_timeout=REDIS_TIMEOUT, socket_connect_timeout=REDIS_TIMEOUT)
+        self._down_until = 0.0
+
+    def _call(self, command, default=None):
+        if time.monotonic() < self._down_until:
+            return default
+        start = time.perf_counter()
+        try:
+            result = command()
+        except redis.RedisError as e:
+            record_external("redis", time.perf_counter() - start, ok=False)
+            self._down_until = time.monotonic() + REDIS_RETRY_AFTER
+            log.warning("cache_unavailable", error=e, retry_after=REDIS_RETRY_AFTER)
+            return default
+        record_external("redis", time.perf_counter() - start)
+        return result
+
+    def get(self, key: str):
+        raw = self._call(lambda: self.client.get(CACHE_KEY_PREFIX + key))
+        return pickle.loads(raw) if raw is not None else None
+
+    def set(self, key: str, value, ttl: int):
+        data = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+        self._call(lambda: self.client.set(CACHE_KEY_PREFIX + key, data, ex=max(1, int(ttl))))
+
+    def delete(self, key: str):
+        self._call(lambda: self.client.delete(CACHE_KEY_PREFIX + key))
+
+    def touch(self, key: str, ttl: int) -> bool:
+        return bool(self._call(lambda: self.client.expire(CACHE_KEY_PREFIX + key, max(1, int(ttl))), False))
+
+    def counter(self, key: str) -> int:
+        return int(self._call(lambda: self.client.get(CACHE_KEY_PREFIX + key)) or 0)
+
+    def incr(self, key: str, ttl: int) -> int:
+        def command():
+            pipeline = self.client.pipeline()
+            pipeline.incr(CACHE_KEY_PREFIX + key)
+            pipeline.expire(CACHE_KEY_PREFIX + key, max(1, int(ttl)))
+            return pipeline.execute()[0]
+        return int(self._call(command, 0))
+
+    def claim(self, key: str, ttl: float) -> float:
+        """SET NX PX: one holder per `ttl` across every worker; 0 (go ahead) while the server is down"""
+        def command():
+            pipeline = self.client.pipeline()
+            pipeline.set(CACHE_KEY_PREFIX + key, b"1", nx=True, px=max(1, int(ttl * 1000)))
+            pipeline.pttl(CACHE_KEY_PREFIX + key)
+            claimed, remaining_ms = pipeline.execute()
+            return 0.0 if claimed else max(remaining_ms, 1) / 1000
+        return self._call(command, 0.0)
+
+    def ping(self):
+        self.client.ping()
+
+def create_cache_backend(url: Optional[str] = None) -> CacheBackend:
+    """RedisCache for CACHE_URL (or `url`), else MemoryCache"""
+    url = CACHE_URL if url is None else url
+    if not url:
+        return MemoryCache()
+    log.info("cache_backend", backend="redis")
+    return RedisCache(url)
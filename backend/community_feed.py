@@ -0,0 +1,122 @@
+"""
+Community Feed - newest-first community reports read straight from DynamoDB indexes
+Village feeds use village_id-timestamp-index; the all-villages feed walks a
+per-day bucket index (feed_bucket-timestamp-index) backwards in time
+"""
+
+import os
+from datetime import datetime, timedelta
+from typing import Optional
+
+from boto3.dynamodb.conditions import Key
+
+from data_aggregator import bump_cache_generation, cache_generation, get_cache_key, get_cached, set_cached
+from pagination import encode_cursor, decode_cursor
+
+VILLAGE_INDEX = "village_id-timestamp-index"
+BUCKET_INDEX = "feed_bucket-timestamp-index"
+FEED_CACHE_TTL = 30  # seconds - hot villages are served from memory
+MAX_FEED_LIMIT = 50
+MAX_BUCKET_LOOKBACK = 30  # days scanned per all-villages page before handing back a cursor
+# Oldest day bucket that can hold reports; the all-villages feed ends there.
+# scripts/backfill_feed_bucket.py prints the real value for an existing table
+FEED_START_DATE = os.getenv("FEED_START_DATE", "2024-01-01")
+
+def feed_bucket(timestamp: str) -> str:
+    """Day bucket (YYYY-MM-DD) for an ISO timestamp"""
+    return timestamp[:10]
+
+class CommunityFeed:
+    def __init__(self, table, secret: str):
+        self.table = table
+        self.secret = secret
+
+    def item_fields(self, timestamp: str) -> dict:
+        """Extra attributes a report needs to appear in the all-villages feed"""
+        return {"feed_bucket": feed_bucket(timestamp)}
+
+    def invalidate(self, village_id: str):
+        """Drop cached first pages for a village and for the global feed"""
+        # Bumping the generation drops them without a scan of keys, in every worker
+        for scope in (village_id, "*"):
+            bump_cache_generation(f"feed:{scope}")
+
+    def get_page(self, village_id: Optional[str], limit: int, cursor: Optional[str] = None) -> dict:
+        """Newest-first page of reports, for one village or for all villages"""
+        limit = max(1, min(limit, MAX_FEED_LIMIT))
+        scope = village_id or "*"
+        cache_key = None
+
+        if not cursor:
+            cache_key = get_cache_key("feed", f"{scope}:{limit}:{cache_generation(f'feed:{scope}')}")
+            cached = get_cached(cache_key)
+            if cached:
+                return cached
+
+        start_key = decode_cursor(cursor, self.secret, scope=f"feed:{scope}")
+        if village_id:
+            reports, last_key = self._village_page(village_id, limit, start_key)
+        else:
+            reports, last_key = self._global_page(limit, start_key)
+
+        page = {
+            "reports": reports,
+            "count": len(reports),
+            "next_cursor": encode_cursor(last_key, self.secret, scope=f"feed:{scope}")
+        }
+        if cache_key:
+            set_cached(cache_key, page, FEED_CACHE_TTL)
+        return page
+
+    def _village_page(self, village_id: str, limit: int, start_key: Optional[dict]):
+        query_kwargs = {
+            "IndexName": VILLAGE_INDEX,
+            "KeyConditionExpression": Key("village_id").eq(village_id),
+            "ScanIndexForward": False,
+            "Limit": limit
+        }
+        if start_key:
+            query_kwargs["ExclusiveStartKey"] = start_key
+        response = self.table.query(**query_kwargs)
+        return response.get("Items", []), response.get("LastEvaluatedKey")
+
+    def _global_page(self, limit: int, start_key: Optional[dict]):
+        """Walk day buckets newest-first until the page is full
+
+        A page that runs out of lookback before filling up still returns a cursor
+        (the next day to scan), so a long gap never hides older reports; the feed
+        ends only past FEED_START_DATE.
+        """
+        start_key = dict(start_key or {})
+        bucket = start_key.pop("_bucket", None) or start_key.get("feed_bucket") or feed_bucket(datetime.utcnow().isoformat())
+        exclusive_start = start_key or None
+        day = datetime.strptime(bucket, "%Y-%m-%d")
+        oldest = datetime.strptime(FEED_START_DATE, "%Y-%m-%d")
+        reports = []
+
+        for _ in range(MAX_BUCKET_LOOKBACK):
+            if day < oldest:
+                return reports, None
+            query_kwargs = {
+                "IndexName": BUCKET_INDEX,
+                "KeyConditionExpression": Key("feed_bucket").eq(day.strftime("%Y-%m-%d")),
+                "ScanIndexForward": False,
+                "Limit": limit - len(reports)
+            }
+            if exclusive_start:
+                query_kwargs["ExclusiveStartKey"] = exclusive_start
+            response = self.table.query(**query_kwargs)
+            reports.extend(response.get("Items", []))
+            exclusive_start = response.get("LastEvaluatedKey")
+
+            if len(reports) >= limit:
+                if exclusive_start:
+                    return reports, exclusive_start
+                # Bucket exhausted exactly at the page boundary - resume from the previous day
+                return reports, {"_bucket": (day - timedelta(days=1)).strftime("%Y-%m-%d")}
+            if not exclusive_start:
+                day -= timedelta(days=1)
+
+        if exclusive_start:
+            return reports, exclusive_start
+        return reports, ({"_bucket": day.strftime("%Y-%m-%d")} if day >= oldest else None)
@@ -0,0 +1,110 @@
+"""
+Crop Calendar - per-season, per-language crop lists built once and kept pre-compressed
+The seasonal crop list only changes with the season, the language and the
+calendar file, so it is translated once and stored as a GzipSegment that
+responses splice between their per-user fields
+"""
+
+import asyncio
+import json
+import os
+import threading
+from datetime import datetime
+from typing import Callable, Optional
+
+from http_cache import GzipSegment
+from structured_log import get_logger
+
+log = get_logger("crop_calendar")
+
+CROP_CALENDAR_PATH = "crop_calendar.json"
+TRANSLATED_FIELDS = ("name", "tips", "soil_type", "rainfall")
+
+def _copy(value):
+    """Shallow copy of nested month ranges, so translation never touches the parsed file"""
+    return dict(value) if isinstance(value, dict) else value
+
+class CropCalendar:
+    def __init__(self, translate: Callable[[str, str], str], path: str = CROP_CALENDAR_PATH):
+        """translate(text, language) -> translated text"""
+        self.translate = translate
+        self.path = path
+        self._segments = {}  # (language, season, file mtime) -> GzipSegment
+        self._calendar = (None, None)  # (file mtime, parsed calendar)
+        self._lock = threading.Lock()
+
+    def _load(self) -> dict:
+        mtime = os.path.getmtime(self.path)
+        with self._lock:
+            if self._calendar[0] != mtime:
+                with open(self.path, "r") as f:
+                    self._calendar = (mtime, json.load(f))
+            return self._calendar[1]
+
+    def season(self, now: Optional[datetime] = None) -> str:
+        month = (now or datetime.utcnow()).month
+        return self._load().get("current_season_info", {}).get(str(month), "rabi")
+
+    def seasonal_crops(self, season: str) -> list:
+        """Crops for the season (and year-round crops), in English"""
+        recommended_crops = []
+        for crop_id, crop_info in self._load().get("crops", {}).items():
+            crop_season = crop_info.get("season", "")
+            if crop_season == season or crop_season == "year-round":
+                recommended_crops.append({
+                    "id": crop_id,
+                    "name": crop_info.get("name"),
+                    "hindi": crop_info.get("hindi"),
+                    "planting": _copy(crop_info.get("planting")),
+                    "harvesting": _copy(crop_info.get("harvesting")),
+                    "duration_days": crop_info.get("duration_days"),
+                    "tips": crop_info.get("tips"),
+                    "soil_type": crop_info.get("soil_type", "Well-drained loamy soil"),
+                    "rainfall": crop_info.get("rainfall", "Moderate")
+                })
+        return recommended_crops
+
+    def _translate_crops(self, crops: list, language: str):
+        """Translate the text fields in place; repeated strings (month names...) are translated once"""
+        texts = set()
+        for crop in crops:
+            texts.update(crop[field] for field in TRANSLATED_FIELDS if crop.get(field))
+            for period in ("planting", "harvesting"):
+                if crop.get(period):
+                    texts.update(v for v in (crop[period].get("start"), crop[period].get("end")) if v)
+
+        translated = {text: self.translate(text, language) for text in texts}
+        for crop in crops:
+            for field in TRANSLATED_FIELDS:
+                if crop.get(field):
+                    crop[field] = translated[crop[field]]
+            for period in ("planting", "harvesting"):
+                if crop.get(period):
+                    for end in ("start", "end"):
+                        if crop[period].get(end):
+                            crop[period][end] = translated[crop[period][end]]
+
+    def _build(self, language: str, season: str):
+        """(segment, complete); an incomplete (untranslated) segment is not kept"""
+        crops = self.seasonal_crops(season)
+        complete = True
+        if language != "en" and crops:
+            try:
+                log.info("crop_calendar_translating", crops=len(crops), language=language)
+                self._translate_crops(crops, language)
+                log.info("crop_calendar_translated", language=language)
+            except Exception as e:
+                log.error("crop_calendar_translate_error", language=language, error=e)
+                crops = self.seasonal_crops(season)
+                complete = False
+        return GzipSegment(json.dumps(crops, ensure_ascii=False, separators=(",", ":")).encode("utf-8")), complete
+
+    async def segment(self, language: str, season: str) -> GzipSegment:
+        """Pre-compressed JSON array of the season's crops in `language`"""
+        key = (language, season, os.path.getmtime(self.path))
+        segment = self._segments.get(key)
+        if segment is None:
+            segment, complete = await asyncio.to_thread(self._build, language, season)
+            if complete:
+                self._segments[key] = segment
+        return segment
@@ -0,0 +1,151 @@
+"""
+Crop Catalogue - immutable in-memory snapshot of crop_recommendations
+The catalogue changes rarely, so endpoints read a prebuilt snapshot (lookups
+plus a packed scoring engine) that is swapped atomically when Mongo changes.
+Until the first load finishes the snapshot is empty, so no request waits on Mongo
+"""
+
+import hashlib
+import json
+import re
+import threading
+import time
+from collections import Counter
+
+from pymongo.errors import OperationFailure
+
+from crop_scoring import CropScoringEngine
+from structured_log import get_logger
+
+log = get_logger("crop_catalogue")
+
+POLL_INTERVAL = 60  # seconds between full re-reads, when change streams aren't available
+CHANGE_DEBOUNCE = 5  # seconds of change events folded into one reload (a bulk import is one reload)
+# Words shared by many region names that say nothing about where a crop grows
+GENERIC_TOKENS = {"pradesh", "district", "state", "india", "region", "zone", "and", "of", "the"}
+
+def _normalize(value) -> str:
+    return " ".join(str(value).split()).casefold()
+
+def region_tokens(value) -> set:
+    """Normalized words of a region/climate string, minus generic ones"""
+    words = re.split(r"[^\w]+", _normalize(value))
+    return {w for w in words if w and w not in GENERIC_TOKENS}
+
+def _as_list(value) -> list:
+    if value is None:
+        return []
+    return value if isinstance(value, list) else [value]
+
+class CatalogueSnapshot:
+    """One consistent view of the catalogue; never mutated after construction"""
+
+    def __init__(self, crops: list, version):
+        self.crops = tuple(crops)
+        self.version = version
+        self.engine = CropScoringEngine(list(self.crops))
+        self.region_index = {}  # token -> crop indices, over regions and climate zones
+        for i, crop in enumerate(self.crops):
+            tokens = set()
+            for value in _as_list(crop.get("suitable_regions")) + _as_list(crop.get("climate_zone")):
+                tokens |= region_tokens(value)
+            for token in tokens:
+                self.region_index.setdefault(token, []).append(i)
+
+    def __len__(self) -> int:
+        return len(self.crops)
+
+    def crop(self, index: int) -> dict:
+        """Copy of one crop, safe for callers to annotate"""
+        return dict(self.crops[index])
+
+    def match_regions(self, terms: list, limit: int) -> list:
+        """Crop indices matching any of `terms` (district, state, climate zone...), most matched tokens first"""
+        query_tokens = set()
+        for term in terms:
+            if term:
+                query_tokens |= region_tokens(term)
+        hits = Counter()
+        for token in query_tokens:
+            hits.update(self.region_index.get(token, ()))
+        ranked = sorted(hits.items(), key=lambda hit: (-hit[1], hit[0]))
+        return [index for index, _ in ranked[:limit]]
+
+class CropCatalogue:
+    def __init__(self, collection, poll_interval: int = POLL_INTERVAL, debounce: float = CHANGE_DEBOUNCE):
+        self.collection = collection
+        self.poll_interval = poll_interval
+        self.debounce = debounce
+        self._snapshot = CatalogueSnapshot([], None)
+
+    @property
+    def snapshot(self) -> CatalogueSnapshot:
+        """Current snapshot; empty until the background thread's first load"""
+        return self._snapshot
+
+    @property
+    def loaded(self) -> bool:
+        """True once a load from Mongo has succeeded"""
+        return self._snapshot.version is not None
+
+    def _fetch(self) -> tuple:
+        """(crops, fingerprint): every document, plus a hash of their full contents
+
+        The catalogue is edited outside this service, so nothing guarantees an
+        updated_at or version field; hashing the documents catches in-place edits too.
+        """
+        digest = hashlib.blake2b(digest_size=16)
+        crops = []
+        for crop in self.collection.find({}).sort("_id", 1):
+            digest.update(json.dumps(crop, sort_keys=True, default=str).encode())
+            crop.pop("_id", None)
+            crops.append(crop)
+        return crops, digest.hexdigest()
+
+    def refresh(self) -> bool:
+        """Re-read Mongo and, if anything changed, swap the snapshot in one assignment"""
+        crops, version = self._fetch()
+        if version == self._snapshot.version:
+            return False
+        self._snapshot = CatalogueSnapshot(crops, version)
+        log.info("crop_catalogue_loaded", crops=len(crops))
+        return True
+
+    def _watch(self):
+        """Refresh after change stream events (requires a replica set), at most once per `debounce` seconds"""
+        with self.collection.watch(max_await_time_ms=1000) as stream:
+            pending_since = None
+            while stream.alive:
+                change = stream.try_next()  # None after up to a second without events
+                now = time.monotonic()
+                if change is not None and pending_since is None:
+                    pending_since = now
+                if pending_since is not None and now - pending_since >= self.debounce:
+                    pending_since = None
+                    self.refresh()
+
+    def _poll(self):
+        while True:
+            time.sleep(self.poll_interval)
+            try:
+                self.refresh()
+            except Exception as e:
+                log.error("crop_catalogue_poll_error", error=e)
+
+    def _keep_current(self):
+        try:
+            self.refresh()
+        except Exception as e:
+            log.error("crop_catalogue_load_error", error=e)
+            return self._poll()  # retries the load every poll_interval
+        try:
+            self._watch()
+        except OperationFailure:
+            log.info("crop_catalogue_polling", reason="change streams unavailable")
+        except Exception as e:
+            log.warning("crop_catalogue_watch_error", error=e, fallback="polling")
+        self._poll()
+
+    def start(self):
+        """Keep the snapshot current in a daemon thread: change stream if Mongo supports it, polling otherwise"""
+        threading.Thread(target=self._keep_current, name="crop-catalogue", daemon=True).start()
@@ -0,0 +1,187 @@
+"""
+Crop Scoring - vectorized soil/climate compatibility scoring
+Each crop's optimal_conditions bounds are packed once into NumPy arrays so a
+SoilParams can be scored against the whole catalogue in a single pass, with
+results identical to calculate_compatibility
+"""
+
+import numpy as np
+
+from structured_log import get_logger
+
+log = get_logger("crop_scoring")
+
+# (optimal_conditions prefix, SoilParams attribute, full points, partial tolerance, partial points)
+SCORING_FIELDS = [
+    ("temperature", "temperature", 15, 5, 10),
+    ("humidity", "humidity", 15, 10, 10),
+    ("rainfall", "rainfall", 15, 20, 10),
+    ("nitrogen", "nitrogen", 15, 10, 10),
+    ("phosphorus", "phosphorus", 15, 10, 10),
+    ("potassium", "potassium", 15, 10, 10),
+    ("ph", "ph", 10, 0.5, 7),
+]
+DEFAULT_SCORE = 50
+
+def calculate_compatibility(params, crop: dict) -> int:
+    """Calculate crop compatibility score based on soil parameters (reference, one crop at a time)"""
+    try:
+        optimal = crop.get("optimal_conditions", {})
+        
+        # If no optimal conditions, return default score
+        if not optimal:
+            return 50
+        
+        score = 0
+        checks = 0
+        
+        # Temperature check (15 points)
+        if "temperature_min" in optimal and "temperature_max" in optimal:
+            temp_min, temp_max = optimal["temperature_min"], optimal["temperature_max"]
+            if temp_min <= params.temperature <= temp_max:
+                score += 15
+            elif abs(params.temperature - (temp_min + temp_max) / 2) <= 5:
+                score += 10  # Partial score if close
+            checks += 15
+        
+        # Humidity check (15 points)
+        if "humidity_min" in optimal and "humidity_max" in optimal:
+            hum_min, hum_max = optimal["humidity_min"], optimal["humidity_max"]
+            if hum_min <= params.humidity <= hum_max:
+                score += 15
+            elif abs(params.humidity - (hum_min + hum_max) / 2) <= 10:
+                score += 10
+            checks += 15
+        
+        # Rainfall check (15 points)
+        if "rainfall_min" in optimal and "rainfall_max" in optimal:
+            rain_min, rain_max = optimal["rainfall_min"], optimal["rainfall_max"]
+            if rain_min <= params.rainfall <= rain_max:
+                score += 15
+            elif abs(params.rainfall - (rain_min + rain_max) / 2) <= 20:
+                score += 10
+            checks += 15
+        
+        # Nitrogen check (15 points)
+        if "nitrogen_min" in optimal and "nitrogen_max" in optimal:
+            n_min, n_max = optimal["nitrogen_min"], optimal["nitrogen_max"]
+            if n_min <= params.nitrogen <= n_max:
+                score += 15
+            elif abs(params.nitrogen - (n_min + n_max) / 2) <= 10:
+                score += 10
+            checks += 15
+        
+        # Phosphorus check (15 points)
+        if "phosphorus_min" in optimal and "phosphorus_max" in optimal:
+            p_min, p_max = optimal["phosphorus_min"], optimal["phosphorus_max"]
+            if p_min <= params.phosphorus <= p_max:
+                score += 15
+            elif abs(params.phosphorus - (p_min + p_max) / 2) <= 10:
+                score += 10
+            checks += 15
+        
+        # Potassium check (15 points)
+        if "potassium_min" in optimal and "potassium_max" in optimal:
+            k_min, k_max = optimal["potassium_min"], optimal["potassium_max"]
+            if k_min <= params.potassium <= k_max:
+                score += 15
+            elif abs(params.potassium - (k_min + k_max) / 2) <= 10:
+                score += 10
+            checks += 15
+        
+        # pH check (10 points)
+        if "ph_min" in optimal and "ph_max" in optimal:
+            ph_min, ph_max = optimal["ph_min"], optimal["ph_max"]
+            if ph_min <= params.ph <= ph_max:
+                score += 10
+            elif abs(params.ph - (ph_min + ph_max) / 2) <= 0.5:
+                score += 7
+            checks += 10
+        
+        return int((score / checks) * 100) if checks > 0 else 50
+    except Exception as e:
+        log.error("compatibility_calculation_error", error=e)
+        return 50
+
+
+def _is_number(value) -> bool:
+    return isinstance(value, (int, float))
+
+class CropScoringEngine:
+    def __init__(self, crops: list):
+        """Pack optimal_conditions for `crops` (kept in catalogue order)"""
+        self.crops = crops
+        n, f = len(crops), len(SCORING_FIELDS)
+        self.mins = np.zeros((n, f))
+        self.maxs = np.zeros((n, f))
+        self.mask = np.zeros((n, f), dtype=bool)
+        # Crops the reference scorer gives DEFAULT_SCORE regardless of params
+        self.fixed = np.zeros(n, dtype=bool)
+
+        for i, crop in enumerate(crops):
+            optimal = crop.get("optimal_conditions", {})
+            if not optimal or not isinstance(optimal, dict):
+                self.fixed[i] = True
+                continue
+            for j, (prefix, _, _, _, _) in enumerate(SCORING_FIELDS):
+                lo_key, hi_key = f"{prefix}_min", f"{prefix}_max"
+                if lo_key in optimal and hi_key in optimal:
+                    lo, hi = optimal[lo_key], optimal[hi_key]
+                    if not (_is_number(lo) and _is_number(hi)):
+                        self.fixed[i] = True  # reference raises and falls back to the default
+                        break
+                    self.mins[i, j], self.maxs[i, j], self.mask[i, j] = lo, hi, True
+
+        self.mids = (self.mins + self.maxs) / 2
+        self.full_points = np.array([field[2] for field in SCORING_FIELDS])
+        self.tolerance = np.array([field[3] for field in SCORING_FIELDS], dtype=float)
+        self.partial_points = np.array([field[4] for field in SCORING_FIELDS])
+        self.checks = (self.mask * self.full_points).sum(axis=1)
+
+    def __len__(self) -> int:
+        return len(self.crops)
+
+    @staticmethod
+    def param_vector(params) -> np.ndarray:
+        return np.array([getattr(params, field[1]) for field in SCORING_FIELDS], dtype=float)
+
+    def score_vectors(self, values: np.ndarray) -> np.ndarray:
+        """Scores for an (m, fields) block of parameter rows -> (m, crops) int array"""
+        values = values[:, None, :]
+        inside = (self.mins <= values) & (values <= self.maxs)
+        near = np.abs(values - self.mids) <= self.tolerance
+        points = np.where(inside, self.full_points, np.where(near, self.partial_points, 0)) * self.mask
+        score = points.sum(axis=2)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            scores = np.trunc((score / self.checks) * 100)
+        scores = np.where((self.checks > 0) & ~self.fixed, scores, DEFAULT_SCORE)
+        return scores.astype(np.int64)
+
+    def score(self, params) -> np.ndarray:
+        """Compatibility score of every crop for one SoilParams"""
+        return self.score_vectors(self.param_vector(params)[None, :])[0]
+
+    def top_k(self, params, k: int) -> list:
+        """[(crop index, score)] best first, ties in catalogue order like a stable sort"""
+        return top_k_indices(self.score(params), k)
+
+def top_k_indices(scores: np.ndarray, k: int) -> list:
+    """Top-k of a score vector via argpartition, ordered by (-score, index)"""
+    n = len(scores)
+    k = min(k, n)
+    if k <= 0:
+        return []
+    if k < n:
+        threshold = scores[np.argpartition(-scores, k - 1)[:k]].min()
+        candidates = np.flatnonzero(scores >= threshold)
+    else:
+        candidates = np.arange(n)
+    order = candidates[np.lexsort((candidates, -scores[candidates]))][:k]
+    return [(int(i), int(scores[i])) for i in order]
+
+def score_batch(engine: CropScoringEngine, params_rows: list, k: int) -> list:
+    """Top-k [(crop index, score)] for many SoilParams at once, scored as one (rows x crops) matrix"""
+    if not params_rows or not len(engine):
+        return [[] for _ in params_rows]
+    values = np.array([[getattr(p, field[1]) for field in SCORING_FIELDS] for p in params_rows], dtype=float)
+    return [top_k_indices(row, k) for row in engine.score_vectors(values)]
@@ -5,17 +5,23 @@ This ensures LLM responses are based on actual data, not hallucinations
 
 from pymongo import MongoClient
 from datetime import datetime, timedelta
-import requests
 import os
 import asyncio
 from functools import lru_cache
 import hashlib
 import json
+from cache_backend import create_cache_backend
+from metrics import http_session, record_cache, span
+from structured_log import get_logger
 
-# Simple in-memory cache with TTL
-_cache = {}
-_cache_ttl = {}
+log = get_logger("data_aggregator")
+
+http = http_session()
+
+# TTL cache: in this process, or shared by every worker when CACHE_URL is set
+cache_backend = create_cache_backend()
 CACHE_DURATION = 300  # 5 minutes
+GENERATION_TTL = 24 * 3600  # outlives every cached entry, so a reset generation can't revive one
 
 def get_cache_key(prefix: str, location: str) -> str:
     """Generate cache key"""
@@ -23,18 +29,20 @@ def get_cache_key(prefix: str, location: str) -> str:
 
 def get_cached(key: str):
     """Get cached data if not expired"""
-    if key in _cache:
-        if datetime.utcnow().timestamp() < _cache_ttl.get(key, 0):
-            return _cache[key]
-        else:
-            del _cache[key]
-            del _cache_ttl[key]
-    return None
+    value = cache_backend.get(key)
+    record_cache(key.split(":", 1)[0], value is not None)
+    return value
 
 def set_cached(key: str, value, ttl: int = CACHE_DURATION):
     """Set cached data with TTL"""
-    _cache[key] = value
-    _cache_ttl[key] = datetime.utcnow().timestamp() + ttl
+    cache_backend.set(key, value, ttl)
+
+def cache_generation(scope: str) -> int:
+    """Generation to build a scope's cache keys from; bumping it orphans the old keys"""
+    return cache_backend.counter(f"generation:{scope}")
+
+def bump_cache_generation(scope: str):
+    cache_backend.incr(f"generation:{scope}", GENERATION_TTL)
 
 async def fetch_all_context_data_async(user_location: str, query: str) -> dict:
     """Async version - fetch data in parallel"""
@@ -90,7 +98,8 @@ async def fetch_hyperlocal_data(user_location: str):
         elif len(location_parts) == 1:
             query_filter = {"$or": [{"district": {"$regex": location_parts[0], "$options": "i"}}, {"state": {"$regex": location_parts[0], "$options": "i"}}]}
         
-        hyperlocal_data = db.hyperlocal_context.find_one(query_filter)
+        with span("context_hyperlocal"):
+            hyperlocal_data = db.hyperlocal_context.find_one(query_filter)
         
         if hyperlocal_data:
             month = datetime.utcnow().month
@@ -101,6 +110,7 @@ async def fetch_hyperlocal_data(user_location: str):
                 "state": hyperlocal_data.get("state"),
                 "soil_type": hyperlocal_data.get("soil_type"),
                 "rainfall": hyperlocal_data.get("rainfall"),
+                "climate_zone": hyperlocal_data.get("climate_zone"),
                 "current_season": season,
                 "recommended_crops": hyperlocal_data.get("crops", {}).get(season, []),
                 "all_crops": hyperlocal_data.get("crops", {}),
@@ -114,7 +124,7 @@ async def fetch_hyperlocal_data(user_location: str):
             set_cached(cache_key, result, 600)  # Cache for 10 minutes
             return result
     except Exception as e:
-        print(f"Hyperlocal fetch error: {e}")
+        log.error("hyperlocal_fetch_error", error=e)
     return None
 
 async def fetch_weather_data(user_location: str):
@@ -130,7 +140,8 @@ async def fetch_weather_data(user_location: str):
         
         if api_key:
             url = f"https://api.openweathermap.org/data/2.5/weather?q={city}&appid={api_key}&units=metric"
-            res = requests.get(url, timeout=5)  # Reduced timeout
+            with span("context_weather"):
+                res = http.get(url, timeout=5)  # Reduced timeout
             
             if res.status_code == 200:
                 data = res.json()
@@ -145,7 +156,7 @@ async def fetch_weather_data(user_location: str):
                 set_cached(cache_key, result, 300)  # Cache for 5 minutes
                 return result
     except Exception as e:
-        print(f"Weather fetch error: {e}")
+        log.error("weather_fetch_error", error=e)
     return None
 
 async def fetch_pest_disease_data(user_location: str):
@@ -163,13 +174,14 @@ async def fetch_pest_disease_data(user_location: str):
         state_query = location_parts[1] if len(location_parts) > 1 else location_parts[0]
         
         # Only fetch top 3 most relevant
-        govt_pest_reports = list(db.pest_reports.find({
-            "state": {"$regex": state_query, "$options": "i"}
-        }).limit(3))
-        
-        govt_disease_reports = list(db.disease_reports.find({
-            "state": {"$regex": state_query, "$options": "i"}
-        }).limit(3))
+        with span("context_pests"):
+            govt_pest_reports = list(db.pest_reports.find({
+                "state": {"$regex": state_query, "$options": "i"}
+            }).limit(3))
+            
+            govt_disease_reports = list(db.disease_reports.find({
+                "state": {"$regex": state_query, "$options": "i"}
+            }).limit(3))
         
         result = {
             "pests": [{"pest_name": r.get("pest_name"), "crop": r.get("crop"), "severity": r.get("severity"), "description": r.get("description"), "source": "Government Data"} for r in govt_pest_reports],
@@ -179,7 +191,7 @@ async def fetch_pest_disease_data(user_location: str):
         set_cached(cache_key, result, 600)  # Cache for 10 minutes
         return result
     except Exception as e:
-        print(f"Pest/disease fetch error: {e}")
+        log.error("pest_disease_fetch_error", error=e)
     return {"pests": [], "diseases": []}
 
 def get_crop_prices(user_location: str):
@@ -208,7 +220,7 @@ def fetch_all_context_data(user_location: str, query: str) -> dict:
             finally:
                 loop.close()
     except Exception as e:
-        print(f"Async fetch error: {e}")
+        log.error("async_fetch_error", error=e)
         # Fallback to sync version
         return fetch_context_sync(user_location, query)
 
@@ -231,7 +243,8 @@ def fetch_context_sync(user_location: str, query: str) -> dict:
         
         # Only hyperlocal data
         query_filter = {"$or": [{"district": {"$regex": location_parts[0], "$options": "i"}}]} if location_parts else {}
-        hyperlocal_data = db.hyperlocal_context.find_one(query_filter)
+        with span("context_hyperlocal"):
+            hyperlocal_data = db.hyperlocal_context.find_one(query_filter)
         
         if hyperlocal_data:
             month = datetime.utcnow().month
@@ -244,7 +257,7 @@ def fetch_context_sync(user_location: str, query: str) -> dict:
                 "recommended_crops": hyperlocal_data.get("crops", {}).get(season, [])
             }
     except Exception as e:
-        print(f"Sync fetch error: {e}")
+        log.error("sync_fetch_error", error=e)
     
     return context
 
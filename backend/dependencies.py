@@ -0,0 +1,137 @@
+"""
+Dependencies - lazily built external clients, warmed up concurrently at startup
+Nothing is constructed at import: each client is built on first use or by
+warm_up() in the lifespan hook, and readiness reports which ones came up
+"""
+
+import asyncio
+import threading
+import time
+from typing import Callable, Iterable, Optional
+
+from structured_log import get_logger
+
+log = get_logger("dependencies")
+
+class Dependencies:
+    """Named client factories; each client is built once, on first get()"""
+
+    def __init__(self):
+        self._factories = {}  # name -> (factory, check, close)
+        self._required = set()
+        self._locks = {}
+        self._instances = {}
+        self._errors = {}
+        self._build_seconds = {}
+        self._warm_task = None
+        self.warmed_up = False
+
+    def register(self, name: str, factory: Callable, required: bool = True,
+                 check: Optional[Callable] = None, close: Optional[Callable] = None):
+        """`check(client)` runs once after warm-up builds the client (e.g. a ping); `close(client)` at shutdown"""
+        self._factories[name] = (factory, check, close)
+        self._locks[name] = threading.Lock()
+        if required:
+            self._required.add(name)
+
+    def get(self, name: str):
+        instance = self._instances.get(name)
+        if instance is not None:
+            return instance
+        with self._locks[name]:  # concurrent first users wait for one build
+            if name not in self._instances:
+                start = time.perf_counter()
+                try:
+                    self._instances[name] = self._factories[name][0]()
+                except Exception as e:
+                    self._errors[name] = e
+                    raise
+                self._errors.pop(name, None)
+                self._build_seconds[name] = time.perf_counter() - start
+            return self._instances[name]
+
+    def lazy(self, name: str, resolve: Optional[Callable] = None) -> "LazyDependency":
+        """Module-level stand-in for the client (or `resolve(client)`, e.g. one table of it)"""
+        return LazyDependency(self, name, resolve)
+
+    def _build_and_check(self, name: str):
+        check = self._factories[name][1]
+        instance = self.get(name)
+        if check is not None:
+            try:
+                check(instance)
+            except Exception as e:
+                self._errors[name] = e
+                raise
+            self._errors.pop(name, None)
+        return instance
+
+    async def warm_up(self, names: Optional[Iterable[str]] = None):
+        """Build (and check) clients concurrently in worker threads; failures are logged, not raised"""
+        names = list(names or self._factories)
+        start = time.perf_counter()
+        results = await asyncio.gather(*(asyncio.to_thread(self._build_and_check, name) for name in names), return_exceptions=True)
+        failed = [name for name, result in zip(names, results) if isinstance(result, Exception)]
+        for name in failed:
+            log.error("dependency_unavailable", dependency=name, error=self._errors.get(name))
+        self.warmed_up = True
+        log.info("dependencies_warmed_up", seconds=round(time.perf_counter() - start, 3),
+                 built=len(names) - len(failed), failed=failed)
+
+    def start_warm_up(self, names: Optional[Iterable[str]] = None):
+        """Run warm_up() in the background unless one is already running"""
+        if self._warm_task is None or self._warm_task.done():
+            self._warm_task = asyncio.create_task(self.warm_up(names))
+        return self._warm_task
+
+    def status(self) -> dict:
+        dependencies = {}
+        for name in self._factories:
+            if name in self._errors:
+                entry = {"status": "failed", "error": f"{type(self._errors[name]).__name__}: {self._errors[name]}"}
+            elif name in self._instances:
+                entry = {"status": "ready", "build_ms": round(self._build_seconds[name] * 1000, 1)}
+            else:
+                entry = {"status": "pending"}
+            entry["required"] = name in self._required
+            dependencies[name] = entry
+        ready = self.warmed_up and all(dependencies[name]["status"] == "ready" for name in self._required)
+        return {"ready": ready, "dependencies": dependencies}
+
+    def failed(self, required_only: bool = True) -> list:
+        return [name for name in self._errors if name in self._required or not required_only]
+
+    def close(self):
+        for name, (_, _, close) in self._factories.items():
+            instance = self._instances.pop(name, None)
+            if instance is not None and close is not None:
+                try:
+                    close(instance)
+                except Exception as e:
+                    log.warning("dependency_close_failed", dependency=name, error=e)
+
+class LazyDependency:
+    """Forwards attribute access to the dependency, building it on first use"""
+
+    __slots__ = ("_dependencies", "_name", "_resolve", "_target")
+
+    def __init__(self, dependencies: Dependencies, name: str, resolve: Optional[Callable] = None):
+        self._dependencies = dependencies
+        self._name = name
+        self._resolve = resolve
+        self._target = None
+
+    def _get(self):
+        target = self._target
+        if target is None:
+            target = self._dependencies.get(self._name)
+            if self._resolve is not None:
+                target = self._resolve(target)
+            self._target = target
+        return target
+
+    def __getattr__(self, attribute):
+        return getattr(self._get(), attribute)
+
+    def __repr__(self):
+        return f"<lazy {self._name}>"
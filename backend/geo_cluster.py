@@ -0,0 +1,136 @@
+"""
+Geo Cluster - incremental spatial clustering of pest outbreak reports
+Reports are bucketed into a fixed lat/lon grid per pest and per day; clusters
+are found DBSCAN-style over grid cells, so adding a report is O(1) and
+clustering cost depends on occupied cells, not on the number of reports
+"""
+
+import math
+import threading
+from collections import defaultdict, deque
+from datetime import datetime
+from typing import Optional
+
+EARTH_RADIUS_KM = 6371.0
+KM_PER_DEGREE = 111.32
+CELL_KM = 5.0
+MIN_REPORTS = 3
+MAX_WINDOW_DAYS = 30
+
+def pest_key(pest: Optional[str]) -> str:
+    """Canonical pest name: what reports are stored, counted and clustered under"""
+    return " ".join((pest or "").split()).lower()
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Great-circle distance in km"""
+    p1, p2 = math.radians(lat1), math.radians(lat2)
+    dp, dl = p2 - p1, math.radians(lon2 - lon1)
+    a = math.sin(dp / 2) ** 2 + math.cos(p1) * math.cos(p2) * math.sin(dl / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a))
+
+def geo_point(latitude: float, longitude: float) -> dict:
+    """GeoJSON point as stored on pest_outbreaks (longitude first)"""
+    return {"type": "Point", "coordinates": [longitude, latitude]}
+
+def within_km_filter(latitude: float, longitude: float, radius_km: float) -> dict:
+    """$geoWithin filter for the 2dsphere index on pest_outbreaks.geo"""
+    return {"$geoWithin": {"$centerSphere": [[longitude, latitude], radius_km / EARTH_RADIUS_KM]}}
+
+class OutbreakClusterEngine:
+    def __init__(self, cell_km: float = CELL_KM, min_reports: int = MIN_REPORTS, max_window_days: int = MAX_WINDOW_DAYS):
+        self.cell_deg = cell_km / KM_PER_DEGREE
+        self.min_reports = min_reports
+        self.max_window_days = max_window_days
+        # pest -> cell -> day ordinal -> [count, sum_lat, sum_lon]
+        self._cells = defaultdict(lambda: defaultdict(dict))
+        self._lock = threading.Lock()
+        self._pruned_day = datetime.utcnow().toordinal()
+
+    def _cell(self, latitude: float, longitude: float) -> tuple:
+        return (math.floor(latitude / self.cell_deg), math.floor(longitude / self.cell_deg))
+
+    def add(self, pest: str, latitude: float, longitude: float, ts: Optional[datetime] = None):
+        """Fold one report into its grid cell"""
+        day = (ts or datetime.utcnow()).toordinal()
+        if day > self._pruned_day:
+            self._pruned_day = day
+            self.prune()
+        with self._lock:
+            days = self._cells[pest_key(pest)][self._cell(latitude, longitude)]
+            stats = days.get(day)
+            if stats is None:
+                days[day] = [1, latitude, longitude]
+            else:
+                stats[0] += 1
+                stats[1] += latitude
+                stats[2] += longitude
+
+    def prune(self, now: Optional[datetime] = None):
+        """Forget days that fell out of the longest supported window"""
+        oldest = (now or datetime.utcnow()).toordinal() - self.max_window_days
+        with self._lock:
+            for cells in self._cells.values():
+                for cell in list(cells):
+                    days = cells[cell]
+                    for day in [d for d in days if d <= oldest]:
+                        del days[day]
+                    if not days:
+                        del cells[cell]
+
+    def _window_stats(self, pest: str, days: int, now: Optional[datetime]) -> dict:
+        """cell -> [count, sum_lat, sum_lon] over the last `days` days"""
+        since = (now or datetime.utcnow()).toordinal() - days
+        stats = {}
+        with self._lock:
+            for cell, by_day in self._cells.get(pest_key(pest), {}).items():
+                total = [0, 0.0, 0.0]
+                for day, (count, sum_lat, sum_lon) in by_day.items():
+                    if day > since:
+                        total[0] += count
+                        total[1] += sum_lat
+                        total[2] += sum_lon
+                if total[0]:
+                    stats[cell] = total
+        return stats
+
+    def clusters(self, pest: str, days: int = 7, now: Optional[datetime] = None) -> list:
+        """Density-based clusters: a cell is core when its 3x3 neighbourhood holds min_reports"""
+        stats = self._window_stats(pest, min(days, self.max_window_days), now)
+
+        def neighbours(cell):
+            i, j = cell
+            return [(i + di, j + dj) for di in (-1, 0, 1) for dj in (-1, 0, 1) if (i + di, j + dj) in stats]
+
+        core = {c for c in stats if sum(stats[n][0] for n in neighbours(c)) >= self.min_reports}
+        seen = set()
+        clusters = []
+        for start in core:
+            if start in seen:
+                continue
+            members = set()
+            queue = deque([start])
+            seen.add(start)
+            while queue:
+                cell = queue.popleft()
+                members.add(cell)
+                if cell not in core:
+                    continue  # border cell: part of the cluster but doesn't expand it
+                for n in neighbours(cell):
+                    if n not in seen:
+                        seen.add(n)
+                        queue.append(n)
+
+            count = sum(stats[c][0] for c in members)
+            lat = sum(stats[c][1] for c in members) / count
+            lon = sum(stats[c][2] for c in members) / count
+            radius = max(haversine_km(lat, lon, stats[c][1] / stats[c][0], stats[c][2] / stats[c][0]) for c in members)
+            clusters.append({
+                "pest_name": pest,
+                "center": {"latitude": round(lat, 5), "longitude": round(lon, 5)},
+                "report_count": count,
+                "radius_km": round(radius + self.cell_deg * KM_PER_DEGREE / 2, 1),
+                "cells": len(members)
+            })
+
+        clusters.sort(key=lambda c: c["report_count"], reverse=True)
+        return clusters
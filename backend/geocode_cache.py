@@ -0,0 +1,189 @@
+"""
+Geocode Cache - reverse geocoding answered from geohash cells instead of Nominatim
+Coordinates are quantized to a geohash cell; each cell is resolved once
+(concurrent lookups share one call), outbound calls are queued behind a global
+rate limiter (Nominatim allows ~1 req/s) and answers are persisted to disk.
+With a shared cache backend the limit and the resolved cells span all workers.
+When the queue is full a lookup gets the district/state of a nearby cached cell
+"""
+
+import asyncio
+import json
+import os
+import tempfile
+import threading
+import time
+from typing import Callable, Optional, Tuple
+
+from cache_backend import CacheBackend
+from metrics import record_cache
+from structured_log import get_logger
+
+log = get_logger("geocode_cache")
+
+GEOCODE_CACHE_PATH = os.getenv("GEOCODE_CACHE_PATH", "reverse_geocode_cache.json")
+GEOCODE_PRECISION = int(os.getenv("GEOCODE_PRECISION", "7"))  # 7 chars ~ 150m x 150m
+NOMINATIM_RATE = 1.0  # requests per second, per the Nominatim usage policy
+SHARED_CELL_TTL = 30 * 24 * 3600  # addresses barely change; the disk file is per worker
+GEOCODE_MAX_QUEUE = int(os.getenv("GEOCODE_MAX_QUEUE", "3"))  # lookups waiting for Nominatim; ~1 s each
+COARSE_PRECISION = 5  # ~5 km cells: close enough for district and state, not for the village
+COARSE_PARTS = ("state_district", "state")
+GEOHASH_ALPHABET = "0123456789bcdefghjkmnpqrstuvwxyz"
+
+def geohash_encode(latitude: float, longitude: float, precision: int = GEOCODE_PRECISION) -> str:
+    lat_range, lon_range = [-90.0, 90.0], [-180.0, 180.0]
+    chars = []
+    bits, bit_count, even = 0, 0, True
+    while len(chars) < precision:
+        rng, value = (lon_range, longitude) if even else (lat_range, latitude)
+        mid = (rng[0] + rng[1]) / 2
+        if value >= mid:
+            bits = (bits << 1) | 1
+            rng[0] = mid
+        else:
+            bits <<= 1
+            rng[1] = mid
+        even = not even
+        bit_count += 1
+        if bit_count == 5:
+            chars.append(GEOHASH_ALPHABET[bits])
+            bits, bit_count = 0, 0
+    return "".join(chars)
+
+def geohash_center(geohash: str) -> Tuple[float, float]:
+    """(latitude, longitude) at the middle of a geohash cell"""
+    lat_range, lon_range = [-90.0, 90.0], [-180.0, 180.0]
+    even = True
+    for char in geohash:
+        bits = GEOHASH_ALPHABET.index(char)
+        for shift in range(4, -1, -1):
+            rng = lon_range if even else lat_range
+            mid = (rng[0] + rng[1]) / 2
+            if (bits >> shift) & 1:
+                rng[0] = mid
+            else:
+                rng[1] = mid
+            even = not even
+    return (lat_range[0] + lat_range[1]) / 2, (lon_range[0] + lon_range[1]) / 2
+
+class RateLimiter:
+    """Spaces calls at least 1/rate seconds apart; callers queue in arrival order
+
+    With a shared backend each call also claims the slot there, so the rate
+    holds across every worker process, not just this one. With max_waiting set,
+    a caller arriving when that many are already queued gets asyncio.QueueFull.
+    """
+
+    def __init__(self, rate: float, shared: Optional[CacheBackend] = None, name: str = "nominatim",
+                 max_waiting: Optional[int] = None):
+        self.interval = 1.0 / rate
+        self.shared = shared if shared is not None and shared.shared else None
+        self.key = f"ratelimit:{name}"
+        self.max_waiting = max_waiting
+        self.waiting = 0
+        self._next_slot = 0.0
+        self._lock = asyncio.Lock()
+
+    async def wait(self):
+        if self.max_waiting is not None and self.waiting >= self.max_waiting:
+            raise asyncio.QueueFull
+        self.waiting += 1
+        try:
+            async with self._lock:
+                delay = self._next_slot - time.monotonic()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                while self.shared is not None:
+                    delay = self.shared.claim(self.key, self.interval)
+                    if delay <= 0:
+                        break
+                    await asyncio.sleep(delay)
+                self._next_slot = time.monotonic() + self.interval
+        finally:
+            self.waiting -= 1
+
+class ReverseGeocodeCache:
+    def __init__(self, fetch: Callable[[float, float], Optional[dict]], precision: int = GEOCODE_PRECISION,
+                 path: str = GEOCODE_CACHE_PATH, rate: float = NOMINATIM_RATE, cache: Optional[CacheBackend] = None,
+                 max_queue: int = GEOCODE_MAX_QUEUE):
+        """fetch(latitude, longitude) -> address parts ({} if none), None on failure; blocking"""
+        self.fetch = fetch
+        self.precision = precision
+        self.path = path
+        self.shared = cache if cache is not None and cache.shared else None
+        self.limiter = RateLimiter(rate, cache, max_waiting=max_queue)
+        self._cells = {}  # geohash -> address parts
+        self._coarse = {}  # COARSE_PRECISION geohash -> district/state of a cell inside it
+        self._inflight = {}  # geohash -> resolve task, so a cell is fetched once at a time
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()
+        self._load()
+
+    def _load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                self._cells = json.load(f)
+        except FileNotFoundError:
+            self._cells = {}
+        except Exception as e:
+            log.error("geocode_cache_load_error", error=e)
+            self._cells = {}
+        for cell, address in self._cells.items():
+            self._remember_coarse(cell, address)
+
+    def _remember_coarse(self, cell: str, address: dict):
+        coarse = {part: address[part] for part in COARSE_PARTS if address.get(part)}
+        if coarse:
+            self._coarse[cell[:COARSE_PRECISION]] = coarse
+
+    def _save(self):
+        with self._save_lock:  # serializes writers, so a newer snapshot is never overwritten by an older one
+            with self._lock:
+                data = json.dumps(self._cells, ensure_ascii=False, sort_keys=True)
+            # mkstemp: every worker process writes the file, each through its own temp file
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(self.path)), prefix=".geocode.", suffix=".tmp")
+            try:
+                with os.fdopen(fd, "w", encoding="utf-8") as f:
+                    f.write(data)
+                os.replace(tmp_path, self.path)
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+
+    async def lookup(self, latitude: float, longitude: float) -> Optional[dict]:
+        """Address parts for the cell containing the point; None if Nominatim couldn't answer"""
+        cell = geohash_encode(latitude, longitude, self.precision)
+        address = self._cells.get(cell)
+        record_cache("reverse_geocode", address is not None)
+        if address is not None:
+            return address
+
+        task = self._inflight.get(cell)
+        if task is None:
+            task = asyncio.create_task(self._resolve(cell))
+            self._inflight[cell] = task
+            task.add_done_callback(lambda _: self._inflight.pop(cell, None))
+        return await asyncio.shield(task)
+
+    async def _resolve(self, cell: str) -> Optional[dict]:
+        address = self.shared.get(f"geocode:{cell}") if self.shared is not None else None
+        if address is None:
+            try:
+                await self.limiter.wait()
+            except asyncio.QueueFull:
+                # Shed rather than queue for many seconds; not stored, so a later lookup asks Nominatim
+                coarse = self._coarse.get(cell[:COARSE_PRECISION])
+                record_cache("reverse_geocode_coarse", coarse is not None)
+                return coarse
+            address = await asyncio.to_thread(self.fetch, *geohash_center(cell))
+            if address is not None and self.shared is not None:
+                self.shared.set(f"geocode:{cell}", address, SHARED_CELL_TTL)
+        if address is not None:
+            with self._lock:
+                self._cells[cell] = address
+                self._remember_coarse(cell, address)
+            try:
+                await asyncio.to_thread(self._save)
+            except Exception as e:
+                log.error("geocode_cache_save_error", error=e)
+        return address
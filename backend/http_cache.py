@@ -0,0 +1,179 @@
+"""
+HTTP Cache - conditional requests (ETag / If-None-Match -> 304) and compression
+Read-mostly JSON endpoints get a strong, content-derived ETag, a per-route
+Cache-Control policy and gzip/brotli encoding, so repeat polls over slow
+links cost a 304 instead of the full body
+"""
+
+import gzip
+import hashlib
+import struct
+import zlib
+from collections import OrderedDict
+from typing import Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.responses import Response
+
+from metrics import record_cache
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESS_MIN_BYTES = 1024  # smaller bodies aren't worth the CPU or the header overhead
+COMPRESSED_CACHE_SIZE = 256  # compressed bodies kept per (etag, encoding)
+GZIP_HEADER = b"\x1f\x8b\x08\x00\x00\x00\x00\x00\x00\xff"
+
+def content_etag(body: bytes) -> str:
+    """Strong ETag derived from the exact bytes of the identity representation"""
+    return f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+
+def encoded_etag(etag: str, encoding: Optional[str]) -> str:
+    """Distinct strong ETag per content coding (a gzip body is a different representation)"""
+    return f'{etag[:-1]}-{encoding}"' if encoding else etag
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    tags = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in tags or etag in tags or f"W/{etag}" in tags
+
+def accepted_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    """Best content coding the client accepts: br (if brotli is installed), then gzip"""
+    accepted = set()
+    for part in (accept_encoding or "").lower().split(","):
+        coding, _, params = part.partition(";")
+        name, _, value = params.strip().partition("=")
+        try:
+            q = float(value) if name.strip() == "q" else 1.0
+        except ValueError:
+            q = 1.0
+        if q > 0:
+            accepted.add(coding.strip())
+    if brotli and ("br" in accepted or "*" in accepted):
+        return "br"
+    if "gzip" in accepted or "*" in accepted:
+        return "gzip"
+    return None
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=5)
+    return gzip.compress(body, compresslevel=6, mtime=0)
+
+class GzipSegment:
+    """A JSON fragment deflated once, ready to be spliced into any gzip response
+
+    The fragment is compressed with a full flush, so it doesn't refer back to
+    earlier bytes and can sit between independently compressed prefix/suffix bytes.
+    """
+
+    def __init__(self, raw: bytes):
+        self.raw = raw
+        self.digest = hashlib.blake2b(raw, digest_size=16).digest()
+        deflater = zlib.compressobj(6, zlib.DEFLATED, -15)
+        self.deflated = deflater.compress(raw) + deflater.flush(zlib.Z_FULL_FLUSH)
+
+def splice_gzip(prefix: bytes, segment: GzipSegment, suffix: bytes) -> bytes:
+    """gzip of prefix + segment.raw + suffix, compressing only prefix and suffix"""
+    head = zlib.compressobj(6, zlib.DEFLATED, -15)
+    tail = zlib.compressobj(6, zlib.DEFLATED, -15)
+    crc = zlib.crc32(suffix, zlib.crc32(segment.raw, zlib.crc32(prefix)))
+    size = len(prefix) + len(segment.raw) + len(suffix)
+    return b"".join((
+        GZIP_HEADER,
+        head.compress(prefix), head.flush(zlib.Z_FULL_FLUSH),
+        segment.deflated,
+        tail.compress(suffix), tail.flush(zlib.Z_FINISH),
+        struct.pack("<II", crc & 0xFFFFFFFF, size & 0xFFFFFFFF)
+    ))
+
+def spliced_json_response(prefix: bytes, segment: GzipSegment, suffix: bytes, accept_encoding: Optional[str]) -> Response:
+    """JSON response of prefix + segment + suffix, gzipped around the pre-compressed segment when accepted"""
+    etag = f'"{hashlib.blake2b(prefix + segment.digest + suffix, digest_size=16).hexdigest()}"'
+    headers = {"Vary": "Accept-Encoding"}
+    if "gzip" in (accept_encoding or "").lower():
+        headers.update({"Content-Encoding": "gzip", "ETag": encoded_etag(etag, "gzip")})
+        return Response(splice_gzip(prefix, segment, suffix), media_type="application/json", headers=headers)
+    headers["ETag"] = etag
+    return Response(prefix + segment.raw + suffix, media_type="application/json", headers=headers)
+
+class ConditionalCacheMiddleware:
+    """ASGI middleware adding ETag/304, Cache-Control and compression to listed GET routes
+
+    policies maps a path to its Cache-Control value. Handlers may set their own
+    ETag (from a content version) or return an already-encoded body; both are kept.
+    """
+
+    def __init__(self, app, policies: dict, min_size: int = COMPRESS_MIN_BYTES):
+        self.app = app
+        self.policies = policies
+        self.min_size = min_size
+        self._compressed = OrderedDict()  # (etag, encoding) -> body
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] not in ("GET", "HEAD") or scope["path"] not in self.policies:
+            await self.app(scope, receive, send)
+            return
+
+        start = None
+        chunks = []
+
+        async def capture(message):
+            nonlocal start
+            if message["type"] == "http.response.start":
+                start = message
+            elif message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+
+        await self.app(scope, receive, capture)
+        if start is not None:
+            await self._respond(scope, send, start, b"".join(chunks))
+
+    def _compress(self, etag: str, body: bytes, encoding: str) -> bytes:
+        key = (etag, encoding)
+        record_cache("compressed_body", key in self._compressed)
+        if key in self._compressed:
+            self._compressed.move_to_end(key)
+            return self._compressed[key]
+        compressed = compress(body, encoding)
+        self._compressed[key] = compressed
+        if len(self._compressed) > COMPRESSED_CACHE_SIZE:
+            self._compressed.popitem(last=False)
+        return compressed
+
+    async def _respond(self, scope, send, start, body: bytes):
+        headers = MutableHeaders(raw=list(start["headers"]))
+        if start["status"] != 200:
+            await send(start)
+            await send({"type": "http.response.body", "body": body})
+            return
+
+        request_headers = Headers(scope=scope)
+        headers.setdefault("Cache-Control", self.policies[scope["path"]])
+        etag = headers.get("etag") or content_etag(body)
+
+        encoding = None
+        if "content-encoding" not in headers:
+            if len(body) >= self.min_size:
+                encoding = accepted_encoding(request_headers.get("accept-encoding"))
+            headers.add_vary_header("Accept-Encoding")
+        representation_etag = encoded_etag(etag, encoding)
+        headers["ETag"] = representation_etag
+
+        if etag_matches(request_headers.get("if-none-match"), representation_etag):
+            for name in ("content-length", "content-type", "content-encoding"):
+                if name in headers:
+                    del headers[name]
+            await send({"type": "http.response.start", "status": 304, "headers": headers.raw})
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        if encoding:
+            body = self._compress(etag, body, encoding)
+            headers["Content-Encoding"] = encoding
+        headers["Content-Length"] = str(len(body))
+        await send({"type": "http.response.start", "status": 200, "headers": headers.raw})
+        await send({"type": "http.response.body", "body": b"" if scope["method"] == "HEAD" else body})
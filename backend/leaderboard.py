@@ -0,0 +1,87 @@
+"""
+Leaderboard - in-memory top-K of villages by trust score
+Kept current from trust updates and rebuilt periodically with parallel segmented
+scans; the HTTP layer derives its ETag from the served content
+"""
+
+import asyncio
+import heapq
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from village_trust import with_trust_score
+from structured_log import get_logger
+
+log = get_logger("leaderboard")
+
+LEADERBOARD_SIZE = 100
+REBUILD_INTERVAL = 600  # seconds
+SCAN_SEGMENTS = 4
+
+def assign_tier(score) -> tuple:
+    """(tier, icon) for a trust score"""
+    if score >= 80:
+        return 'Gold', '🥇'
+    elif score >= 60:
+        return 'Silver', '🥈'
+    return 'Bronze', '🥉'
+
+class VillageLeaderboard:
+    def __init__(self, table, size: int = LEADERBOARD_SIZE, segments: int = SCAN_SEGMENTS):
+        self.table = table
+        self.size = size
+        self.segments = segments
+        self._villages = {}  # village_id -> trust item
+        self._top = []  # precomputed leaderboard entries, best first
+        self._lock = threading.Lock()
+
+    def update(self, item: dict):
+        """Apply one village's new trust counters; re-rank only if the top-K can change"""
+        with self._lock:
+            self._villages[item['village_id']] = item
+            score = item.get('trust_score', 0)
+            in_top = any(e['village_id'] == item['village_id'] for e in self._top)
+            if in_top or len(self._top) < self.size or score >= self._top[-1].get('trust_score', 0):
+                self._rank()
+
+    def rebuild(self):
+        """Reload every village with a paginated, segmented parallel scan"""
+        with ThreadPoolExecutor(max_workers=self.segments) as pool:
+            segments = list(pool.map(self._scan_segment, range(self.segments)))
+        villages = {item['village_id']: with_trust_score(item) for segment in segments for item in segment}
+        with self._lock:
+            self._villages = villages
+            self._rank()
+
+    def _scan_segment(self, segment: int) -> list:
+        items = []
+        scan_kwargs = {"Segment": segment, "TotalSegments": self.segments}
+        while True:
+            response = self.table.scan(**scan_kwargs)
+            items.extend(response.get('Items', []))
+            if not response.get('LastEvaluatedKey'):
+                return items
+            scan_kwargs["ExclusiveStartKey"] = response['LastEvaluatedKey']
+
+    def _rank(self):
+        """Recompute the top-K entries (caller holds the lock)"""
+        best = heapq.nlargest(self.size, self._villages.values(), key=lambda x: x.get('trust_score', 0))
+        top = []
+        for i, village in enumerate(best):
+            tier, tier_icon = assign_tier(village.get('trust_score', 0))
+            top.append({**village, 'tier': tier, 'tier_icon': tier_icon, 'rank': i + 1})
+        self._top = top
+
+    def top(self, limit: int) -> dict:
+        """Leaderboard payload for the best `limit` villages"""
+        with self._lock:
+            return {'leaderboard': self._top[:max(0, limit)], 'total_villages': len(self._villages)}
+
+    async def run_periodic_rebuild(self, interval: int = REBUILD_INTERVAL):
+        """Rebuild now and then every `interval` seconds, to pick up writes made elsewhere"""
+        while True:
+            try:
+                await asyncio.to_thread(self.rebuild)
+            except Exception as e:
+                log.error("leaderboard_rebuild_error", error=e)
+            await asyncio.sleep(interval)
@@ -1,66 +1,164 @@
 from fastapi import FastAPI, HTTPException, Depends, UploadFile, File, Request, Query
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse, PlainTextResponse
+from fastapi.responses import JSONResponse, PlainTextResponse, Response, StreamingResponse
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from pydantic import BaseModel
-from openai import AzureOpenAI
+from pydantic import BaseModel, field_validator
+import importlib
+import importlib.util
 import os
-import base64
-# Azure Speech SDK is optional - only import if available
+import threading
+from contextlib import asynccontextmanager
+from structured_log import flush_logging, get_logger
+
+log = get_logger("main")
+
+# Azure Speech SDK is optional - only imported (on first use or at warm-up) if available
 try:
-    import azure.cognitiveservices.speech as speechsdk
-    AZURE_SPEECH_AVAILABLE = True
+    AZURE_SPEECH_AVAILABLE = importlib.util.find_spec("azure.cognitiveservices.speech") is not None
 except ImportError:
     AZURE_SPEECH_AVAILABLE = False
-    print("Azure Speech SDK not available - using AWS Polly for all languages")
+if not AZURE_SPEECH_AVAILABLE:
+    log.info("azure_speech_unavailable", fallback="polly")
 import boto3
 from dotenv import load_dotenv
-import requests
 import jwt
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import List, Optional
 from transcribe_service import TranscribeService
 import bcrypt
 import uuid
 import asyncio
 from pymongo import MongoClient
-from data_aggregator import fetch_all_context_data, format_context_for_llm, fetch_context_sync
+from data_aggregator import cache_backend, fetch_all_context_data, format_context_for_llm, fetch_context_sync, fetch_hyperlocal_data
+from pagination import encode_cursor, decode_cursor
+from community_feed import CommunityFeed
+from outbreak_view import OutbreakView
+from place_names import PlaceNameMemory
+from village_trust import VillageTrustUpdater, with_trust_score
+from leaderboard import VillageLeaderboard
+from sliding_window import COUNTED_ATTRIBUTE, DynamoWindowCounter, MongoWindowCounter, counter_key
+from geo_cluster import OutbreakClusterEngine, geo_point, pest_key, within_km_filter
+from crop_scoring import score_batch
+from crop_catalogue import CropCatalogue
+from strategies import STRATEGY_SCHEMA, StrategyCache, strategy_profile
+from profile_store import ProfileStore
+from http_cache import ConditionalCacheMiddleware, spliced_json_response
+from crop_calendar import CropCalendar
+from audio_store import AUDIO_PROFILES, DEFAULT_AUDIO_PROFILE, AudioStore, negotiate_audio_profile, parse_range, iter_chunks
+from geocode_cache import ReverseGeocodeCache
+from village_index import VillageIndex
+from metrics import InstrumentedTransport, TimingMiddleware, http_session, instrument_boto3, instrument_mongo, render_metrics, span
+from dependencies import Dependencies
 
 load_dotenv()
 
-# Amazon Translate client
-translate_client = boto3.client('translate', region_name='ap-south-1')
-
-# MongoDB connection for hyperlocal data (with connection pooling)
-mongo_client = MongoClient(
-    os.getenv("MONGO_URL"),
-    maxPoolSize=10,  # Connection pool
-    minPoolSize=2,
-    maxIdleTimeMS=30000,  # 30 seconds
-    serverSelectionTimeoutMS=5000  # 5 seconds timeout
-)
-mongo_db = mongo_client.gramvani
-hyperlocal_collection = mongo_db.hyperlocal_context
-success_stories_collection = mongo_db.success_stories
-pest_outbreaks_collection = mongo_db.pest_outbreaks
+# External clients are built lazily (first use or startup warm-up), so importing
+# this module needs no credentials, network or heavy SDK imports
+deps = Dependencies()
+_boto3_lock = threading.Lock()  # creating clients off the default boto3 session isn't thread-safe
+
+def _aws_client(service: str):
+    with _boto3_lock:
+        return instrument_boto3(boto3.client(service, region_name='ap-south-1'))
+
+def _dynamodb_resource():
+    with _boto3_lock:
+        resource = boto3.resource('dynamodb', region_name='ap-south-1')
+    instrument_boto3(resource.meta.client)
+    return resource
+
+def _mongo_client():
+    return MongoClient(
+        os.getenv("MONGO_URL"),
+        maxPoolSize=10,  # Connection pool
+        minPoolSize=2,
+        maxIdleTimeMS=30000,  # 30 seconds
+        serverSelectionTimeoutMS=5000  # 5 seconds timeout
+    )
+
+def _azure_openai_client():
+    from openai import AzureOpenAI, DefaultHttpxClient  # ~0.5s of imports, kept off the import path
+
+    return AzureOpenAI(
+        azure_endpoint=os.getenv("AZURE_OPENAI_ENDPOINT"),
+        api_key=os.getenv("AZURE_OPENAI_API_KEY"),
+        api_version=os.getenv("AZURE_OPENAI_API_VERSION", "2024-12-01-preview"),
+        http_client=DefaultHttpxClient(transport=InstrumentedTransport("openai"))
+    )
+
+def _transcribe_service():
+    with _boto3_lock:
+        return TranscribeService()
+
+deps.register("dynamodb", _dynamodb_resource, check=lambda db: db.Table('gramvaani_users').table_status)
+deps.register("translate", lambda: _aws_client("translate"), close=lambda client: client.close())
+deps.register("polly", lambda: _aws_client("polly"), close=lambda client: client.close())
+deps.register("openai", _azure_openai_client, close=lambda client: client.close())
+deps.register("mongo", _mongo_client, required=False, check=lambda client: client.admin.command("ping"), close=lambda client: client.close())
+deps.register("transcribe", _transcribe_service, required=False)
+deps.register("cache", lambda: cache_backend, required=False, check=lambda cache: cache.ping())  # shared cache, if any
+if AZURE_SPEECH_AVAILABLE:
+    deps.register("speech_sdk", lambda: importlib.import_module("azure.cognitiveservices.speech"), required=False)
 
-app = FastAPI()
+# Amazon Translate client
+translate_client = deps.lazy("translate")
 
-# DynamoDB connection
-dynamodb = boto3.resource('dynamodb', region_name='ap-south-1')
-users_table = dynamodb.Table('gramvaani_users')
-queries_table = dynamodb.Table('gramvaani_user_querie')
-sessions_table = dynamodb.Table('gramvaani_sessions')
-village_trust_table = dynamodb.Table('gramvaani_village_trust')
-community_reports_table = dynamodb.Table('gramvaani_community_reports')
+# Outbound HTTP (OpenWeather, Nominatim, WhatsApp, ipapi), pooled and counted per host
+http = http_session()
 
-print("DynamoDB connection initialized")
+# MongoDB connection for hyperlocal data (with connection pooling)
+instrument_mongo()
+
+def _mongo_collection(name: str):
+    return deps.lazy("mongo", lambda client: client.gramvani[name])
+
+mongo_db = deps.lazy("mongo", lambda client: client.gramvani)
+hyperlocal_collection = _mongo_collection("hyperlocal_context")
+success_stories_collection = _mongo_collection("success_stories")
+pest_outbreaks_collection = _mongo_collection("pest_outbreaks")
+pest_outbreak_counters = MongoWindowCounter(_mongo_collection("pest_outbreak_counters"))
+outbreak_clusters = OutbreakClusterEngine()
+crop_catalogue = CropCatalogue(_mongo_collection("crop_recommendations"))
+OUTBREAK_RADIUS_KM = 10
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    deps.start_warm_up()
+    asyncio.create_task(asyncio.to_thread(prefill_place_names))
+    asyncio.create_task(village_leaderboard.run_periodic_rebuild())
+    asyncio.create_task(asyncio.to_thread(pest_outbreak_counters.ensure_indexes))
+    asyncio.create_task(asyncio.to_thread(load_outbreak_clusters))
+    asyncio.create_task(asyncio.to_thread(load_village_index))
+    crop_catalogue.start()
+    yield
+    await village_trust.flush_all()
+    deps.close()
+    flush_logging()
+
+app = FastAPI(lifespan=lifespan)
+
+# DynamoDB tables
+def _dynamodb_table(name: str):
+    return deps.lazy("dynamodb", lambda db: db.Table(name))
+
+users_table = _dynamodb_table('gramvaani_users')
+queries_table = _dynamodb_table('gramvaani_user_querie')
+sessions_table = _dynamodb_table('gramvaani_sessions')
+village_trust_table = _dynamodb_table('gramvaani_village_trust')
+community_reports_table = _dynamodb_table('gramvaani_community_reports')
+outbreak_aggregates_table = _dynamodb_table('gramvaani_outbreak_aggregates')
+report_counters = DynamoWindowCounter(_dynamodb_table('gramvaani_report_counters'))
 
 # Security
 security = HTTPBearer()
 SECRET_KEY = os.getenv("SECRET_KEY", "your-secret-key-here")
 ALGORITHM = "HS256"
 
+community_feed = CommunityFeed(community_reports_table, SECRET_KEY)
+outbreak_view = OutbreakView(outbreak_aggregates_table)
+village_leaderboard = VillageLeaderboard(village_trust_table)
+village_trust = VillageTrustUpdater(village_trust_table, on_update=village_leaderboard.update)
+
 # CORS
 allowed_origins = [
     "http://localhost:3000",
@@ -70,6 +168,18 @@ allowed_origins = [
     "*"
 ]
 
+# Read-mostly endpoints: strong ETags, If-None-Match -> 304 and gzip/brotli bodies
+app.add_middleware(
+    ConditionalCacheMiddleware,
+    policies={
+        "/api/agriculture-news": "private, max-age=300",
+        "/api/crop-calendar": "private, max-age=600",
+        "/api/village-leaderboard": "public, max-age=60",
+        "/api/hyperlocal-context": "private, max-age=600",
+        "/api/success-stories": "private, max-age=300",
+    }
+)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=allowed_origins,
@@ -78,18 +188,20 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Outermost, so Server-Timing and request latency cover the other middleware too
+app.add_middleware(TimingMiddleware)
+
 # Azure OpenAI
-azure_client = AzureOpenAI(
-    azure_endpoint=os.getenv("AZURE_OPENAI_ENDPOINT"),
-    api_key=os.getenv("AZURE_OPENAI_API_KEY"),
-    api_version=os.getenv("AZURE_OPENAI_API_VERSION", "2024-12-01-preview")
-)
+azure_client = deps.lazy("openai")
 
 # Amazon Polly
-polly_client = boto3.client("polly", region_name="ap-south-1")
+polly_client = deps.lazy("polly")
 
 # Amazon Transcribe
-transcribe_service = TranscribeService()
+transcribe_service = deps.lazy("transcribe")
+
+# Azure Speech SDK
+speechsdk = deps.lazy("speech_sdk")
 
 # WhatsApp credentials
 WHATSAPP_ACCESS_TOKEN = os.getenv("WHATSAPP_ACCESS_TOKEN")
@@ -162,12 +274,61 @@ def translate_to_english(text: str, source_lang: str) -> str:
         )
         return response.choices[0].message.content.strip()
     except Exception as e:
-        print(f"Translation error: {e}")
+        log.error("translation_error", error=e)
         return text
 
-def synthesize_speech(text: str, language: str) -> Optional[str]:
+def translate_place_names(names: list, language: str) -> dict:
+    """Translate a batch of place names in one Azure OpenAI call, returns {name: translation}"""
+    import json
+    language_name = LANGUAGE_NAMES.get(language, "English")
+    response = azure_client.chat.completions.create(
+        model=os.getenv("AZURE_OPENAI_DEPLOYMENT", "gpt-4o-mini"),
+        messages=[
+            {"role": "system", "content": f"Translate each Indian place name to {language_name} script. Return ONLY a JSON object mapping each input name to its translation."},
+            {"role": "user", "content": json.dumps(names, ensure_ascii=False)}
+        ],
+        response_format={"type": "json_object"},
+        max_tokens=40 * len(names),
+        temperature=0.3
+    )
+    return json.loads(response.choices[0].message.content)
+
+place_names = PlaceNameMemory(translate_place_names)
+PLACE_NAME_PREFILL_CLAIM = 6 * 3600  # seconds; workers (re)started within this don't prefill again
+
+def prefill_place_names():
+    """Warm the place name memory with every village and district we know about
+
+    One worker per deployment does this (the claim is shared through the cache
+    backend); the others pick its translations up from the shared file.
+    """
+    if cache_backend.claim("place_names:prefill", PLACE_NAME_PREFILL_CLAIM) > 0:
+        log.info("place_names_prefill_skipped", reason="claimed by another worker")
+        return
+    try:
+        names = set(hyperlocal_collection.distinct("district")) | set(hyperlocal_collection.distinct("state"))
+        scan_kwargs = {"ProjectionExpression": "village_id"}
+        while True:
+            response = village_trust_table.scan(**scan_kwargs)
+            names.update(item["village_id"] for item in response.get("Items", []))
+            if not response.get("LastEvaluatedKey"):
+                break
+            scan_kwargs["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+        place_names.prefill(names, LANGUAGE_NAMES.keys())
+        log.info("place_names_prefilled", count=len(names))
+    except Exception as e:
+        log.error("place_name_prefill_error", error=e)
+
+def schedule_place_name_fill():
+    """Translate names that missed the memory, off the request path"""
+    if place_names.has_pending():
+        asyncio.create_task(asyncio.to_thread(place_names.fill_pending))
+
+def synthesize_speech(text: str, language: str, profile: str = DEFAULT_AUDIO_PROFILE) -> Optional[bytes]:
+    """Audio bytes for `text` in the profile's format (see AUDIO_PROFILES), or None"""
     if not text:
         return None
+    output = AUDIO_PROFILES[profile]
     
     # Try Azure Speech for regional languages if available and configured
     if AZURE_SPEECH_AVAILABLE and language in AZURE_SPEECH_VOICES:
@@ -179,39 +340,50 @@ def synthesize_speech(text: str, language: str) -> Optional[str]:
                 speech_config = speechsdk.SpeechConfig(subscription=speech_key, region=speech_region)
                 voice_name = AZURE_SPEECH_VOICES.get(language)
                 speech_config.speech_synthesis_voice_name = voice_name
-                speech_config.set_speech_synthesis_output_format(speechsdk.SpeechSynthesisOutputFormat.Audio16Khz32KBitRateMonoMp3)
+                speech_config.set_speech_synthesis_output_format(getattr(speechsdk.SpeechSynthesisOutputFormat, output["azure_format"]))
                 
-                print(f"Azure Speech TTS: voice={voice_name}, region={speech_region}")
+                log.debug("tts_request", engine="azure", voice=voice_name, region=speech_region, profile=profile)
                 
                 synthesizer = speechsdk.SpeechSynthesizer(speech_config=speech_config, audio_config=None)
                 result = synthesizer.speak_text_async(text).get()
                 
                 if result.reason == speechsdk.ResultReason.SynthesizingAudioCompleted:
-                    return base64.b64encode(result.audio_data).decode("utf-8")
+                    return result.audio_data
                 else:
-                    print(f"Azure Speech synthesis failed: {result.reason}, falling back to Polly")
+                    log.warning("azure_speech_failed", reason=result.reason, fallback="polly")
         except Exception as e:
-            print(f"Azure Speech synthesis error: {e}, falling back to Polly")
+            log.error("azure_speech_error", error=e, fallback="polly")
     
     # Use AWS Polly as default/fallback for all languages
     try:
         voice_config = LANGUAGE_TO_POLLY_VOICE.get(language, ("Joanna", "en-US"))
         voice_id, language_code = voice_config
         
-        print(f"Polly TTS: voice={voice_id}, language={language_code}")
+        log.debug("tts_request", engine="polly", voice=voice_id, language=language_code, profile=profile)
         
         response = polly_client.synthesize_speech(
             Text=text,
-            OutputFormat="mp3",
+            OutputFormat=output["polly_format"],
+            SampleRate=output["polly_sample_rate"],
             VoiceId=voice_id,
             LanguageCode=language_code
         )
-        audio_data = response["AudioStream"].read()
-        return base64.b64encode(audio_data).decode("utf-8")
+        return response["AudioStream"].read()
     except Exception as e:
-        print(f"Polly synthesis error: {e}")
+        log.error("polly_synthesis_error", error=e)
         return None
 
+# TTS clips are synthesized in the background and fetched from /api/audio/{audio_id}
+audio_store = AudioStore(synthesize_speech, cache=cache_backend)
+
+def speech_url(text: str, language: str, requested_profile: Optional[str] = None, headers=None) -> Optional[str]:
+    """Start TTS for a response and return the URL its audio will stream from
+
+    The audio profile comes from the request (audio_profile) or the client's Save-Data/ECT hints.
+    """
+    audio_id = audio_store.submit(text, language, negotiate_audio_profile(requested_profile, headers))
+    return f"/api/audio/{audio_id}" if audio_id else None
+
 # Models
 class UserSignup(BaseModel):
     phone_number: str
@@ -230,19 +402,23 @@ class Token(BaseModel):
 class TextRequest(BaseModel):
     text: str
     language: str = "en"
+    audio_profile: Optional[str] = None  # 2g / 3g / wifi
 
 class WeatherRequest(BaseModel):
     city: Optional[str] = None
     language: str = "en"
+    audio_profile: Optional[str] = None  # 2g / 3g / wifi
 
 class CropPriceRequest(BaseModel):
     crop: str
     market: Optional[str] = None
     language: str = "en"
+    audio_profile: Optional[str] = None  # 2g / 3g / wifi
 
 class SchemeRequest(BaseModel):
     topic: str
     language: str = "en"
+    audio_profile: Optional[str] = None  # 2g / 3g / wifi
 
 class ReverseGeocodeRequest(BaseModel):
     latitude: float
@@ -277,25 +453,37 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(s
             raise HTTPException(status_code=401, detail="User not found")
         return user
     except Exception as e:
-        print(f"Auth error: {e}")
+        log.warning("auth_error", error=e)
         raise HTTPException(status_code=401, detail="Invalid token")
 
-@app.on_event("startup")
-async def startup_event():
-    print("DynamoDB tables ready")
-
 # Routes
 @app.get("/")
 async def root():
     return {"message": "Gram Vaani API with DynamoDB is running"}
 
-@app.get("/health")
-async def health():
-    try:
-        users_table.table_status
-        return {"status": "healthy", "database": "connected"}
-    except Exception as e:
-        return {"status": "unhealthy", "database": "disconnected", "error": str(e)}
+@app.get("/health/live")
+async def health_live():
+    """Liveness: the process is up and its event loop is answering"""
+    return {"status": "alive"}
+
+@app.get("/health/ready")
+async def health_ready():
+    """Readiness: startup warm-up finished, every required client is built and reachable,
+    and the crop catalogue has loaded (until then recommendations would come back empty)"""
+    status = deps.status()
+    status["crop_catalogue"] = {"status": "loaded" if crop_catalogue.loaded else "loading", "crops": len(crop_catalogue.snapshot)}
+    status["ready"] = status["ready"] and crop_catalogue.loaded
+    if not status["ready"]:
+        if deps.warmed_up and deps.failed():
+            deps.start_warm_up(deps.failed())  # retry in the background; a later probe sees the result
+        return JSONResponse(status_code=503, content={"status": "not_ready", **status})
+    return {"status": "ready", **status}
+
+@app.get("/metrics")
+async def metrics():
+    """Prometheus metrics: stage/request latency, external calls and cache hit rates"""
+    body, content_type = render_metrics()
+    return Response(content=body, media_type=content_type)
 
 # WhatsApp Webhook Verification
 @app.get("/webhook")
@@ -305,17 +493,17 @@ async def verify_webhook(
     hub_verify_token: str = Query(None, alias="hub.verify_token")
 ):
     """Verify WhatsApp webhook subscription"""
-    print(f"Webhook verification attempt: mode={hub_mode}, token_match={hub_verify_token == WHATSAPP_VERIFY_TOKEN}")
+    log.info("webhook_verification", mode=hub_mode, token_match=hub_verify_token == WHATSAPP_VERIFY_TOKEN)
     
     if not WHATSAPP_VERIFY_TOKEN:
-        print("ERROR: WHATSAPP_VERIFY_TOKEN not configured")
+        log.error("whatsapp_verify_token_missing")
         raise HTTPException(status_code=500, detail="Server configuration error")
     
     if hub_mode == "subscribe" and hub_verify_token == WHATSAPP_VERIFY_TOKEN:
-        print("✅ Webhook verified successfully")
+        log.info("webhook_verified")
         return PlainTextResponse(content=hub_challenge, status_code=200)
     
-    print(f"❌ Webhook verification failed: mode={hub_mode}, token_provided={bool(hub_verify_token)}")
+    log.warning("webhook_verification_failed", mode=hub_mode, token_provided=bool(hub_verify_token))
     raise HTTPException(status_code=403, detail="Verification failed")
 
 # WhatsApp Webhook Handler
@@ -324,11 +512,11 @@ async def whatsapp_webhook(request: Request):
     """Handle incoming WhatsApp messages"""
     try:
         body = await request.json()
-        print(f"📱 WhatsApp webhook received: {body}")
+        log.debug("webhook_received", body=body)
         
         # Validate webhook structure
         if not body.get("entry"):
-            print("⚠️ Invalid webhook: missing 'entry' field")
+            log.warning("webhook_invalid", reason="missing entry")
             return JSONResponse({"status": "received"}, status_code=200)
         
         # Quick response to avoid Meta retries (must respond within 20s)
@@ -336,9 +524,7 @@ async def whatsapp_webhook(request: Request):
         
         return JSONResponse({"status": "received"}, status_code=200)
     except Exception as e:
-        print(f"❌ Webhook error: {e}")
-        import traceback
-        traceback.print_exc()
+        log.exception("webhook_error", error=e)
         # Always return 200 to prevent Meta retries
         return JSONResponse({"status": "error", "message": str(e)}, status_code=200)
 
@@ -347,19 +533,19 @@ async def process_whatsapp_message(body: dict):
     try:
         entry = body.get("entry", [])
         if not entry:
-            print("⚠️ No entry in webhook body")
+            log.warning("webhook_invalid", reason="no entry")
             return
         
         changes = entry[0].get("changes", [])
         if not changes:
-            print("⚠️ No changes in entry")
+            log.warning("webhook_invalid", reason="no changes")
             return
         
         value = changes[0].get("value", {})
         messages = value.get("messages", [])
         
         if not messages:
-            print("⚠️ No messages in value (might be status update)")
+            log.debug("webhook_without_messages")  # status updates
             return
         
         message = messages[0]
@@ -367,10 +553,10 @@ async def process_whatsapp_message(body: dict):
         message_type = message.get("type")
         
         if not sender:
-            print("⚠️ No sender in message")
+            log.warning("webhook_invalid", reason="no sender")
             return
         
-        print(f"📨 Message from {sender}, type: {message_type}")
+        log.info("whatsapp_message", sender=sender, type=message_type)
         
         # Only process text messages
         if message_type != "text":
@@ -380,10 +566,10 @@ async def process_whatsapp_message(body: dict):
         message_text = message.get("text", {}).get("body", "").strip()
         
         if not message_text:
-            print("⚠️ Empty message text")
+            log.warning("whatsapp_message_empty", sender=sender)
             return
         
-        print(f"💬 Processing: '{message_text[:100]}...'")
+        log.debug("whatsapp_message_text", sender=sender, text=message_text[:100])
         
         # Get or create user (use phone number as identifier)
         user = await get_or_create_whatsapp_user(sender)
@@ -393,12 +579,10 @@ async def process_whatsapp_message(body: dict):
         
         # Send response back to WhatsApp
         await send_whatsapp_message(sender, ai_response)
-        print(f"✅ Response sent to {sender}")
+        log.info("whatsapp_reply_sent", sender=sender)
         
     except Exception as e:
-        print(f"❌ Process WhatsApp message error: {e}")
-        import traceback
-        traceback.print_exc()
+        log.exception("process_whatsapp_message_error", error=e)
 
 def normalize_phone_number(phone: str) -> str:
     """Remove country code from WhatsApp phone number"""
@@ -417,7 +601,7 @@ async def get_or_create_whatsapp_user(phone_number: str) -> dict:
         user = response.get('Item')
         
         if user:
-            print(f"👤 Found existing user: {normalized_phone}")
+            log.debug("whatsapp_user_found", phone=normalized_phone)
             return user
         
         # Try with original phone number
@@ -425,7 +609,7 @@ async def get_or_create_whatsapp_user(phone_number: str) -> dict:
         user = response.get('Item')
         
         if user:
-            print(f"👤 Found existing user: {phone_number}")
+            log.debug("whatsapp_user_found", phone=phone_number)
             return user
         
         # Create new user with default settings
@@ -440,13 +624,11 @@ async def get_or_create_whatsapp_user(phone_number: str) -> dict:
         }
         
         users_table.put_item(Item=new_user)
-        print(f"✨ Created new WhatsApp user: {normalized_phone} (original: {phone_number})")
+        log.info("whatsapp_user_created", phone=normalized_phone)
         
         return new_user
     except Exception as e:
-        print(f"❌ Get/create user error: {e}")
-        import traceback
-        traceback.print_exc()
+        log.exception("whatsapp_user_error", error=e)
         # Return fallback user to prevent crashes
         return {
             "phone_number": normalize_phone_number(phone_number),
@@ -469,47 +651,53 @@ async def process_ai_query(text: str, user: dict) -> str:
         # Detect intent and route to specialized endpoints
         # Weather queries
         if any(word in text_lower for word in ['weather', 'temperature', 'rain', 'climate', 'मौसम', 'बारिश', 'तापमान']):
-            return await handle_weather_query(text, user, language)
+            with span("weather_query"):
+                return await handle_weather_query(text, user, language)
         
         # Crop price queries
         elif any(word in text_lower for word in ['price', 'cost', 'rate', 'market', 'mandi', 'कीमत', 'दाम', 'भाव', 'मंडी']):
-            return await handle_crop_price_query(text, user, language)
+            with span("price_query"):
+                return await handle_crop_price_query(text, user, language)
         
         # Government scheme queries
         elif any(word in text_lower for word in ['scheme', 'subsidy', 'loan', 'government', 'योजना', 'सब्सिडी', 'ऋण', 'सरकार']):
-            return await handle_scheme_query(text, user, language)
+            with span("scheme_query"):
+                return await handle_scheme_query(text, user, language)
         
         # Personal info queries (who am i, my profile, etc.)
         elif any(word in text_lower for word in ['who am i', 'my profile', 'my details', 'my info', 'about me', 'मैं कौन', 'मेरी जानकारी']):
             language_name = LANGUAGE_NAMES.get(language, "English")
-            response = azure_client.chat.completions.create(
-                model=os.getenv("AZURE_OPENAI_DEPLOYMENT", "gpt-4o-mini"),
-                messages=[
-                    {"role": "system", "content": f"You are Gram Vaani assistant. Tell the user about their profile in {language_name} language. Be friendly and concise."},
-                    {"role": "user", "content": f"Tell me about my profile. My details: Phone: {user_phone}, Location: {user_location}, Preferred Language: {language_name}"}
-                ],
-                max_tokens=200,
-                temperature=0.7
-            )
+            with span("llm"):
+                response = azure_client.chat.completions.create(
+                    model=os.getenv("AZURE_OPENAI_DEPLOYMENT", "gpt-4o-mini"),
+                    messages=[
+                        {"role": "system", "content": f"You are Gram Vaani assistant. Tell the user about their profile in {language_name} language. Be friendly and concise."},
+                        {"role": "user", "content": f"Tell me about my profile. My details: Phone: {user_phone}, Location: {user_location}, Preferred Language: {language_name}"}
+                    ],
+                    max_tokens=200,
+                    temperature=0.7
+                )
             return response.choices[0].message.content
         
         # General farming query
         else:
-            response = azure_client.chat.completions.create(
-                model=os.getenv("AZURE_OPENAI_DEPLOYMENT", "gpt-4o-mini"),
-                messages=[
-                    {"role": "system", "content": f"You are Gram Vaani, AI Voice Assistant for Rural India. Help with farming, weather, crops, and government schemes. {user_context}. Keep responses concise for WhatsApp (under 300 words)."},
-                    {"role": "user", "content": text}
-                ],
-                max_tokens=500,
-                temperature=0.7
-            )
+            with span("llm"):
+                response = azure_client.chat.completions.create(
+                    model=os.getenv("AZURE_OPENAI_DEPLOYMENT", "gpt-4o-mini"),
+                    messages=[
+                        {"role": "system", "content": f"You are Gram Vaani, AI Voice Assistant for Rural India. Help with farming, weather, crops, and government schemes. {user_context}. Keep responses concise for WhatsApp (under 300 words)."},
+                        {"role": "user", "content": text}
+                    ],
+                    max_tokens=500,
+                    temperature=0.7
+                )
             
             response_text = response.choices[0].message.content
             
             # Log query to DynamoDB
             query_id = str(uuid.uuid4())
-            query_english = translate_to_english(text, language)
+            with span("translate"):
+                query_english = translate_to_english(text, language)
             
             query_item = {
                 "query_id": query_id,
@@ -523,11 +711,12 @@ async def process_ai_query(text: str, user: dict) -> str:
                 "helpful": None,
                 "feedback_text": None
             }
-            queries_table.put_item(Item=query_item)
+            with span("log_query"):
+                queries_table.put_item(Item=query_item)
             
             return response_text
     except Exception as e:
-        print(f"AI query error: {e}")
+        log.error("ai_query_error", error=e)
         return "Sorry, I'm having trouble processing your request. Please try again."
 
 async def handle_weather_query(text: str, user: dict, language: str) -> str:
@@ -536,32 +725,29 @@ async def handle_weather_query(text: str, user: dict, language: str) -> str:
         location = user.get("location", "Delhi")
         city = location.split(",")[0].strip()
         
-        print(f"Weather query - User location: {location}, City: {city}")
+        log.debug("weather_query", location=location, city=city)
         
         api_key = os.getenv("OPENWEATHER_API_KEY")
         if not api_key:
-            print("ERROR: OpenWeather API key not found")
+            log.error("openweather_key_missing")
             return "Sorry, weather service is not configured. Please try again later."
         
         url = f"https://api.openweathermap.org/data/2.5/weather?q={city}&appid={api_key}&units=metric"
-        print(f"Weather API URL: {url}")
-        
-        res = requests.get(url, timeout=10)
-        print(f"Weather API response status: {res.status_code}")
+        res = http.get(url, timeout=10)
         
         if res.status_code == 404:
             # Try with fallback city if location has multiple parts
             location_parts = location.split(",")
             if len(location_parts) > 1:
                 fallback_city = location_parts[1].strip()
-                print(f"Trying fallback city: {fallback_city}")
+                log.debug("weather_fallback_city", city=city, fallback=fallback_city)
                 url = f"https://api.openweathermap.org/data/2.5/weather?q={fallback_city}&appid={api_key}&units=metric"
-                res = requests.get(url, timeout=10)
+                res = http.get(url, timeout=10)
                 if res.status_code == 200:
                     city = fallback_city
         
         if res.status_code != 200:
-            print(f"Weather API error: {res.status_code} - {res.text}")
+            log.warning("openweather_error", city=city, status=res.status_code, body=res.text[:200])
             return f"Sorry, I couldn't find weather information for {city}. Please update your location in settings."
         
         data = res.json()
@@ -569,8 +755,6 @@ async def handle_weather_query(text: str, user: dict, language: str) -> str:
         temp = data["main"]["temp"]
         humidity = data["main"]["humidity"]
         
-        print(f"Weather data: {weather_desc}, {temp}°C, {humidity}% humidity")
-        
         language_name = LANGUAGE_NAMES.get(language, "English")
         ai_response = azure_client.chat.completions.create(
             model=os.getenv("AZURE_OPENAI_DEPLOYMENT", "gpt-4o-mini"),
@@ -583,18 +767,15 @@ async def handle_weather_query(text: str, user: dict, language: str) -> str:
         )
         
         response_text = ai_response.choices[0].message.content
-        print(f"Weather response generated: {response_text[:100]}...")
         return response_text
     except Exception as e:
-        print(f"Weather query error: {e}")
-        import traceback
-        traceback.print_exc()
+        log.exception("weather_query_error", error=e)
         return "Sorry, I couldn't fetch weather information right now."
 
 async def handle_crop_price_query(text: str, user: dict, language: str) -> str:
     """Handle crop price queries using the same logic as /api/crop-prices"""
     try:
-        print(f"Crop price query: {text}")
+        log.debug("crop_price_query", text=text[:100])
         
         # Extract crop name from query using AI
         crop_extraction = azure_client.chat.completions.create(
@@ -611,7 +792,7 @@ async def handle_crop_price_query(text: str, user: dict, language: str) -> str:
         location = user.get("location", "Delhi")
         market = location.split(",")[0]
         
-        print(f"Extracted crop: {crop}, Market: {market}")
+        log.debug("crop_price_extracted", crop=crop, market=market)
         
         base_prices = {
             'wheat': 2000, 'rice': 2400, 'corn': 1600, 'barley': 1800,
@@ -633,12 +814,9 @@ async def handle_crop_price_query(text: str, user: dict, language: str) -> str:
         )
         
         response_text = ai_response.choices[0].message.content
-        print(f"Crop price response: {response_text[:100]}...")
         return response_text
     except Exception as e:
-        print(f"Crop price query error: {e}")
-        import traceback
-        traceback.print_exc()
+        log.exception("crop_price_query_error", error=e)
         return "Sorry, I couldn't fetch crop price information right now."
 
 async def handle_scheme_query(text: str, user: dict, language: str) -> str:
@@ -658,14 +836,14 @@ async def handle_scheme_query(text: str, user: dict, language: str) -> str:
         
         return response.choices[0].message.content
     except Exception as e:
-        print(f"Scheme query error: {e}")
+        log.error("scheme_query_error", error=e)
         return "Sorry, I couldn't fetch scheme information right now."
 
 async def send_whatsapp_message(to: str, message: str):
     """Send message to WhatsApp user via Graph API"""
     try:
         if not WHATSAPP_ACCESS_TOKEN or not WHATSAPP_PHONE_NUMBER_ID:
-            print("❌ WhatsApp credentials not configured")
+            log.error("whatsapp_credentials_missing")
             return
         
         # Truncate message if too long (WhatsApp limit: 4096 chars)
@@ -686,22 +864,20 @@ async def send_whatsapp_message(to: str, message: str):
             "text": {"body": message}
         }
         
-        response = requests.post(url, json=payload, headers=headers, timeout=10)
+        response = http.post(url, json=payload, headers=headers, timeout=10)
         
         if response.status_code == 200:
-            print(f"✅ Message sent to {to}")
+            log.debug("whatsapp_message_sent", to=to)
         else:
-            print(f"❌ Failed to send message: {response.status_code} - {response.text}")
+            log.warning("whatsapp_send_failed", to=to, status=response.status_code, body=response.text[:200])
     except Exception as e:
-        print(f"❌ Send WhatsApp message error: {e}")
-        import traceback
-        traceback.print_exc()
+        log.exception("send_whatsapp_message_error", error=e)
 
 @app.get("/api/location")
 async def get_location():
     try:
         url = "http://ipapi.co/json/"
-        response = requests.get(url, timeout=5)
+        response = http.get(url, timeout=5)
         data = response.json()
         
         if response.status_code == 200:
@@ -714,67 +890,85 @@ async def get_location():
         else:
             return {"location": "Location not available"}
     except Exception as e:
-        print(f"Location API error: {e}")
+        log.error("location_api_error", error=e)
         return {"location": "Delhi, India"}
 
+def nominatim_reverse(latitude: float, longitude: float) -> Optional[dict]:
+    """Address parts Nominatim has for a point ({} if none), None on failure"""
+    url = f"https://nominatim.openstreetmap.org/reverse?format=json&lat={latitude}&lon={longitude}&zoom=18&addressdetails=1"
+    
+    headers = {
+        'User-Agent': 'GramVaani-App/1.0 (contact@gramvaani.com)'
+    }
+    
+    response = http.get(url, headers=headers, timeout=10)
+    if response.status_code != 200:
+        return None
+    
+    address = response.json().get('address', {})
+    return {key: address[key] for key in ('village', 'town', 'city', 'state_district', 'state', 'postcode') if address.get(key)}
+
+# Nearby coordinates share a geohash cell, so most lookups never reach Nominatim
+reverse_geocode_cache = ReverseGeocodeCache(nominatim_reverse, cache=cache_backend)
+# Offline nearest-village lookup, loaded at startup from VILLAGES_CSV_PATH
+village_index = VillageIndex()
+
+def load_village_index():
+    try:
+        village_index.load()
+    except Exception as e:
+        log.error("village_index_load_error", error=e)
+
 @app.post("/api/reverse-geocode")
 async def reverse_geocode(request: ReverseGeocodeRequest):
     try:
-        url = f"https://nominatim.openstreetmap.org/reverse?format=json&lat={request.latitude}&lon={request.longitude}&zoom=18&addressdetails=1"
-        
-        headers = {
-            'User-Agent': 'GramVaani-App/1.0 (contact@gramvaani.com)'
-        }
-        
-        response = requests.get(url, headers=headers, timeout=10)
-        
-        if response.status_code == 200:
-            data = response.json()
+        # Nearest village from the local dataset; Nominatim only when nothing is close enough
+        village = village_index.nearest(request.latitude, request.longitude)
+        if village:
+            address_parts = {"village": village["village"], "state_district": village["district"], "state": village["state"]}
+        else:
+            address_parts = await reverse_geocode_cache.lookup(request.latitude, request.longitude)
+        
+        if address_parts:
+            village = address_parts.get('village', '')
+            town = address_parts.get('town', '')
+            city = address_parts.get('city', '')
+            district = address_parts.get('state_district', '')
+            state = address_parts.get('state', '')
+            postcode = address_parts.get('postcode', '')
             
-            if 'address' in data:
-                address_parts = data['address']
-                
-                village = address_parts.get('village', '')
-                town = address_parts.get('town', '')
-                city = address_parts.get('city', '')
-                district = address_parts.get('state_district', '')
-                state = address_parts.get('state', '')
-                postcode = address_parts.get('postcode', '')
-                
-                address_components = []
+            address_components = []
+            
+            if village:
+                address_components.append(village)
+            elif town:
+                address_components.append(town)
+            elif city:
+                address_components.append(city)
                 
-                if village:
-                    address_components.append(village)
-                elif town:
-                    address_components.append(town)
-                elif city:
-                    address_components.append(city)
-                    
-                if district and district not in address_components:
-                    address_components.append(district)
-                    
-                if state:
-                    address_components.append(state)
-                    
-                if postcode:
-                    address_components.append(postcode)
+            if district and district not in address_components:
+                address_components.append(district)
                 
-                precise_address = ', '.join(filter(None, address_components))
+            if state:
+                address_components.append(state)
                 
-                return {
-                    "address": precise_address,
-                    "coordinates": {
-                        "latitude": request.latitude,
-                        "longitude": request.longitude
-                    }
+            if postcode:
+                address_components.append(postcode)
+            
+            precise_address = ', '.join(filter(None, address_components))
+            
+            return {
+                "address": precise_address,
+                "coordinates": {
+                    "latitude": request.latitude,
+                    "longitude": request.longitude
                 }
-            else:
-                return {"address": f"Coordinates: {request.latitude:.4f}, {request.longitude:.4f}"}
+            }
         else:
             return {"address": f"Coordinates: {request.latitude:.4f}, {request.longitude:.4f}"}
             
     except Exception as e:
-        print(f"Reverse geocoding error: {e}")
+        log.error("reverse_geocoding_error", error=e)
         return {"address": f"Coordinates: {request.latitude:.4f}, {request.longitude:.4f}"}
 
 @app.post("/api/signup", response_model=Token)
@@ -804,22 +998,21 @@ async def signup(user: UserSignup):
 @app.post("/api/login", response_model=Token)
 async def login(user: UserLogin):
     try:
-        print(f"Login attempt for: {user.phone_number}")
         response = users_table.get_item(Key={'phone_number': user.phone_number})
         db_user = response.get('Item')
         if not db_user:
-            print(f"User not found: {user.phone_number}")
+            log.info("login_failed", phone=user.phone_number, reason="unknown user")
             raise HTTPException(status_code=401, detail="Invalid credentials")
         
         stored_password = db_user["password"]
         
         if stored_password.startswith('$2b$'):
             if not bcrypt.checkpw(user.password.encode('utf-8'), stored_password.encode('utf-8')):
-                print(f"Invalid password for: {user.phone_number}")
+                log.info("login_failed", phone=user.phone_number, reason="invalid password")
                 raise HTTPException(status_code=401, detail="Invalid credentials")
         else:
             if user.password != stored_password:
-                print(f"Invalid password for: {user.phone_number}")
+                log.info("login_failed", phone=user.phone_number, reason="invalid password")
                 raise HTTPException(status_code=401, detail="Invalid credentials")
         
         access_token = create_access_token(data={"sub": user.phone_number})
@@ -833,12 +1026,12 @@ async def login(user: UserLogin):
             "query_ids": []  # Will store query IDs
         })
         
-        print(f"Login successful for: {user.phone_number}")
+        log.info("login", phone=user.phone_number)
         return {"access_token": access_token, "token_type": "bearer"}
     except HTTPException:
         raise
     except Exception as e:
-        print(f"Login error: {e}")
+        log.error("login_error", error=e)
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/api/me")
@@ -872,27 +1065,76 @@ async def update_profile(profile: ProfileUpdate, current_user: dict = Depends(ge
         
         return {"status": "success", "message": "Profile updated"}
     except Exception as e:
-        print(f"Profile update error: {e}")
+        log.error("profile_update_error", error=e)
         raise HTTPException(status_code=500, detail=str(e))
 
+QUERY_HISTORY_MAX_LIMIT = 50
+QUERY_PREVIEW_CHARS = 80
+QUERY_HISTORY_VIEWS = ("full", "compact")
+
 @app.get("/api/query-history")
-async def get_query_history(current_user: dict = Depends(get_current_user)):
-    """Fetch user's query history from DynamoDB"""
+async def get_query_history(
+    current_user: dict = Depends(get_current_user),
+    limit: int = QUERY_HISTORY_MAX_LIMIT,
+    cursor: Optional[str] = None,
+    view: str = "full"
+):
+    """Fetch user's query history from DynamoDB, one page at a time.
+
+    view=compact returns only id, timestamp, a truncated query and helpful;
+    the full item is available from /api/query-history/{query_id}.
+    """
+    if view not in QUERY_HISTORY_VIEWS:
+        raise HTTPException(status_code=400, detail=f"view must be one of: {', '.join(QUERY_HISTORY_VIEWS)}")
+    user_phone = current_user["phone_number"]
+    start_key = decode_cursor(cursor, SECRET_KEY, scope=user_phone)
+    compact = view == "compact"
     try:
         from boto3.dynamodb.conditions import Key
         
-        response = queries_table.query(
-            IndexName='user_phone-index',
-            KeyConditionExpression=Key('user_phone').eq(current_user["phone_number"]),
-            ScanIndexForward=False,  # Sort by timestamp descending
-            Limit=50  # Last 50 queries
-        )
+        query_kwargs = {
+            "IndexName": 'user_phone-index',
+            "KeyConditionExpression": Key('user_phone').eq(user_phone),
+            "ScanIndexForward": False,  # Sort by timestamp descending
+            "Limit": max(1, min(limit, QUERY_HISTORY_MAX_LIMIT))
+        }
+        if start_key:
+            query_kwargs["ExclusiveStartKey"] = start_key
+        if compact:
+            query_kwargs["ProjectionExpression"] = "query_id, #ts, #q, helpful"
+            query_kwargs["ExpressionAttributeNames"] = {"#ts": "timestamp", "#q": "query"}
+        
+        response = queries_table.query(**query_kwargs)
         
         queries = response.get('Items', [])
-        return {"queries": queries, "count": len(queries)}
+        if compact:
+            for item in queries:
+                text = item.get("query") or ""
+                if len(text) > QUERY_PREVIEW_CHARS:
+                    item["query"] = text[:QUERY_PREVIEW_CHARS - 3] + "..."
+        
+        return {
+            "queries": queries,
+            "count": len(queries),
+            "next_cursor": encode_cursor(response.get('LastEvaluatedKey'), SECRET_KEY, scope=user_phone)
+        }
+    except Exception as e:
+        log.error("query_history_error", error=e)
+        return {"queries": [], "count": 0, "next_cursor": None}
+
+@app.get("/api/query-history/{query_id}")
+async def get_query_detail(query_id: str, current_user: dict = Depends(get_current_user)):
+    """Fetch a single query with its full response"""
+    try:
+        response = queries_table.get_item(Key={'query_id': query_id})
     except Exception as e:
-        print(f"Query history error: {e}")
-        return {"queries": [], "count": 0}
+        log.error("query_detail_error", error=e)
+        raise HTTPException(status_code=500, detail=str(e))
+    
+    item = response.get('Item')
+    if not item or item.get("user_phone") != current_user["phone_number"]:
+        raise HTTPException(status_code=404, detail="Query not found")
+    return item
 
 @app.post("/api/feedback")
 async def submit_feedback(feedback: FeedbackRequest, current_user: dict = Depends(get_current_user)):
@@ -915,36 +1157,15 @@ async def submit_feedback(feedback: FeedbackRequest, current_user: dict = Depend
         
         return {"status": "success", "message": "Feedback recorded"}
     except Exception as e:
-        print(f"Feedback error: {e}")
+        log.error("feedback_error", error=e)
         raise HTTPException(status_code=500, detail=str(e))
 
 def update_village_trust(village_id: str, helpful: bool):
-    """Update village trust score based on feedback"""
+    """Queue a village trust update; bursts from one village are written as a single atomic ADD"""
     try:
-        from boto3.dynamodb.conditions import Key
-        
-        # Get or create village trust record
-        response = village_trust_table.get_item(Key={'village_id': village_id})
-        
-        if response.get('Item'):
-            item = response['Item']
-            total = item.get('total_responses', 0) + 1
-            helpful_count = item.get('helpful_count', 0) + (1 if helpful else 0)
-        else:
-            total = 1
-            helpful_count = 1 if helpful else 0
-        
-        trust_score = (helpful_count / total) * 100 if total > 0 else 0
-        
-        village_trust_table.put_item(Item={
-            'village_id': village_id,
-            'total_responses': total,
-            'helpful_count': helpful_count,
-            'trust_score': round(trust_score, 2),
-            'last_updated': datetime.utcnow().isoformat()
-        })
+        village_trust.record(village_id, helpful)
     except Exception as e:
-        print(f"Village trust update error: {e}")
+        log.error("village_trust_update_error", error=e)
 
 @app.get("/api/village-trust/{village_id}")
 async def get_village_trust(village_id: str):
@@ -952,7 +1173,7 @@ async def get_village_trust(village_id: str):
     try:
         response = village_trust_table.get_item(Key={'village_id': village_id})
         if response.get('Item'):
-            return response['Item']
+            return with_trust_score(response['Item'])
         return {
             'village_id': village_id,
             'total_responses': 0,
@@ -960,7 +1181,7 @@ async def get_village_trust(village_id: str):
             'trust_score': 0
         }
     except Exception as e:
-        print(f"Village trust fetch error: {e}")
+        log.error("village_trust_fetch_error", error=e)
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/api/community-report")
@@ -972,6 +1193,7 @@ async def submit_community_report(report: CommunityReportRequest, current_user:
         
         # Translate description to English
         description_english = translate_to_english(report.description, report.language)
+        timestamp = datetime.utcnow().isoformat()
         
         report_item = {
             'report_id': report_id,
@@ -983,54 +1205,55 @@ async def submit_community_report(report: CommunityReportRequest, current_user:
             'description_english': description_english,
             'severity': report.severity,
             'language': report.language,
-            'timestamp': datetime.utcnow().isoformat(),
+            'timestamp': timestamp,
             'verified': False,
             'validation_count': 0,
-            'validators': []
+            'validators': [],
+            COUNTED_ATTRIBUTE: True,  # counted in report_counters below
+            **community_feed.item_fields(timestamp),
+            **outbreak_view.item_fields()
         }
         
         community_reports_table.put_item(Item=report_item)
+        community_feed.invalidate(village_id)
+        try:
+            outbreak_view.record(report_item)
+        except Exception as e:
+            log.error("outbreak_aggregate_update_error", error=e)
         
         # Check for outbreak pattern (5+ reports in same village within 7 days)
-        from boto3.dynamodb.conditions import Key
-        from datetime import timedelta
-        
-        week_ago = (datetime.utcnow() - timedelta(days=7)).isoformat()
-        recent_reports = community_reports_table.query(
-            IndexName='village_id-timestamp-index',
-            KeyConditionExpression=Key('village_id').eq(village_id) & Key('timestamp').gt(week_ago),
-            FilterExpression='report_type = :rt',
-            ExpressionAttributeValues={':rt': report.report_type}
-        )
+        report_key = counter_key(village_id, report.report_type)
+        report_counters.increment(report_key)
+        similar_reports = report_counters.count(report_key)
         
-        outbreak_detected = len(recent_reports.get('Items', [])) >= 5
+        outbreak_detected = similar_reports >= 5
         
         return {
             'status': 'success',
             'report_id': report_id,
             'message': 'Report submitted successfully',
             'outbreak_alert': outbreak_detected,
-            'similar_reports': len(recent_reports.get('Items', []))
+            'similar_reports': similar_reports
         }
     except Exception as e:
-        print(f"Community report error: {e}")
+        log.error("community_report_error", error=e)
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/api/community-reports")
-async def get_community_reports(current_user: dict = Depends(get_current_user), limit: int = 20):
-    """Get recent community reports - show all reports if no village-specific index"""
+async def get_community_reports(
+    current_user: dict = Depends(get_current_user),
+    limit: int = 20,
+    village_id: Optional[str] = None,
+    cursor: Optional[str] = None
+):
+    """Get community reports newest-first, for one village or across all villages"""
     try:
-        # Try to get all reports (fallback if index doesn't exist)
-        response = community_reports_table.scan(Limit=limit)
-        reports = response.get('Items', [])
-        
-        # Sort by timestamp (most recent first)
-        reports.sort(key=lambda x: x.get('timestamp', ''), reverse=True)
-        
-        return {'reports': reports[:limit], 'count': len(reports)}
+        return community_feed.get_page(village_id, limit, cursor)
+    except HTTPException:
+        raise
     except Exception as e:
-        print(f"Fetch reports error: {e}")
-        return {'reports': [], 'count': 0}
+        log.error("fetch_reports_error", error=e)
+        return {'reports': [], 'count': 0, 'next_cursor': None}
 
 @app.post("/api/validate-report/{report_id}")
 async def validate_report(report_id: str, helpful: bool, current_user: dict = Depends(get_current_user)):
@@ -1074,179 +1297,75 @@ async def validate_report(report_id: str, helpful: bool, current_user: dict = De
     except HTTPException:
         raise
     except Exception as e:
-        print(f"Validation error: {e}")
+        log.error("validation_error", error=e)
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/api/village-leaderboard")
 async def get_village_leaderboard(limit: int = 10):
-    """Get top villages by trust score (Gold/Silver/Bronze)"""
+    """Get top villages by trust score (Gold/Silver/Bronze), served from memory
+
+    ETag/304 and Cache-Control come from ConditionalCacheMiddleware, hashed from the
+    body, so every worker agrees on the tag for the same ranking.
+    """
     try:
-        response = village_trust_table.scan()
-        villages = response.get('Items', [])
-        
-        # Sort by trust score
-        villages.sort(key=lambda x: x.get('trust_score', 0), reverse=True)
-        
-        # Assign tiers
-        for i, village in enumerate(villages[:limit]):
-            score = village.get('trust_score', 0)
-            if score >= 80:
-                village['tier'] = 'Gold'
-                village['tier_icon'] = '🥇'
-            elif score >= 60:
-                village['tier'] = 'Silver'
-                village['tier_icon'] = '🥈'
-            else:
-                village['tier'] = 'Bronze'
-                village['tier_icon'] = '🥉'
-            village['rank'] = i + 1
-        
-        return {'leaderboard': villages[:limit], 'total_villages': len(villages)}
+        return village_leaderboard.top(limit)
     except Exception as e:
-        print(f"Leaderboard error: {e}")
+        log.error("leaderboard_error", error=e)
         raise HTTPException(status_code=500, detail=str(e))
 
+def translate_text(text: str, language: str) -> str:
+    """Amazon Translate, English -> language"""
+    result = translate_client.translate_text(Text=text, SourceLanguageCode='en', TargetLanguageCode=language)
+    return result['TranslatedText']
+
+crop_calendar = CropCalendar(translate_text)
+
+def fetch_calendar_weather(city: str):
+    """Current weather for the crop calendar header, or None"""
+    try:
+        api_key = os.getenv('OPENWEATHER_API_KEY')
+        if api_key:
+            url = f"https://api.openweathermap.org/data/2.5/weather?q={city}&appid={api_key}&units=metric"
+            res = http.get(url, timeout=5)
+            if res.status_code == 200:
+                data = res.json()
+                return {
+                    'temp': round(data['main']['temp']),
+                    'humidity': data['main']['humidity'],
+                    'description': data['weather'][0]['description']
+                }
+    except Exception as e:
+        log.error("weather_fetch_error", error=e)
+    return None
+
 @app.get("/api/crop-calendar")
-async def get_crop_calendar(current_user: dict = Depends(get_current_user), language: str = "en"):
+async def get_crop_calendar(request: Request, current_user: dict = Depends(get_current_user), language: str = "en"):
     """Get crop calendar with planting and harvesting schedules"""
     try:
         import json
         
-        # Load crop calendar data
-        with open('crop_calendar.json', 'r') as f:
-            calendar_data = json.load(f)
-        
         # Get current season
-        month = datetime.utcnow().month
-        season_map = calendar_data.get('current_season_info', {})
-        current_season = season_map.get(str(month), 'rabi')
+        current_season = crop_calendar.season()
         
         # Get user location and weather
         user_location = current_user.get('location', 'India')
         city = user_location.split(',')[0].strip()
+        weather_info = await asyncio.to_thread(fetch_calendar_weather, city)
         
-        # Fetch weather data
-        weather_info = None
-        try:
-            api_key = os.getenv('OPENWEATHER_API_KEY')
-            if api_key:
-                url = f"https://api.openweathermap.org/data/2.5/weather?q={city}&appid={api_key}&units=metric"
-                res = requests.get(url, timeout=5)
-                if res.status_code == 200:
-                    data = res.json()
-                    weather_info = {
-                        'temp': round(data['main']['temp']),
-                        'humidity': data['main']['humidity'],
-                        'description': data['weather'][0]['description']
-                    }
-        except Exception as e:
-            print(f"Weather fetch error: {e}")
-        
-        # Filter crops by current season
-        all_crops = calendar_data.get('crops', {})
-        recommended_crops = []
-        
-        for crop_id, crop_info in all_crops.items():
-            crop_season = crop_info.get('season', '')
-            if crop_season == current_season or crop_season == 'year-round':
-                crop_data = {
-                    'id': crop_id,
-                    'name': crop_info.get('name'),
-                    'hindi': crop_info.get('hindi'),
-                    'planting': crop_info.get('planting'),
-                    'harvesting': crop_info.get('harvesting'),
-                    'duration_days': crop_info.get('duration_days'),
-                    'tips': crop_info.get('tips'),
-                    'soil_type': crop_info.get('soil_type', 'Well-drained loamy soil'),
-                    'rainfall': crop_info.get('rainfall', 'Moderate')
-                }
-                recommended_crops.append(crop_data)
+        # Season's crops, translated once per language and stored pre-compressed
+        segment = await crop_calendar.segment(language, current_season)
         
-        # Fast translate using Amazon Translate if not English
-        if language != 'en' and recommended_crops:
-            try:
-                print(f"Translating {len(recommended_crops)} crops to {language}")
-                for crop in recommended_crops:
-                    # Translate crop name
-                    name_result = translate_client.translate_text(
-                        Text=crop['name'],
-                        SourceLanguageCode='en',
-                        TargetLanguageCode=language
-                    )
-                    # Translate tips
-                    tips_result = translate_client.translate_text(
-                        Text=crop['tips'],
-                        SourceLanguageCode='en',
-                        TargetLanguageCode=language
-                    )
-                    # Translate soil type
-                    soil_result = translate_client.translate_text(
-                        Text=crop['soil_type'],
-                        SourceLanguageCode='en',
-                        TargetLanguageCode=language
-                    )
-                    # Translate rainfall
-                    rainfall_result = translate_client.translate_text(
-                        Text=crop['rainfall'],
-                        SourceLanguageCode='en',
-                        TargetLanguageCode=language
-                    )
-                    
-                    # Translate planting months
-                    if crop.get('planting'):
-                        planting_start = translate_client.translate_text(
-                            Text=crop['planting']['start'],
-                            SourceLanguageCode='en',
-                            TargetLanguageCode=language
-                        )
-                        planting_end = translate_client.translate_text(
-                            Text=crop['planting']['end'],
-                            SourceLanguageCode='en',
-                            TargetLanguageCode=language
-                        )
-                        crop['planting']['start'] = planting_start['TranslatedText']
-                        crop['planting']['end'] = planting_end['TranslatedText']
-                    
-                    # Translate harvesting months
-                    if crop.get('harvesting'):
-                        harvest_start = translate_client.translate_text(
-                            Text=crop['harvesting']['start'],
-                            SourceLanguageCode='en',
-                            TargetLanguageCode=language
-                        )
-                        harvest_end = translate_client.translate_text(
-                            Text=crop['harvesting']['end'],
-                            SourceLanguageCode='en',
-                            TargetLanguageCode=language
-                        )
-                        crop['harvesting']['start'] = harvest_start['TranslatedText']
-                        crop['harvesting']['end'] = harvest_end['TranslatedText']
-                    
-                    print(f"Translated {crop['name']} -> {name_result['TranslatedText']}")
-                    crop['name'] = name_result['TranslatedText']
-                    crop['tips'] = tips_result['TranslatedText']
-                    crop['soil_type'] = soil_result['TranslatedText']
-                    crop['rainfall'] = rainfall_result['TranslatedText']
-                print(f"Translation complete for {language}")
-            except Exception as e:
-                print(f"Amazon Translate error: {e}")
-                import traceback
-                traceback.print_exc()
-        
-        return {
-            'current_season': current_season,
-            'user_location': user_location,
-            'weather': weather_info,
-            'recommended_crops': recommended_crops
-        }
+        # Only the small per-user envelope is compressed per request
+        prefix = '{{"current_season":{},"user_location":{},"weather":{},"recommended_crops":'.format(
+            json.dumps(current_season), json.dumps(user_location, ensure_ascii=False), json.dumps(weather_info, ensure_ascii=False)
+        ).encode("utf-8")
+        return spliced_json_response(prefix, segment, b"}", request.headers.get("accept-encoding"))
     except Exception as e:
-        print(f"Crop calendar error: {e}")
-        import traceback
-        traceback.print_exc()
+        log.exception("crop_calendar_error", error=e)
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/api/hyperlocal-context")
-async def get_hyperlocal_context(current_user: dict = Depends(get_current_user)):
+async def get_hyperlocal_context(current_user: dict = Depends(get_current_user), language: str = "en"):
     """Get hyperlocal agricultural context based on user location"""
     try:
         location = current_user.get("location", "")
@@ -1273,9 +1392,12 @@ async def get_hyperlocal_context(current_user: dict = Depends(get_current_user))
         else:
             season = "summer"
         
+        location_name = f"{place_names.lookup(context['district'], language)}, {place_names.lookup(context['state'], language)}"
+        schedule_place_name_fill()
+        
         return {
             "has_data": True,
-            "location": f"{context['district']}, {context['state']}",
+            "location": location_name,
             "soil_type": context["soil_type"],
             "rainfall": context["rainfall"],
             "current_season": season,
@@ -1284,7 +1406,7 @@ async def get_hyperlocal_context(current_user: dict = Depends(get_current_user))
             "pest_alerts": context.get("pest_alerts", [])
         }
     except Exception as e:
-        print(f"Hyperlocal context error: {e}")
+        log.error("hyperlocal_context_error", error=e)
         return {"has_data": False, "message": "Error fetching hyperlocal data"}
 
 @app.get("/api/success-stories")
@@ -1307,14 +1429,24 @@ async def get_success_stories(current_user: dict = Depends(get_current_user), li
         
         return {"stories": stories, "count": len(stories)}
     except Exception as e:
-        print(f"Success stories error: {e}")
+        log.error("success_stories_error", error=e)
         return {"stories": [], "count": 0}
 
 @app.post("/api/report-pest-outbreak")
-async def report_pest_outbreak(current_user: dict = Depends(get_current_user), pest_name: str = "", crop: str = "", severity: str = "medium"):
+async def report_pest_outbreak(
+    current_user: dict = Depends(get_current_user),
+    pest_name: str = "",
+    crop: str = "",
+    severity: str = "medium",
+    latitude: Optional[float] = Query(None, ge=-90, le=90),
+    longitude: Optional[float] = Query(None, ge=-180, le=180)
+):
     """Report pest outbreak for location clustering"""
     try:
+        pest_name = pest_key(pest_name)  # one spelling for the stored report, the geo count and the clusters
         location = current_user.get("location", "Unknown")
+        has_coordinates = latitude is not None and longitude is not None
+        timestamp = datetime.utcnow()
         
         outbreak = {
             "user_phone": current_user["phone_number"],
@@ -1322,21 +1454,29 @@ async def report_pest_outbreak(current_user: dict = Depends(get_current_user), p
             "pest_name": pest_name,
             "crop": crop,
             "severity": severity,
-            "timestamp": datetime.utcnow(),
+            "timestamp": timestamp,
             "verified": False
         }
+        if has_coordinates:
+            outbreak["geo"] = geo_point(latitude, longitude)
+        else:
+            outbreak[COUNTED_ATTRIBUTE] = True  # counted in pest_outbreak_counters below
         
         pest_outbreaks_collection.insert_one(outbreak)
         
         # Check for clustering (3+ reports in same area within 7 days)
-        from datetime import timedelta
-        week_ago = datetime.utcnow() - timedelta(days=7)
-        
-        nearby_reports = pest_outbreaks_collection.count_documents({
-            "location": {"$regex": location.split(",")[0], "$options": "i"},
-            "pest_name": pest_name,
-            "timestamp": {"$gte": week_ago}
-        })
+        if has_coordinates:
+            outbreak_clusters.add(pest_name, latitude, longitude, timestamp)
+            nearby_reports = pest_outbreaks_collection.count_documents({
+                "geo": within_km_filter(latitude, longitude, OUTBREAK_RADIUS_KM),
+                "pest_name": pest_name,
+                "timestamp": {"$gte": timestamp - timedelta(days=7)}
+            })
+        else:
+            # No coordinates - fall back to the free-text location counter
+            outbreak_key = counter_key(location.split(",")[0], pest_name)
+            pest_outbreak_counters.increment(outbreak_key)
+            nearby_reports = pest_outbreak_counters.count(outbreak_key)
         
         alert = nearby_reports >= 3
         
@@ -1347,70 +1487,71 @@ async def report_pest_outbreak(current_user: dict = Depends(get_current_user), p
             "message": f"Outbreak alert! {nearby_reports} reports in your area" if alert else "Report submitted"
         }
     except Exception as e:
-        print(f"Pest outbreak report error: {e}")
+        log.error("pest_outbreak_report_error", error=e)
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/api/nearby-outbreaks")
+async def get_nearby_outbreaks(
+    latitude: float = Query(..., ge=-90, le=90),
+    longitude: float = Query(..., ge=-180, le=180),
+    radius_km: float = Query(OUTBREAK_RADIUS_KM, gt=0),
+    days: int = Query(7, ge=1),
+    pest_name: Optional[str] = None,
+    current_user: dict = Depends(get_current_user)
+):
+    """Pest reports within radius_km of a point in the last `days` days (2dsphere index)"""
+    try:
+        query = {
+            "geo": within_km_filter(latitude, longitude, min(radius_km, 100)),
+            "timestamp": {"$gte": datetime.utcnow() - timedelta(days=min(days, 30))}
+        }
+        if pest_name:
+            query["pest_name"] = pest_key(pest_name)
+        
+        reports = list(pest_outbreaks_collection.find(
+            query, {"_id": 0, "user_phone": 0}
+        ).sort("timestamp", -1).limit(100))
+        
+        return {"reports": reports, "count": len(reports)}
+    except Exception as e:
+        log.error("nearby_outbreaks_error", error=e)
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/api/outbreak-clusters")
+async def get_outbreak_clusters(pest_name: str, days: int = 7, current_user: dict = Depends(get_current_user)):
+    """Spatial clusters of reports for a pest, from the incremental cluster engine"""
+    clusters = outbreak_clusters.clusters(pest_name, days=days)
+    return {"clusters": clusters, "count": len(clusters)}
+
+def load_outbreak_clusters():
+    """Create the geo index and replay recent geo-tagged reports into the cluster engine"""
+    try:
+        pest_outbreaks_collection.create_index([("geo", "2dsphere"), ("pest_name", 1), ("timestamp", -1)])
+        since = datetime.utcnow() - timedelta(days=outbreak_clusters.max_window_days)
+        for report in pest_outbreaks_collection.find(
+            {"geo": {"$exists": True}, "timestamp": {"$gte": since}},
+            {"pest_name": 1, "geo": 1, "timestamp": 1}
+        ):
+            longitude, latitude = report["geo"]["coordinates"]
+            outbreak_clusters.add(report.get("pest_name", ""), latitude, longitude, report["timestamp"])
+    except Exception as e:
+        log.error("outbreak_cluster_load_error", error=e)
+
 @app.get("/api/outbreak-map")
 async def get_outbreak_map(current_user: dict = Depends(get_current_user), language: str = "en"):
     """Get pest/disease outbreak patterns across villages"""
     try:
-        from boto3.dynamodb.conditions import Key
-        from datetime import timedelta
-        from collections import defaultdict
-        
-        week_ago = (datetime.utcnow() - timedelta(days=7)).isoformat()
-        
-        # Get all recent reports
-        response = community_reports_table.scan(
-            FilterExpression='#ts > :week_ago AND (report_type = :pest OR report_type = :disease)',
-            ExpressionAttributeNames={'#ts': 'timestamp'},
-            ExpressionAttributeValues={
-                ':week_ago': week_ago,
-                ':pest': 'pest',
-                ':disease': 'disease'
-            }
-        )
-        
-        reports = response.get('Items', [])
-        
-        # Group by village and type
-        outbreak_data = defaultdict(lambda: {'pest': 0, 'disease': 0, 'reports': []})
-        
-        for report in reports:
-            village = report.get('village_id', 'Unknown')
-            report_type = report.get('report_type')
-            outbreak_data[village][report_type] += 1
-            outbreak_data[village]['reports'].append({
-                'type': report_type,
-                'crop': report.get('crop'),
-                'description': report.get('description_english', report.get('description')),
-                'severity': report.get('severity'),
-                'timestamp': report.get('timestamp')
-            })
+        # Per-village counters maintained by submit_community_report
+        outbreak_data = outbreak_view.snapshot(days=7)
         
         # Identify outbreaks (5+ reports)
         outbreaks = []
-        language_name = LANGUAGE_NAMES.get(language, 'English')
         
         for village, data in outbreak_data.items():
             total = data['pest'] + data['disease']
             if total >= 5:
-                # Translate village name if not English
-                translated_village = village
-                if language != 'en':
-                    try:
-                        translation_response = azure_client.chat.completions.create(
-                            model=os.getenv("AZURE_OPENAI_DEPLOYMENT", "gpt-4o-mini"),
-                            messages=[
-                                {"role": "system", "content": f"Translate this place name to {language_name}. Return ONLY the translated name."},
-                                {"role": "user", "content": village}
-                            ],
-                            max_tokens=20,
-                            temperature=0.3
-                        )
-                        translated_village = translation_response.choices[0].message.content.strip()
-                    except Exception as e:
-                        print(f"Village name translation error: {e}")
+                # Place names come from the translation memory, never a per-request LLM call
+                translated_village = place_names.lookup(village, language)
                 
                 outbreaks.append({
                     'village': translated_village,
@@ -1421,26 +1562,50 @@ async def get_outbreak_map(current_user: dict = Depends(get_current_user), langu
                     'recent_reports': data['reports'][:5]
                 })
         
+        schedule_place_name_fill()
+        
         return {
             'outbreaks': outbreaks,
-            'total_reports': len(reports),
+            'total_reports': sum(data['pest'] + data['disease'] for data in outbreak_data.values()),
             'affected_villages': len(outbreak_data)
         }
     except Exception as e:
-        print(f"Outbreak map error: {e}")
+        log.error("outbreak_map_error", error=e)
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/api/audio/{audio_id}")
+async def get_audio(audio_id: str, request: Request):
+    """Stream a synthesized response clip; supports Range requests for progressive playback"""
+    clip = await audio_store.get(audio_id)
+    if clip is None:
+        raise HTTPException(status_code=404, detail="Audio not found or expired")
+    audio, media_type = clip
+    
+    size = len(audio)
+    headers = {"Accept-Ranges": "bytes", "Cache-Control": f"private, max-age={audio_store.ttl}"}
+    try:
+        byte_range = parse_range(request.headers.get("range"), size)
+    except ValueError:
+        return Response(status_code=416, headers={"Content-Range": f"bytes */{size}"})
+    
+    status_code = 200
+    start, end = 0, size - 1
+    if byte_range:
+        start, end = byte_range
+        status_code = 206
+        headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+    headers["Content-Length"] = str(end - start + 1)
+    return StreamingResponse(iter_chunks(audio, start, end), status_code=status_code, media_type=media_type, headers=headers)
+
 @app.post("/process-text")
-async def process_text(request: TextRequest, current_user: dict = Depends(get_current_user)):
+async def process_text(request: TextRequest, http_request: Request, current_user: dict = Depends(get_current_user)):
     try:
         user_location = current_user.get("location", "India")
-        print(f"Process text: {request.text[:50]}...")
         
         # OPTIMIZED: Fetch minimal context data (use sync version in async context)
-        context_data = fetch_context_sync(user_location, request.text)
-        formatted_context = format_context_for_llm(context_data)
-        
-        print(f"Context: {len(formatted_context)} chars")
+        with span("context"):
+            context_data = fetch_context_sync(user_location, request.text)
+            formatted_context = format_context_for_llm(context_data)
         
         # Shorter system prompt
         system_prompt = f"""You are Gram Vaani, AI assistant for rural India. Use the data below to answer.
@@ -1449,20 +1614,22 @@ async def process_text(request: TextRequest, current_user: dict = Depends(get_cu
 
 Be concise and practical."""
         
-        response = azure_client.chat.completions.create(
-            model=os.getenv("AZURE_OPENAI_DEPLOYMENT", "gpt-4o-mini"),
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": request.text}
-            ],
-            max_tokens=500,  # Reduced from 1000
-            temperature=0.7
-        )
+        with span("llm"):
+            response = azure_client.chat.completions.create(
+                model=os.getenv("AZURE_OPENAI_DEPLOYMENT", "gpt-4o-mini"),
+                messages=[
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": request.text}
+                ],
+                max_tokens=500,  # Reduced from 1000
+                temperature=0.7
+            )
         
         response_text = response.choices[0].message.content
         
-        # Async TTS generation
-        audio_data = synthesize_speech(response_text, request.language)
+        # TTS runs in the background; the client streams it from audio_url
+        with span("tts"):
+            audio_url = speech_url(response_text, request.language, request.audio_profile, http_request.headers)
         
         # Log query async (don't wait)
         query_id = str(uuid.uuid4())
@@ -1471,10 +1638,10 @@ Be concise and practical."""
         return JSONResponse({
             "query_id": query_id,
             "response_text": response_text,
-            "audio_data": audio_data
+            "audio_url": audio_url
         })
     except Exception as e:
-        print(f"Process text error: {str(e)}")
+        log.error("process_text_error", error=e)
         raise HTTPException(status_code=500, detail=f"Error: {str(e)}")
 
 async def log_query_async(query_id: str, user: dict, query: str, response: str, language: str):
@@ -1491,17 +1658,17 @@ async def log_query_async(query_id: str, user: dict, query: str, response: str,
         }
         queries_table.put_item(Item=query_item)
     except Exception as e:
-        print(f"Log error: {e}")
+        log.error("query_log_error", error=e)
 
 @app.post("/api/weather")
-async def get_weather(request: WeatherRequest, current_user: dict = Depends(get_current_user)):
+async def get_weather(request: WeatherRequest, http_request: Request, current_user: dict = Depends(get_current_user)):
     try:
         city = request.city
         if not city or city == 'current':
             location = current_user.get("location", "Delhi")
             city = location.split(",")[0].strip()
         
-        print(f"Weather request for city: {city}, language: {request.language}")
+        log.debug("weather_request", city=city, language=request.language)
         
         api_key = os.getenv("OPENWEATHER_API_KEY")
         if not api_key:
@@ -1511,13 +1678,13 @@ async def get_weather(request: WeatherRequest, current_user: dict = Depends(get_
             )
         
         url = f"https://api.openweathermap.org/data/2.5/weather?q={city}&appid={api_key}&units=metric"
-        res = requests.get(url, timeout=10)
+        res = http.get(url, timeout=10)
         
         if res.status_code == 404:
             location_parts = current_user.get("location", "Delhi").split(",")
             if len(location_parts) > 1:
                 fallback_city = location_parts[1].strip()
-                res = requests.get(
+                res = http.get(
                     f"https://api.openweathermap.org/data/2.5/weather?q={fallback_city}&appid={api_key}&units=metric",
                     timeout=10
                 )
@@ -1544,18 +1711,16 @@ async def get_weather(request: WeatherRequest, current_user: dict = Depends(get_
         )
         
         response_text = ai_response.choices[0].message.content
-        print(f"Weather response in {language_name}: {response_text}")
         
-        audio_data = synthesize_speech(response_text, request.language)
-        return JSONResponse({"text": response_text, "audio_data": audio_data})
+        return JSONResponse({"text": response_text, "audio_url": speech_url(response_text, request.language, request.audio_profile, http_request.headers)})
     except HTTPException:
         raise
     except Exception as e:
-        print(f"Weather error: {str(e)}")
+        log.error("weather_error", error=e)
         raise HTTPException(status_code=500, detail=f"Error fetching weather: {str(e)}")
 
 @app.post("/api/crop-prices")
-async def get_crop_prices(request: CropPriceRequest, current_user: dict = Depends(get_current_user)):
+async def get_crop_prices(request: CropPriceRequest, http_request: Request, current_user: dict = Depends(get_current_user)):
     try:
         market = request.market or current_user.get("location", "Delhi").split(",")[0]
         
@@ -1579,17 +1744,15 @@ async def get_crop_prices(request: CropPriceRequest, current_user: dict = Depend
         )
         
         response_text = ai_response.choices[0].message.content
-        print(f"Crop price response in {language_name}: {response_text}")
         
-        audio_data = synthesize_speech(response_text, request.language)
-        return JSONResponse({"text": response_text, "audio_data": audio_data})
+        return JSONResponse({"text": response_text, "audio_url": speech_url(response_text, request.language, request.audio_profile, http_request.headers)})
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/api/gov-schemes")
-async def get_gov_schemes(request: SchemeRequest, current_user: dict = Depends(get_current_user)):
+async def get_gov_schemes(request: SchemeRequest, http_request: Request, current_user: dict = Depends(get_current_user)):
     try:
-        print(f"Schemes request for topic: {request.topic}, language: {request.language}")
+        log.debug("schemes_request", topic=request.topic, language=request.language)
         
         language_name = LANGUAGE_NAMES.get(request.language, "English")
         
@@ -1604,12 +1767,10 @@ async def get_gov_schemes(request: SchemeRequest, current_user: dict = Depends(g
         )
         
         response_text = response.choices[0].message.content
-        print(f"Schemes response in {language_name} generated successfully")
         
-        audio_data = synthesize_speech(response_text, request.language)
-        return JSONResponse({"text": response_text, "audio_data": audio_data})
+        return JSONResponse({"text": response_text, "audio_url": speech_url(response_text, request.language, request.audio_profile, http_request.headers)})
     except Exception as e:
-        print(f"Schemes error: {str(e)}")
+        log.error("schemes_error", error=e)
         raise HTTPException(status_code=500, detail=f"Error fetching schemes: {str(e)}")
 
 @app.post("/api/transcribe")
@@ -1629,13 +1790,13 @@ async def transcribe_audio(file: UploadFile = File(...), language: str = "hi", c
     except HTTPException:
         raise
     except Exception as e:
-        print(f"Transcribe error: {str(e)}")
+        log.error("transcribe_error", error=e)
         raise HTTPException(status_code=500, detail=f"Transcription failed: {str(e)}")
 
 @app.post("/process-audio")
-async def process_audio(file: UploadFile = File(...), language: str = "hi", current_user: dict = Depends(get_current_user)):
+async def process_audio(http_request: Request, file: UploadFile = File(...), language: str = "hi", audio_profile: Optional[str] = None, current_user: dict = Depends(get_current_user)):
     try:
-        print(f"Audio: {file.filename}, lang: {language}")
+        log.debug("process_audio", filename=file.filename, language=language)
         
         if not file.filename:
             raise HTTPException(status_code=400, detail="No file")
@@ -1646,9 +1807,8 @@ async def process_audio(file: UploadFile = File(...), language: str = "hi", curr
         
         audio_bytes = await file.read()
         
-        # Transcribe
+        # Transcribe (S3 upload, job and polling are timed inside TranscribeService)
         transcript = await transcribe_service.transcribe_audio(audio_bytes, file_extension, language)
-        print(f"Transcript: {transcript[:50]}...")
         
         if not transcript:
             raise HTTPException(status_code=400, detail="Transcription failed")
@@ -1656,8 +1816,9 @@ async def process_audio(file: UploadFile = File(...), language: str = "hi", curr
         user_location = current_user.get("location", "India")
         
         # OPTIMIZED: Minimal context (use sync version)
-        context_data = fetch_context_sync(user_location, transcript)
-        formatted_context = format_context_for_llm(context_data)
+        with span("context"):
+            context_data = fetch_context_sync(user_location, transcript)
+            formatted_context = format_context_for_llm(context_data)
         
         language_name = LANGUAGE_NAMES.get(language, "English")
         system_prompt = f"""You are Gram Vaani. Help with farming. User in {user_location}. Respond in {language_name} ONLY.
@@ -1666,15 +1827,16 @@ async def process_audio(file: UploadFile = File(...), language: str = "hi", curr
 
 Be concise."""
         
-        ai_response = azure_client.chat.completions.create(
-            model=os.getenv("AZURE_OPENAI_DEPLOYMENT", "gpt-4o-mini"),
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": transcript}
-            ],
-            max_tokens=500,  # Reduced
-            temperature=0.7
-        )
+        with span("llm"):
+            ai_response = azure_client.chat.completions.create(
+                model=os.getenv("AZURE_OPENAI_DEPLOYMENT", "gpt-4o-mini"),
+                messages=[
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": transcript}
+                ],
+                max_tokens=500,  # Reduced
+                temperature=0.7
+            )
         
         response_text = ai_response.choices[0].message.content
         
@@ -1682,19 +1844,20 @@ Be concise."""
         query_id = str(uuid.uuid4())
         asyncio.create_task(log_query_async(query_id, current_user, transcript, response_text, language))
         
-        audio_data = synthesize_speech(response_text, language)
+        with span("tts"):
+            audio_url = speech_url(response_text, language, audio_profile, http_request.headers)
 
         return JSONResponse({
             "query_id": query_id,
             "transcript": transcript,
             "response_text": response_text,
-            "audio_data": audio_data
+            "audio_url": audio_url
         })
         
     except HTTPException:
         raise
     except Exception as e:
-        print(f"Audio error: {str(e)}")
+        log.error("audio_error", error=e)
         raise HTTPException(status_code=500, detail=f"Error: {str(e)}")
 
 
@@ -1712,7 +1875,7 @@ async def get_advisor_weather(current_user: dict = Depends(get_current_user)):
             return {"temperature": 25, "humidity": 60, "rainfall": 0, "condition": "Clear", "alert": None}
         
         url = f"https://api.openweathermap.org/data/2.5/weather?q={city}&appid={api_key}&units=metric"
-        res = requests.get(url, timeout=10)
+        res = await asyncio.to_thread(http.get, url, timeout=10)
         
         if res.status_code != 200:
             return {"temperature": 25, "humidity": 60, "rainfall": 0, "condition": "Clear", "alert": None}
@@ -1734,7 +1897,7 @@ async def get_advisor_weather(current_user: dict = Depends(get_current_user)):
             "alert": alert
         }
     except Exception as e:
-        print(f"Weather error: {e}")
+        log.error("weather_error", error=e)
         return {"temperature": 25, "humidity": 60, "rainfall": 0, "condition": "Clear", "alert": None}
 
 
@@ -1743,7 +1906,7 @@ async def get_agriculture_news(current_user: dict = Depends(get_current_user)):
     """Get agriculture news for Advisor page"""
     try:
         # Check MongoDB for cached news
-        news = list(mongo_db.agriculture_news.find().sort("published_at", -1).limit(6))
+        news = await asyncio.to_thread(lambda: list(mongo_db.agriculture_news.find().sort("published_at", -1).limit(6)))
         
         if news:
             for item in news:
@@ -1804,38 +1967,54 @@ async def get_agriculture_news(current_user: dict = Depends(get_current_user)):
         
         return sample_news
     except Exception as e:
-        print(f"Agriculture news error: {e}")
+        log.error("agriculture_news_error", error=e)
         return []
 
 
+def default_environmental_profile(user: dict) -> dict:
+    """Environmental profile created on a user's first visit"""
+    return {
+        "location": user.get("location", "Unknown"),
+        "temperature": 12,
+        "humidity": 37,
+        "rainfall": 100,
+        "nitrogen": 50,
+        "phosphorus": 50,
+        "potassium": 50,
+        "soil_ph": 8.5
+    }
+
+def default_farm_intelligence(user: dict) -> dict:
+    """Farm intelligence analytics created on a user's first visit"""
+    return {
+        "location": user.get("location", "Unknown"),
+        "load_predictions": 3,
+        "top_crop": "mango",
+        "soil_stability": 86,
+        "climate_risk": "Low",
+        "feature_importance": {
+            "nitrogen": 20,
+            "phosphorus": 15,
+            "potassium": 15,
+            "temperature": 18,
+            "humidity": 12,
+            "ph": 10,
+            "rainfall": 10
+        }
+    }
+
+# Per-user profile documents, cached with write-through
+environmental_profiles = ProfileStore(_mongo_collection("environmental_profiles"), default_environmental_profile)
+farm_intelligence_analytics = ProfileStore(_mongo_collection("farm_intelligence_analytics"), default_farm_intelligence)
+
 @app.get("/api/environmental-profile")
 async def get_environmental_profile(current_user: dict = Depends(get_current_user)):
     """Get environmental profile for current user"""
     try:
-        # Check if user has profile in MongoDB
-        profile = mongo_db.environmental_profiles.find_one({"user_phone": current_user["phone_number"]})
-        
-        if not profile:
-            # Create default profile
-            profile = {
-                "user_phone": current_user["phone_number"],
-                "location": current_user.get("location", "Unknown"),
-                "temperature": 12,
-                "humidity": 37,
-                "rainfall": 100,
-                "nitrogen": 50,
-                "phosphorus": 50,
-                "potassium": 50,
-                "soil_ph": 8.5,
-                "created_at": datetime.utcnow()
-            }
-            mongo_db.environmental_profiles.insert_one(profile)
-        
-        # Remove MongoDB _id
-        profile.pop('_id', None)
-        return profile
+        # Created from defaults on first access (single atomic upsert)
+        return await environmental_profiles.get(current_user)
     except Exception as e:
-        print(f"Environmental profile error: {e}")
+        log.error("environmental_profile_error", error=e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -1848,25 +2027,22 @@ async def get_crop_recommendations_smart(current_user: dict = Depends(get_curren
         # Extract region from location (city, district, or state)
         location_parts = [p.strip().lower() for p in location.split(",")]
         
-        # Try to find crops suitable for user's region
-        query = {}
-        if location_parts:
-            # Search by region in crop data
-            query = {
-                "$or": [
-                    {"suitable_regions": {"$regex": location_parts[0], "$options": "i"}},
-                    {"climate_zone": {"$regex": location_parts[0], "$options": "i"}}
-                ]
-            }
+        # Add the matched district, state and climate zone from hyperlocal data, if any
+        hyperlocal = await fetch_hyperlocal_data(location) if location else None
+        if hyperlocal:
+            location_parts += [hyperlocal.get("district"), hyperlocal.get("state"), hyperlocal.get("climate_zone")]
         
-        crops = list(mongo_db.crop_recommendations.find(query).limit(10))
+        # Rank crops by how many region/climate tokens they share with the user (in-memory index)
+        catalogue = crop_catalogue.snapshot
+        indices = catalogue.match_regions(location_parts, 10)
         
         # If no location-specific crops found, get general recommendations
-        if not crops:
-            crops = list(mongo_db.crop_recommendations.find().limit(10))
+        if not indices:
+            indices = list(range(min(10, len(catalogue))))
+        crops = [catalogue.crop(i) for i in indices]
         
         # Get user's environmental profile for compatibility scoring
-        profile = mongo_db.environmental_profiles.find_one({"user_phone": current_user["phone_number"]})
+        profile = await environmental_profiles.find(current_user["phone_number"])
         
         if profile:
             # Calculate compatibility for each crop
@@ -1880,8 +2056,9 @@ async def get_crop_recommendations_smart(current_user: dict = Depends(get_curren
                 rainfall=profile.get("rainfall", 100)
             )
             
-            for crop in crops:
-                crop["soil_compatibility"] = calculate_compatibility(params, crop)
+            scores = catalogue.engine.score(params)
+            for crop, index in zip(crops, indices):
+                crop["soil_compatibility"] = int(scores[index])
             
             # Sort by compatibility
             crops.sort(key=lambda x: x.get("soil_compatibility", 0), reverse=True)
@@ -1891,10 +2068,34 @@ async def get_crop_recommendations_smart(current_user: dict = Depends(get_curren
         
         return crops
     except Exception as e:
-        print(f"Crop recommendations error: {e}")
+        log.error("crop_recommendations_error", error=e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
+def generate_strategies(bucket: dict) -> list:
+    """Generate 4 strategies for a strategy_profile bucket with JSON-schema structured output"""
+    import json
+    context = f"""Location: {bucket['location']}
+Soil pH: {bucket['soil_ph']}
+Temperature: {bucket['temperature']}°C
+Humidity: {bucket['humidity']}%
+Rainfall: {bucket['rainfall']}mm
+Top Crops: {', '.join(bucket['crops'])}"""
+    
+    response = azure_client.chat.completions.create(
+        model=os.getenv("AZURE_OPENAI_DEPLOYMENT", "gpt-4o-mini"),
+        messages=[
+            {"role": "system", "content": "You are an agricultural expert. Generate 4 practical farming optimization strategies. cost_effectiveness is a percentage like 150%. Be concise."},
+            {"role": "user", "content": f"Generate 4 farming optimization strategies for:\n{context}"}
+        ],
+        response_format={"type": "json_schema", "json_schema": STRATEGY_SCHEMA},
+        max_tokens=800,
+        temperature=0.7
+    )
+    return json.loads(response.choices[0].message.content)["strategies"][:4]
+
+strategy_cache = StrategyCache(generate_strategies)
+
 @app.get("/api/optimization-strategies")
 async def get_optimization_strategies(current_user: dict = Depends(get_current_user)):
     """Generate AI-powered farming optimization strategies based on location and crops"""
@@ -1902,52 +2103,16 @@ async def get_optimization_strategies(current_user: dict = Depends(get_current_u
         location = current_user.get("location", "India")
         
         # Get user's environmental profile
-        profile = mongo_db.environmental_profiles.find_one({"user_phone": current_user["phone_number"]})
+        profile = await environmental_profiles.find(current_user["phone_number"])
         
         # Get top recommended crops
-        crops = list(mongo_db.crop_recommendations.find().limit(3))
-        crop_names = [c.get("crop_name", "") for c in crops]
-        
-        # Build context for AI
-        context = f"""Location: {location}
-Soil pH: {profile.get('soil_ph', 7.0) if profile else 7.0}
-Temperature: {profile.get('temperature', 25) if profile else 25}°C
-Humidity: {profile.get('humidity', 60) if profile else 60}%
-Rainfall: {profile.get('rainfall', 100) if profile else 100}mm
-Top Crops: {', '.join(crop_names)}"""
-        
-        # Generate strategies using AI
-        response = azure_client.chat.completions.create(
-            model=os.getenv("AZURE_OPENAI_DEPLOYMENT", "gpt-4o-mini"),
-            messages=[
-                {"role": "system", "content": "You are an agricultural expert. Generate 4 practical farming optimization strategies. Return ONLY a JSON array with objects containing: strategy_name, impact_level (High/Medium/Low), difficulty (Low/Medium/High), cost_effectiveness (percentage like 150%), badge (Minimal/Moderate/Peak). Be concise."},
-                {"role": "user", "content": f"Generate 4 farming optimization strategies for:\n{context}"}
-            ],
-            max_tokens=800,
-            temperature=0.7
-        )
-        
-        import json
-        strategies_text = response.choices[0].message.content.strip()
-        
-        # Extract JSON from response
-        if "```json" in strategies_text:
-            strategies_text = strategies_text.split("```json")[1].split("```")[0].strip()
-        elif "```" in strategies_text:
-            strategies_text = strategies_text.split("```")[1].split("```")[0].strip()
+        crop_names = [c.get("crop_name", "") for c in crop_catalogue.snapshot.crops[:3]]
         
-        try:
-            strategies = json.loads(strategies_text)
-            return strategies
-        except:
-            # Fallback to database strategies if AI parsing fails
-            strategies = list(mongo_db.optimization_strategies.find().limit(4))
-            for strategy in strategies:
-                strategy.pop('_id', None)
-            return strategies
-            
+        # Strategies are cached per coarse (location, soil/climate, crops) bucket
+        bucket = strategy_profile(location, profile, crop_names)
+        return await strategy_cache.get(bucket)
     except Exception as e:
-        print(f"Optimization strategies error: {e}")
+        log.error("optimization_strategies_error", error=e)
         # Fallback to database
         try:
             strategies = list(mongo_db.optimization_strategies.find().limit(4))
@@ -1962,37 +2127,60 @@ Top Crops: {', '.join(crop_names)}"""
 async def get_farm_intelligence(current_user: dict = Depends(get_current_user)):
     """Get farm intelligence analytics"""
     try:
-        analytics = mongo_db.farm_intelligence_analytics.find_one({"user_phone": current_user["phone_number"]})
-        
-        if not analytics:
-            # Create default analytics
-            analytics = {
-                "user_phone": current_user["phone_number"],
-                "location": current_user.get("location", "Unknown"),
-                "load_predictions": 3,
-                "top_crop": "mango",
-                "soil_stability": 86,
-                "climate_risk": "Low",
-                "feature_importance": {
-                    "nitrogen": 20,
-                    "phosphorus": 15,
-                    "potassium": 15,
-                    "temperature": 18,
-                    "humidity": 12,
-                    "ph": 10,
-                    "rainfall": 10
-                },
-                "created_at": datetime.utcnow()
-            }
-            mongo_db.farm_intelligence_analytics.insert_one(analytics)
-        
-        analytics.pop('_id', None)
-        return analytics
+        # Created from defaults on first access (single atomic upsert)
+        return await farm_intelligence_analytics.get(current_user)
     except Exception as e:
-        print(f"Farm intelligence error: {e}")
+        log.error("farm_intelligence_error", error=e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
+# Per-section deadlines (seconds) for the bundled Advisor dashboard. A missed deadline
+# cancels the section, so shared single-flight work it awaits (strategy generation)
+# must be shielded by its owner, or one impatient dashboard cancels it for everyone
+ADVISOR_SECTION_TIMEOUTS = {
+    "weather_info": 4,
+    "agriculture_news": 3,
+    "environmental_profile": 3,
+    "crop_recommendations": 4,
+    "optimization_strategies": 8,
+    "farm_intelligence": 3,
+}
+
+@app.get("/api/advisor-dashboard")
+async def get_advisor_dashboard(current_user: dict = Depends(get_current_user)):
+    """Everything the Advisor page needs in one round-trip.
+
+    The user is resolved once and the six sections run concurrently; a section that
+    misses its deadline or fails is reported in `errors` and left out of `sections`.
+    """
+    handlers = {
+        "weather_info": get_advisor_weather,
+        "agriculture_news": get_agriculture_news,
+        "environmental_profile": get_environmental_profile,
+        "crop_recommendations": get_crop_recommendations_smart,
+        "optimization_strategies": get_optimization_strategies,
+        "farm_intelligence": get_farm_intelligence,
+    }
+    
+    async def run_section(name, handler):
+        try:
+            return name, await asyncio.wait_for(handler(current_user=current_user), ADVISOR_SECTION_TIMEOUTS[name]), None
+        except asyncio.TimeoutError:
+            return name, None, "timeout"
+        except HTTPException as e:
+            return name, None, str(e.detail)
+        except Exception as e:
+            log.error("advisor_dashboard_section_error", section=name, error=e)
+            return name, None, "error"
+    
+    results = await asyncio.gather(*(run_section(name, handler) for name, handler in handlers.items()))
+    
+    return {
+        "sections": {name: data for name, data, error in results if error is None},
+        "errors": {name: error for name, _, error in results if error is not None}
+    }
+
+
 class SoilParams(BaseModel):
     nitrogen: int
     phosphorus: int
@@ -2007,116 +2195,273 @@ class SoilParams(BaseModel):
 async def get_crop_recommendation_custom(params: SoilParams, current_user: dict = Depends(get_current_user)):
     """Get crop recommendation based on custom soil parameters"""
     try:
-        # Update user's environmental profile
-        mongo_db.environmental_profiles.update_one(
-            {"user_phone": current_user["phone_number"]},
-            {"$set": {
-                "nitrogen": params.nitrogen,
-                "phosphorus": params.phosphorus,
-                "potassium": params.potassium,
-                "temperature": params.temperature,
-                "humidity": params.humidity,
-                "soil_ph": params.ph,
-                "rainfall": params.rainfall,
-                "updated_at": datetime.utcnow()
-            }},
-            upsert=True
-        )
+        # Update user's environmental profile (write-through, so cached reads see it immediately)
+        await environmental_profiles.update(current_user["phone_number"], {
+            "nitrogen": params.nitrogen,
+            "phosphorus": params.phosphorus,
+            "potassium": params.potassium,
+            "temperature": params.temperature,
+            "humidity": params.humidity,
+            "soil_ph": params.ph,
+            "rainfall": params.rainfall
+        })
         
-        # Get all crops and calculate compatibility
-        crops = list(mongo_db.crop_recommendations.find())
+        # Score every crop in one vectorized pass and keep the top 10
+        catalogue = crop_catalogue.snapshot
         
-        for crop in crops:
-            crop.pop('_id', None)
-            # Calculate compatibility score
-            score = calculate_compatibility(params, crop)
+        recommendations = []
+        for index, score in catalogue.engine.top_k(params, 10):
+            crop = catalogue.crop(index)
             crop["soil_compatibility"] = score
+            recommendations.append(crop)
         
-        # Sort by compatibility
-        crops.sort(key=lambda x: x["soil_compatibility"], reverse=True)
-        
-        return {"recommendations": crops[:10]}
+        return {"recommendations": recommendations}
     except Exception as e:
-        print(f"Get recommendation error: {e}")
+        log.error("get_recommendation_error", error=e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
-def calculate_compatibility(params: SoilParams, crop: dict) -> int:
-    """Calculate crop compatibility score based on soil parameters"""
-    try:
-        optimal = crop.get("optimal_conditions", {})
-        
-        # If no optimal conditions, return default score
-        if not optimal:
-            return 50
-        
-        score = 0
-        checks = 0
-        
-        # Temperature check (15 points)
-        if "temperature_min" in optimal and "temperature_max" in optimal:
-            temp_min, temp_max = optimal["temperature_min"], optimal["temperature_max"]
-            if temp_min <= params.temperature <= temp_max:
-                score += 15
-            elif abs(params.temperature - (temp_min + temp_max) / 2) <= 5:
-                score += 10  # Partial score if close
-            checks += 15
-        
-        # Humidity check (15 points)
-        if "humidity_min" in optimal and "humidity_max" in optimal:
-            hum_min, hum_max = optimal["humidity_min"], optimal["humidity_max"]
-            if hum_min <= params.humidity <= hum_max:
-                score += 15
-            elif abs(params.humidity - (hum_min + hum_max) / 2) <= 10:
-                score += 10
-            checks += 15
-        
-        # Rainfall check (15 points)
-        if "rainfall_min" in optimal and "rainfall_max" in optimal:
-            rain_min, rain_max = optimal["rainfall_min"], optimal["rainfall_max"]
-            if rain_min <= params.rainfall <= rain_max:
-                score += 15
-            elif abs(params.rainfall - (rain_min + rain_max) / 2) <= 20:
-                score += 10
-            checks += 15
-        
-        # Nitrogen check (15 points)
-        if "nitrogen_min" in optimal and "nitrogen_max" in optimal:
-            n_min, n_max = optimal["nitrogen_min"], optimal["nitrogen_max"]
-            if n_min <= params.nitrogen <= n_max:
-                score += 15
-            elif abs(params.nitrogen - (n_min + n_max) / 2) <= 10:
-                score += 10
-            checks += 15
-        
-        # Phosphorus check (15 points)
-        if "phosphorus_min" in optimal and "phosphorus_max" in optimal:
-            p_min, p_max = optimal["phosphorus_min"], optimal["phosphorus_max"]
-            if p_min <= params.phosphorus <= p_max:
-                score += 15
-            elif abs(params.phosphorus - (p_min + p_max) / 2) <= 10:
-                score += 10
-            checks += 15
-        
-        # Potassium check (15 points)
-        if "potassium_min" in optimal and "potassium_max" in optimal:
-            k_min, k_max = optimal["potassium_min"], optimal["potassium_max"]
-            if k_min <= params.potassium <= k_max:
-                score += 15
-            elif abs(params.potassium - (k_min + k_max) / 2) <= 10:
-                score += 10
-            checks += 15
-        
-        # pH check (10 points)
-        if "ph_min" in optimal and "ph_max" in optimal:
-            ph_min, ph_max = optimal["ph_min"], optimal["ph_max"]
-            if ph_min <= params.ph <= ph_max:
-                score += 10
-            elif abs(params.ph - (ph_min + ph_max) / 2) <= 0.5:
-                score += 7
-            checks += 10
-        
-        return int((score / checks) * 100) if checks > 0 else 50
-    except Exception as e:
-        print(f"Compatibility calculation error: {e}")
-        return 50
+BATCH_MAX_ROWS = 20000
+BATCH_CHUNK_ROWS = 500  # rows scored per matrix block
+# Accounts that may write profiles for the farmers listed in their `linked_farmers`;
+# both attributes are set on the user record by an admin, never through signup
+PARTNER_ROLES = {"advisor", "partner"}
+
+def farmer_write_check(user: dict):
+    """can_write(farmer_id): the caller's own profile, or a farmer linked to an advisor/partner account"""
+    own = normalize_phone_number(user["phone_number"])
+    linked = set()
+    if user.get("role") in PARTNER_ROLES:
+        linked = {normalize_phone_number(str(phone)) for phone in user.get("linked_farmers") or ()}
+
+    def can_write(farmer_id: str) -> bool:
+        farmer_id = normalize_phone_number(farmer_id.strip())
+        return farmer_id == own or farmer_id in linked
+    return can_write
+
+class BatchSoilParams(SoilParams):
+    farmer_id: Optional[str] = None
+
+    @field_validator("farmer_id", mode="before")
+    @classmethod
+    def farmer_id_as_text(cls, value):
+        """Phone numbers often arrive as JSON numbers"""
+        return str(value) if isinstance(value, int) and not isinstance(value, bool) else value
+
+class BatchCropRequest(BaseModel):
+    profiles: list  # validated row by row, so one bad row doesn't fail the batch
+    top_k: int = 5
+
+def phone_key_candidates(phone: str) -> list:
+    """Keys a farmer may be registered under: as given, without and with the 91 prefix"""
+    phone = str(phone).strip()
+    normalized = normalize_phone_number(phone)
+    return list(dict.fromkeys([phone, normalized, f"91{normalized}"]))
+
+def resolve_farmers(farmer_ids: set) -> dict:
+    """normalized farmer id -> user record, for the ids registered in the users table (blocking)"""
+    keys = list(dict.fromkeys(key for farmer_id in farmer_ids for key in phone_key_candidates(farmer_id)))
+    dynamodb = deps.get("dynamodb")
+    users = {}
+    for start in range(0, len(keys), 100):  # BatchGetItem limit
+        request = {users_table.name: {
+            "Keys": [{"phone_number": key} for key in keys[start:start + 100]],
+            "ProjectionExpression": "phone_number, #loc, #lang",
+            "ExpressionAttributeNames": {"#loc": "location", "#lang": "language"},
+        }}
+        while request:
+            response = dynamodb.batch_get_item(RequestItems=request)
+            for user in response.get("Responses", {}).get(users_table.name, []):
+                users[user["phone_number"]] = user
+            request = response.get("UnprocessedKeys")
+    resolved = {}
+    for farmer_id in farmer_ids:
+        user = next((users[key] for key in phone_key_candidates(farmer_id) if key in users), None)
+        if user is not None:
+            resolved[normalize_phone_number(farmer_id.strip())] = user
+    return resolved
+
+class _LineFeed:
+    """Lines for one csv.reader, refilled as the body streams in"""
+
+    def __init__(self):
+        self.lines = []
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if not self.lines:
+            raise StopIteration
+        return self.lines.pop(0)
+
+async def iter_csv_rows(request: Request):
+    """Yield dict rows from a streamed CSV body without buffering it whole"""
+    import codecs
+    import csv
+    decoder = codecs.getincrementaldecoder("utf-8")()  # keeps a character split across chunks
+    feed = _LineFeed()
+    reader = csv.reader(feed, strict=True)
+    header = None
+    buffer = ""
+    record, quotes = [], 0  # lines of the current record; odd quotes = a quoted field spans lines
+
+    async def text():
+        try:
+            async for chunk in request.stream():
+                yield decoder.decode(chunk)
+            yield decoder.decode(b"", final=True)
+        except UnicodeDecodeError:
+            raise HTTPException(status_code=400, detail="CSV body is not valid UTF-8")
+
+    def complete(lines: list) -> list:
+        """Rows completed by `lines`; the reader only ever sees whole records"""
+        nonlocal quotes
+        rows = []
+        for line in lines:
+            record.append(line)
+            quotes += line.count('"')
+            if quotes % 2:
+                continue
+            feed.lines.extend(record)
+            record.clear()
+            quotes = 0
+            try:
+                rows.append(next(reader))
+            except csv.Error as e:
+                raise HTTPException(status_code=400, detail=f"Invalid CSV at line {reader.line_num}: {e}")
+        return rows
+
+    async def records():
+        nonlocal buffer
+        async for piece in text():
+            buffer += piece
+            *lines, buffer = buffer.split("\n")
+            for row in complete([line + "\n" for line in lines]):
+                yield row
+        for row in complete([buffer] if buffer else []):
+            yield row
+        if record:
+            raise HTTPException(status_code=400, detail="Invalid CSV: unterminated quoted field")
+
+    async for values in records():
+        if not any(v.strip() for v in values):
+            continue
+        if header is None:
+            header = [h.strip().lstrip("\ufeff") for h in values]
+        else:
+            yield dict(zip(header, values))
+
+@app.post("/api/batch-crop-recommendations")
+async def batch_crop_recommendations(request: Request, top_k: int = 5, current_user: dict = Depends(get_current_user)):
+    """Score many soil profiles (JSON {"profiles": [...]} or a CSV body) and stream top-k crops as NDJSON.
+
+    Rows carrying a farmer_id also update that farmer's environmental profile, in bulk: the
+    caller's own, or (advisor/partner accounts) their linked farmers'. Rows for other or
+    unregistered farmers, and rows that don't validate, get a per-row error.
+    """
+    import json
+    from pymongo import UpdateOne
+
+    if request.headers.get("content-type", "").startswith("text/csv"):
+        # CSV is parsed as it arrives; only the parsed rows are kept
+        profiles = []
+        async for raw in iter_csv_rows(request):
+            if len(profiles) >= BATCH_MAX_ROWS:
+                raise HTTPException(status_code=413, detail=f"At most {BATCH_MAX_ROWS} profiles per batch")
+            try:
+                profiles.append(BatchSoilParams(**{k: v for k, v in raw.items() if v != ""}))
+            except Exception as e:
+                profiles.append(ValueError(str(e)))
+    else:
+        try:
+            body = BatchCropRequest(**(await request.json()))
+        except Exception as e:
+            raise HTTPException(status_code=400, detail=f"Invalid batch request: {e}")
+        if len(body.profiles) > BATCH_MAX_ROWS:
+            raise HTTPException(status_code=413, detail=f"At most {BATCH_MAX_ROWS} profiles per batch")
+        profiles, top_k = [], body.top_k
+        for raw in body.profiles:
+            try:
+                profiles.append(BatchSoilParams(**raw))
+            except Exception as e:
+                profiles.append(ValueError(str(e)))
+    top_k = max(1, min(top_k, 50))
+
+    can_write = farmer_write_check(current_user)
+    profiles = [
+        PermissionError(f"not authorized to update farmer {p.farmer_id}")
+        if not isinstance(p, Exception) and p.farmer_id and not can_write(p.farmer_id) else p
+        for p in profiles
+    ]
+
+    # Profiles are keyed by the farmer's users-table phone number, like every read path
+    own_id = normalize_phone_number(current_user["phone_number"])
+    others = {p.farmer_id for p in profiles if not isinstance(p, Exception) and p.farmer_id
+              and normalize_phone_number(p.farmer_id.strip()) != own_id}
+    farmers = await asyncio.to_thread(resolve_farmers, others) if others else {}
+    farmers[own_id] = current_user
+
+    def farmer_of(p):
+        return farmers.get(normalize_phone_number(p.farmer_id.strip()))
+
+    profiles = [
+        LookupError(f"no registered farmer {p.farmer_id}")
+        if not isinstance(p, Exception) and p.farmer_id and farmer_of(p) is None else p
+        for p in profiles
+    ]
+
+    catalogue = crop_catalogue.snapshot
+
+    def score_chunk(chunk: list) -> list:
+        valid = [(i, p) for i, p in chunk if not isinstance(p, Exception)]
+        results = dict(zip((i for i, _ in valid), score_batch(catalogue.engine, [p for _, p in valid], top_k)))
+
+        updates, written = [], []
+        for _, p in valid:
+            if not p.farmer_id:
+                continue
+            farmer = farmer_of(p)
+            fields = {
+                "nitrogen": p.nitrogen,
+                "phosphorus": p.phosphorus,
+                "potassium": p.potassium,
+                "temperature": p.temperature,
+                "humidity": p.humidity,
+                "soil_ph": p.ph,
+                "rainfall": p.rainfall,
+                "updated_at": datetime.utcnow(),
+                "updated_by": current_user["phone_number"]
+            }
+            # A first profile gets the same defaults as one created on the farmer's first visit
+            defaults = {k: v for k, v in default_environmental_profile(farmer).items() if k not in fields}
+            defaults["created_at"] = datetime.utcnow()
+            updates.append(UpdateOne({"user_phone": farmer["phone_number"]}, {"$set": fields, "$setOnInsert": defaults}, upsert=True))
+            written.append(farmer["phone_number"])
+        if updates:
+            mongo_db.environmental_profiles.bulk_write(updates, ordered=False)
+            for phone in written:
+                environmental_profiles.invalidate(phone)
+
+        lines = []
+        for i, p in chunk:
+            if isinstance(p, Exception):
+                lines.append({"row": i, "error": str(p)})
+                continue
+            lines.append({
+                "row": i,
+                "farmer_id": p.farmer_id,
+                "recommendations": [
+                    {"crop_name": catalogue.crops[index].get("crop_name"), "soil_compatibility": score}
+                    for index, score in results[i]
+                ]
+            })
+        return lines
+
+    async def stream():
+        for start in range(0, len(profiles), BATCH_CHUNK_ROWS):
+            chunk = list(enumerate(profiles[start:start + BATCH_CHUNK_ROWS], start))
+            for line in await asyncio.to_thread(score_chunk, chunk):
+                yield json.dumps(line, ensure_ascii=False) + "\n"
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
@@ -0,0 +1,214 @@
+"""
+Metrics - per-stage timing spans, dependency counters and cache hit rates
+Spans and external calls feed Prometheus histograms/counters (served on
+/metrics when prometheus_client is installed) and the current request's
+Server-Timing header, so a slow response shows where its time went
+"""
+
+import contextvars
+import os
+import time
+from contextlib import contextmanager
+from typing import Optional
+from urllib.parse import urlparse
+
+import httpx
+from pymongo import monitoring
+from requests import Session
+from requests.adapters import HTTPAdapter
+
+try:
+    from prometheus_client import CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Histogram, generate_latest, multiprocess
+except ImportError:
+    CONTENT_TYPE_LATEST = CollectorRegistry = Counter = Histogram = generate_latest = multiprocess = None
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+# Outbound HTTP host -> dependency label
+HTTP_DEPENDENCIES = {
+    "api.openweathermap.org": "openweather",
+    "nominatim.openstreetmap.org": "nominatim",
+    "graph.facebook.com": "whatsapp",
+    "ipapi.co": "ipapi",
+}
+
+class _Noop:
+    """Stands in for a metric when prometheus_client isn't installed"""
+
+    def labels(self, *args, **kwargs):
+        return self
+
+    def observe(self, value):
+        pass
+
+    def inc(self, amount=1):
+        pass
+
+def _histogram(name, documentation, labels):
+    return Histogram(name, documentation, labels, buckets=LATENCY_BUCKETS) if Histogram else _Noop()
+
+def _counter(name, documentation, labels):
+    return Counter(name, documentation, labels) if Counter else _Noop()
+
+REQUEST_SECONDS = _histogram("gramvaani_request_seconds", "Request latency by route", ["method", "route", "status"])
+STAGE_SECONDS = _histogram("gramvaani_stage_seconds", "Time spent in a named stage of a request", ["stage"])
+EXTERNAL_SECONDS = _histogram("gramvaani_external_seconds", "Latency of calls to external dependencies", ["dependency"])
+EXTERNAL_CALLS = _counter("gramvaani_external_calls_total", "Calls to external dependencies", ["dependency"])
+EXTERNAL_ERRORS = _counter("gramvaani_external_errors_total", "Failed calls to external dependencies", ["dependency"])
+CACHE_LOOKUPS = _counter("gramvaani_cache_lookups_total", "Cache lookups by outcome", ["cache", "result"])
+
+# name -> [total seconds, count] for the request being served; None outside a request
+_request_timings = contextvars.ContextVar("request_timings", default=None)
+
+def _add_timing(name: str, seconds: float):
+    timings = _request_timings.get()
+    if timings is not None:  # shared list: to_thread copies the context, not the list
+        entry = timings.setdefault(name, [0.0, 0])
+        entry[0] += seconds
+        entry[1] += 1
+
+@contextmanager
+def span(stage: str):
+    """Time a stage of the current request"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        STAGE_SECONDS.labels(stage).observe(elapsed)
+        _add_timing(stage, elapsed)
+
+def record_external(dependency: str, seconds: float, ok: bool = True):
+    EXTERNAL_CALLS.labels(dependency).inc()
+    EXTERNAL_SECONDS.labels(dependency).observe(seconds)
+    if not ok:
+        EXTERNAL_ERRORS.labels(dependency).inc()
+    _add_timing(dependency, seconds)
+
+def record_cache(cache: str, hit: bool):
+    CACHE_LOOKUPS.labels(cache, "hit" if hit else "miss").inc()
+
+def render_metrics():
+    """(body, content type) for the /metrics endpoint"""
+    if generate_latest is None:
+        return b"# prometheus_client is not installed\n", "text/plain; charset=utf-8"
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        # Several workers (serve.py): every worker writes to files in that dir; sum them
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+    return generate_latest(), CONTENT_TYPE_LATEST
+
+# --- Dependency hooks ------------------------------------------------------
+
+def instrument_boto3(client):
+    """Count and time every call made through a boto3 client"""
+    dependency = client.meta.service_model.service_name
+
+    def before_call(context, **kwargs):
+        context["metrics_start"] = time.perf_counter()
+
+    def after_call(context, http_response, **kwargs):
+        record_external(dependency, time.perf_counter() - context.get("metrics_start", time.perf_counter()), http_response.status_code < 400)
+
+    def after_call_error(context, **kwargs):
+        record_external(dependency, time.perf_counter() - context.get("metrics_start", time.perf_counter()), ok=False)
+
+    client.meta.events.register("before-call", before_call)
+    client.meta.events.register("after-call", after_call)
+    client.meta.events.register("after-call-error", after_call_error)
+    return client
+
+class InstrumentedTransport(httpx.BaseTransport):
+    """httpx transport counting and timing requests to one dependency (e.g. the OpenAI client)"""
+
+    def __init__(self, dependency: str, transport: Optional[httpx.BaseTransport] = None):
+        self.dependency = dependency
+        self.transport = transport or httpx.HTTPTransport()
+
+    def handle_request(self, request):
+        start = time.perf_counter()
+        try:
+            response = self.transport.handle_request(request)
+        except Exception:
+            record_external(self.dependency, time.perf_counter() - start, ok=False)
+            raise
+        record_external(self.dependency, time.perf_counter() - start, response.status_code < 400)
+        return response
+
+    def close(self):
+        self.transport.close()
+
+class _InstrumentedAdapter(HTTPAdapter):
+    def send(self, request, **kwargs):
+        dependency = HTTP_DEPENDENCIES.get(urlparse(request.url).hostname, "http")
+        start = time.perf_counter()
+        try:
+            response = super().send(request, **kwargs)
+        except Exception:
+            record_external(dependency, time.perf_counter() - start, ok=False)
+            raise
+        record_external(dependency, time.perf_counter() - start, response.status_code < 400)
+        return response
+
+def http_session() -> Session:
+    """requests session (pooled keep-alive connections) whose calls are counted per host"""
+    session = Session()
+    adapter = _InstrumentedAdapter()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+class _MongoCommandListener(monitoring.CommandListener):
+    def started(self, event):
+        pass
+
+    def succeeded(self, event):
+        record_external("mongodb", event.duration_micros / 1e6)
+
+    def failed(self, event):
+        record_external("mongodb", event.duration_micros / 1e6, ok=False)
+
+def instrument_mongo():
+    """Count and time MongoDB commands from every client created after this call"""
+    monitoring.register(_MongoCommandListener())
+
+# --- Middleware ------------------------------------------------------------
+
+def server_timing(timings: dict, total: float) -> str:
+    entries = [
+        f'{name};dur={seconds * 1000:.1f}' + (f';desc="x{count}"' if count > 1 else "")
+        for name, (seconds, count) in timings.items()
+    ]
+    entries.append(f"total;dur={total * 1000:.1f}")
+    return ", ".join(entries)
+
+class TimingMiddleware:
+    """ASGI middleware collecting the request's spans into Server-Timing and a latency histogram"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timings = {}
+        token = _request_timings.set(timings)
+        start = time.perf_counter()
+        status = 500
+
+        async def send_with_timing(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                header = server_timing(timings, time.perf_counter() - start)
+                message["headers"] = list(message.get("headers", [])) + [(b"server-timing", header.encode("latin-1"))]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _request_timings.reset(token)
+            route = scope.get("route")
+            REQUEST_SECONDS.labels(scope["method"], getattr(route, "path", "unmatched"), str(status)).observe(time.perf_counter() - start)
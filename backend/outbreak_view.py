@@ -0,0 +1,78 @@
+"""
+Outbreak View - materialized per-village, per-day pest/disease counters
+Updated atomically as reports come in, so the outbreak map reads a bounded
+number of items (active villages x days) instead of scanning every report
+"""
+
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+from boto3.dynamodb.conditions import Key
+
+OUTBREAK_REPORT_TYPES = ("pest", "disease")
+DAY_INDEX = "day-index"
+RING_SIZE = 5  # recent reports kept per village per day
+RECORDED_ATTRIBUTE = "outbreak_recorded"  # on reports already folded in; scripts/backfill_outbreak_view.py skips them
+
+class OutbreakView:
+    def __init__(self, table, ring_size: int = RING_SIZE):
+        self.table = table
+        self.ring_size = ring_size
+
+    def item_fields(self) -> dict:
+        """Attributes for a new report, which record() folds in as it's written"""
+        return {RECORDED_ATTRIBUTE: True}
+
+    def record(self, report: dict):
+        """Fold one community report into its village/day aggregate"""
+        report_type = report.get("report_type")
+        if report_type not in OUTBREAK_REPORT_TYPES:
+            return
+
+        key = {"village_id": report["village_id"], "day": report["timestamp"][:10]}
+        response = self.table.update_item(
+            Key=key,
+            UpdateExpression="ADD #count :one, report_seq :one SET recent = if_not_exists(recent, :empty)",
+            ExpressionAttributeNames={"#count": f"{report_type}_count"},
+            ExpressionAttributeValues={":one": 1, ":empty": {}},
+            ReturnValues="UPDATED_NEW"
+        )
+        seq = int(response["Attributes"]["report_seq"])
+
+        # Fixed-size ring: the Nth report overwrites slot N % ring_size
+        self.table.update_item(
+            Key=key,
+            UpdateExpression="SET recent.#slot = :r",
+            ExpressionAttributeNames={"#slot": str(seq % self.ring_size)},
+            ExpressionAttributeValues={":r": {
+                "type": report_type,
+                "crop": report.get("crop"),
+                "description": report.get("description_english", report.get("description")),
+                "severity": report.get("severity"),
+                "timestamp": report["timestamp"]
+            }}
+        )
+
+    def snapshot(self, days: int = 7) -> dict:
+        """Per-village pest/disease counts and most recent reports over the last `days` days"""
+        today = datetime.utcnow().date()
+        villages = defaultdict(lambda: {"pest": 0, "disease": 0, "reports": []})
+
+        for offset in range(days + 1):
+            day = (today - timedelta(days=offset)).isoformat()
+            query_kwargs = {"IndexName": DAY_INDEX, "KeyConditionExpression": Key("day").eq(day)}
+            while True:
+                response = self.table.query(**query_kwargs)
+                for item in response.get("Items", []):
+                    village = villages[item["village_id"]]
+                    village["pest"] += int(item.get("pest_count", 0))
+                    village["disease"] += int(item.get("disease_count", 0))
+                    village["reports"].extend(item.get("recent", {}).values())
+                if not response.get("LastEvaluatedKey"):
+                    break
+                query_kwargs["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+
+        for village in villages.values():
+            village["reports"].sort(key=lambda r: r.get("timestamp", ""), reverse=True)
+            village["reports"] = village["reports"][:self.ring_size]
+        return dict(villages)
@@ -0,0 +1,59 @@
+"""
+Pagination - opaque, signed cursors over DynamoDB LastEvaluatedKey
+Clients get a token they can hand back, but can't read or forge the key inside it
+"""
+
+import base64
+import hashlib
+import hmac
+import json
+from decimal import Decimal
+from typing import Optional
+
+from fastapi import HTTPException
+
+
+def _encode_value(value):
+    """Make DynamoDB key values JSON safe (numbers come back as Decimal)"""
+    if isinstance(value, Decimal):
+        return {"$n": str(value)}
+    return value
+
+def _decode_value(value):
+    """Reverse of _encode_value"""
+    if isinstance(value, dict) and "$n" in value:
+        return Decimal(value["$n"])
+    return value
+
+def _sign(payload: bytes, secret: str) -> str:
+    """HMAC-SHA256 signature, base64url without padding"""
+    digest = hmac.new(secret.encode("utf-8"), payload, hashlib.sha256).digest()
+    return base64.urlsafe_b64encode(digest).decode("ascii").rstrip("=")
+
+def encode_cursor(last_key: Optional[dict], secret: str, scope: str = "") -> Optional[str]:
+    """Turn a LastEvaluatedKey into an opaque cursor bound to a scope (e.g. the user)"""
+    if not last_key:
+        return None
+    body = json.dumps(
+        {"k": {k: _encode_value(v) for k, v in last_key.items()}, "s": scope},
+        separators=(",", ":"),
+        sort_keys=True
+    ).encode("utf-8")
+    payload = base64.urlsafe_b64encode(body).decode("ascii").rstrip("=")
+    return f"{payload}.{_sign(body, secret)}"
+
+def decode_cursor(cursor: Optional[str], secret: str, scope: str = "") -> Optional[dict]:
+    """Verify a cursor and return the ExclusiveStartKey it carries"""
+    if not cursor:
+        return None
+    try:
+        payload, signature = cursor.split(".", 1)
+        body = base64.urlsafe_b64decode(payload + "=" * (-len(payload) % 4))
+        if not hmac.compare_digest(_sign(body, secret), signature):
+            raise ValueError("bad signature")
+        data = json.loads(body)
+        if data.get("s") != scope:
+            raise ValueError("cursor scope mismatch")
+        return {k: _decode_value(v) for k, v in data["k"].items()}
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
@@ -0,0 +1,170 @@
+"""
+Place Names - persistent translation memory for village/district/state names
+Routes read translations from memory; unknown names are queued and translated
+in one batched call off the request path, then written back to disk. Workers
+share the file: each merges what the others wrote before translating or saving
+"""
+
+import contextlib
+import json
+import os
+import tempfile
+import threading
+import time
+import unicodedata
+from typing import Callable, Dict, Iterable, List
+
+from structured_log import get_logger
+
+try:
+    import fcntl
+except ImportError:  # not on Windows; saves then only merge, without excluding each other
+    fcntl = None
+
+log = get_logger("place_names")
+
+PLACE_NAMES_PATH = os.getenv("PLACE_NAMES_PATH", "place_names.json")
+BATCH_SIZE = 50  # names per translation call
+RETRY_AFTER = 60  # seconds before a name whose translation failed is queued again; doubles per failure
+MAX_RETRY_AFTER = 24 * 3600
+
+def normalize_place_name(name: str) -> str:
+    """Case/whitespace-insensitive key for a place name"""
+    name = unicodedata.normalize("NFKC", name or "")
+    return " ".join(name.split()).casefold()
+
+class PlaceNameMemory:
+    def __init__(self, translate_batch: Callable[[List[str], str], Dict[str, str]], path: str = PLACE_NAMES_PATH):
+        """translate_batch(names, language) must return {name: translated_name}"""
+        self.translate_batch = translate_batch
+        self.path = path
+        self._memory = {}  # language -> {normalized name: translation}
+        self._pending = {}  # language -> {normalized name: original name}
+        self._failures = {}  # language -> {normalized name: (failed attempts, retry at)}
+        self._lock = threading.Lock()
+        self._fill_lock = threading.Lock()
+        self._load()
+
+    def _read(self) -> dict:
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except Exception as e:
+            log.error("place_names_load_error", error=e)
+            return {}
+
+    def _load(self):
+        self._memory = self._read()
+
+    def _merge_from_disk(self):
+        """Take in translations other workers have saved since we loaded"""
+        on_disk = self._read()
+        with self._lock:
+            for language, names in on_disk.items():
+                memory = self._memory.setdefault(language, {})
+                for key, translated in names.items():
+                    memory.setdefault(key, translated)
+
+    @contextlib.contextmanager
+    def _file_lock(self):
+        """Exclusive across worker processes, for read-merge-write of the file"""
+        if fcntl is None:
+            yield
+            return
+        with open(f"{self.path}.lock", "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _save(self):
+        with self._file_lock():
+            self._merge_from_disk()  # so this worker's write doesn't drop another's translations
+            with self._lock:
+                data = json.dumps(self._memory, ensure_ascii=False, sort_keys=True)
+            # A temp file of our own: readers never see a partial file, concurrent writers never share one
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(self.path)), prefix=".place_names.", suffix=".tmp")
+            try:
+                with os.fdopen(fd, "w", encoding="utf-8") as f:
+                    f.write(data)
+                os.replace(tmp_path, self.path)
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+
+    def lookup(self, name: str, language: str) -> str:
+        """Translated name if known; otherwise the original name (and queue it for translation)"""
+        if not name or language == "en":
+            return name
+        key = normalize_place_name(name)
+        with self._lock:
+            translated = self._memory.get(language, {}).get(key)
+            failure = self._failures.get(language, {}).get(key)
+            if translated is None and (failure is None or failure[1] <= time.time()):
+                self._pending.setdefault(language, {})[key] = name
+        return translated or name
+
+    def has_pending(self) -> bool:
+        with self._lock:
+            return any(self._pending.values())
+
+    def fill_pending(self):
+        """Translate every queued name in batches (blocking - run off the event loop)"""
+        if not self._fill_lock.acquire(blocking=False):
+            return  # another thread is already draining the queue
+        try:
+            with self._lock:
+                pending, self._pending = self._pending, {}
+            if pending:
+                self._merge_from_disk()
+            for language, names in pending.items():
+                with self._lock:
+                    known = self._memory.get(language, {})
+                    missing = [name for key, name in names.items() if key not in known]
+                self._translate_and_store(missing, language)
+        finally:
+            self._fill_lock.release()
+
+    def prefill(self, names: Iterable[str], languages: Iterable[str]):
+        """Bulk-translate known place names so they never miss on the hot path"""
+        names = {normalize_place_name(n): n for n in names if n}
+        for language in languages:
+            if language == "en":
+                continue
+            with self._lock:
+                known = self._memory.get(language, {})
+                missing = [n for key, n in names.items() if key not in known]
+            self._translate_and_store(missing, language)
+
+    def _translate_and_store(self, names: List[str], language: str):
+        changed = False
+        for i in range(0, len(names), BATCH_SIZE):
+            batch = names[i:i + BATCH_SIZE]
+            try:
+                translations = self.translate_batch(batch, language)
+            except Exception as e:
+                log.error("place_name_translation_error", language=language, error=e)
+                translations = {}
+            if not isinstance(translations, dict):
+                translations = {}
+            with self._lock:
+                memory = self._memory.setdefault(language, {})
+                failures = self._failures.setdefault(language, {})
+                for name in batch:
+                    key = normalize_place_name(name)
+                    translated = translations.get(name)
+                    if isinstance(translated, str) and translated.strip():
+                        memory[key] = translated.strip()
+                        failures.pop(key, None)
+                        changed = True
+                    else:
+                        attempts = failures.get(key, (0, 0))[0] + 1
+                        failures[key] = (attempts, time.time() + min(RETRY_AFTER * 2 ** (attempts - 1), MAX_RETRY_AFTER))
+        if changed:
+            try:
+                self._save()
+            except Exception as e:
+                log.error("place_names_save_error", error=e)
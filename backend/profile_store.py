@@ -0,0 +1,82 @@
+"""
+Profile Store - per-user documents (environmental profile, farm analytics) with a TTL cache
+Defaults are created with one atomic upsert instead of find + insert, and
+writes go through the store so cached reads never lag behind an update
+"""
+
+import asyncio
+from datetime import datetime
+from typing import Callable, Optional
+
+from pymongo import ReturnDocument
+
+from data_aggregator import bump_cache_generation, cache_generation, get_cache_key, get_cached, set_cached
+
+PROFILE_CACHE_TTL = 300  # seconds
+MISSING = {}  # cached marker for users without a document
+
+class ProfileStore:
+    def __init__(self, collection, defaults: Optional[Callable[[dict], dict]] = None, ttl: int = PROFILE_CACHE_TTL):
+        """defaults(user) -> fields for a user's first document; get() requires it"""
+        self.collection = collection
+        self.defaults = defaults
+        self.ttl = ttl
+
+    def _key(self, phone: str) -> str:
+        return get_cache_key(f"profile:{self.collection.name}", f"{phone}:{cache_generation(self._scope(phone))}")
+
+    def _scope(self, phone: str) -> str:
+        return f"profile:{self.collection.name}:{phone}"
+
+    def _remember(self, phone: str, doc: Optional[dict]) -> Optional[dict]:
+        set_cached(self._key(phone), doc or MISSING, self.ttl)
+        return dict(doc) if doc else None
+
+    def _cached(self, phone: str):
+        """(hit, copy of the document or None)"""
+        cached = get_cached(self._key(phone))
+        if cached is None:
+            return False, None
+        return True, dict(cached) if cached else None
+
+    async def find(self, phone: str) -> Optional[dict]:
+        """The user's document, or None if they don't have one yet"""
+        hit, doc = self._cached(phone)
+        if hit:
+            return doc
+        doc = await asyncio.to_thread(self.collection.find_one, {"user_phone": phone}, {"_id": 0})
+        return self._remember(phone, doc)
+
+    async def get(self, user: dict) -> dict:
+        """The user's document, created from defaults on first access"""
+        phone = user["phone_number"]
+        _, doc = self._cached(phone)
+        if doc:
+            return doc
+        defaults = dict(self.defaults(user), created_at=datetime.utcnow())
+        doc = await asyncio.to_thread(
+            self.collection.find_one_and_update,
+            {"user_phone": phone},
+            {"$setOnInsert": defaults},
+            projection={"_id": 0},
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+        return self._remember(phone, doc)
+
+    async def update(self, phone: str, fields: dict) -> dict:
+        """$set fields (upserting the document) and cache the result"""
+        doc = await asyncio.to_thread(
+            self.collection.find_one_and_update,
+            {"user_phone": phone},
+            {"$set": dict(fields, updated_at=datetime.utcnow())},
+            projection={"_id": 0},
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+        return self._remember(phone, doc)
+
+    def invalidate(self, phone: str):
+        """Forget a user's cached document after a write that bypassed the store (bulk writes)"""
+        # A new generation skips the stale entry without deleting keys, in every worker
+        bump_cache_generation(self._scope(phone))
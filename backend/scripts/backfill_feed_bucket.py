@@ -0,0 +1,72 @@
+"""
+Feed bucket backfill - give existing community reports their feed_bucket attribute
+
+The all-villages feed reads feed_bucket-timestamp-index, so reports written
+before feed_bucket existed are invisible to it until this has run. Scans the
+table, sets feed_bucket from each report's timestamp (conditionally, so it is
+safe to re-run or run alongside the API) and prints the oldest bucket, which
+is the value for FEED_START_DATE.
+
+    python scripts/backfill_feed_bucket.py --dry-run
+    python scripts/backfill_feed_bucket.py --table gramvaani_community_reports
+"""
+
+import argparse
+import os
+import sys
+
+import boto3
+from botocore.exceptions import ClientError
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from community_feed import feed_bucket
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--table", default="gramvaani_community_reports")
+    parser.add_argument("--region", default="ap-south-1")
+    parser.add_argument("--dry-run", action="store_true", help="count what would change without writing")
+    args = parser.parse_args()
+
+    table = boto3.resource("dynamodb", region_name=args.region).Table(args.table)
+    scan_kwargs = {
+        "ProjectionExpression": "report_id, #ts, feed_bucket",
+        "ExpressionAttributeNames": {"#ts": "timestamp"},
+    }
+    scanned = updated = skipped = 0
+    oldest = None
+
+    while True:
+        response = table.scan(**scan_kwargs)
+        for item in response.get("Items", []):
+            scanned += 1
+            timestamp = item.get("timestamp")
+            if not timestamp:
+                skipped += 1
+                continue
+            bucket = item.get("feed_bucket") or feed_bucket(timestamp)
+            oldest = min(oldest or bucket, bucket)
+            if item.get("feed_bucket"):
+                continue
+            if not args.dry_run:
+                try:
+                    table.update_item(
+                        Key={"report_id": item["report_id"]},
+                        UpdateExpression="SET feed_bucket = :bucket",
+                        ConditionExpression="attribute_exists(report_id) AND attribute_not_exists(feed_bucket)",
+                        ExpressionAttributeValues={":bucket": bucket},
+                    )
+                except ClientError as e:
+                    if e.response["Error"]["Code"] != "ConditionalCheckFailedException":
+                        raise
+                    continue  # deleted or bucketed meanwhile
+            updated += 1
+        if not response.get("LastEvaluatedKey"):
+            break
+        scan_kwargs["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+
+    action = "would update" if args.dry_run else "updated"
+    print(f"scanned {scanned:,} reports, {action} {updated:,}, {skipped:,} without a timestamp")
+    if oldest:
+        print(f"oldest bucket: {oldest} (set FEED_START_DATE={oldest})")
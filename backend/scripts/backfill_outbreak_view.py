@@ -0,0 +1,75 @@
+"""
+Outbreak view backfill - fold existing pest/disease reports into the outbreak aggregates
+
+The outbreak map reads gramvaani_outbreak_aggregates, which only counts reports
+written since it existed, so until this has run the map is empty. Scans the
+reports table for pest/disease reports without outbreak_recorded, marks each one
+(conditionally, so it is safe to re-run or run alongside the API) and folds it
+in, oldest first so each village/day keeps its most recent reports.
+
+    python scripts/backfill_outbreak_view.py --dry-run
+    python scripts/backfill_outbreak_view.py --days 30
+"""
+
+import argparse
+import os
+import sys
+from datetime import datetime, timedelta
+
+import boto3
+from boto3.dynamodb.conditions import Attr
+from botocore.exceptions import ClientError
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from outbreak_view import OUTBREAK_REPORT_TYPES, RECORDED_ATTRIBUTE, OutbreakView
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--table", default="gramvaani_community_reports")
+    parser.add_argument("--aggregates-table", default="gramvaani_outbreak_aggregates")
+    parser.add_argument("--region", default="ap-south-1")
+    parser.add_argument("--days", type=int, help="only reports from the last N days (the map shows 7); default all")
+    parser.add_argument("--dry-run", action="store_true", help="count what would be folded in without writing")
+    args = parser.parse_args()
+
+    dynamodb = boto3.resource("dynamodb", region_name=args.region)
+    table = dynamodb.Table(args.table)
+    view = OutbreakView(dynamodb.Table(args.aggregates_table))
+
+    condition = Attr("report_type").is_in(list(OUTBREAK_REPORT_TYPES)) & Attr(RECORDED_ATTRIBUTE).not_exists()
+    if args.days:
+        condition &= Attr("timestamp").gte((datetime.utcnow() - timedelta(days=args.days)).isoformat())
+    scan_kwargs = {"FilterExpression": condition}
+    reports = []
+    while True:
+        response = table.scan(**scan_kwargs)
+        reports.extend(item for item in response.get("Items", []) if item.get("village_id") and item.get("timestamp"))
+        if not response.get("LastEvaluatedKey"):
+            break
+        scan_kwargs["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+    reports.sort(key=lambda report: report["timestamp"])
+
+    recorded = 0
+    for report in reports:
+        if args.dry_run:
+            recorded += 1
+            continue
+        try:
+            # Mark first: a report is folded in at most once, even if two runs overlap
+            table.update_item(
+                Key={"report_id": report["report_id"]},
+                UpdateExpression="SET #recorded = :true",
+                ConditionExpression="attribute_exists(report_id) AND attribute_not_exists(#recorded)",
+                ExpressionAttributeNames={"#recorded": RECORDED_ATTRIBUTE},
+                ExpressionAttributeValues={":true": True},
+            )
+        except ClientError as e:
+            if e.response["Error"]["Code"] != "ConditionalCheckFailedException":
+                raise
+            continue  # deleted or recorded meanwhile
+        view.record(report)
+        recorded += 1
+
+    action = "would fold in" if args.dry_run else "folded in"
+    print(f"{action} {recorded:,} of {len(reports):,} unrecorded pest/disease reports")
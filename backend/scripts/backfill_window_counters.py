@@ -0,0 +1,94 @@
+"""
+Window counter backfill - count existing reports into the sliding-window counters
+
+The outbreak checks read hourly counters that only count reports written since
+they existed, so right after a deploy they undercount. Counts the reports from
+the last WINDOW_HOURS that carry no window_counted mark: community reports into
+gramvaani_report_counters, and pest outbreaks without coordinates into Mongo's
+pest_outbreak_counters. Each record is marked (conditionally, so it is safe to
+re-run or run alongside the API) before its bucket is incremented.
+
+    python scripts/backfill_window_counters.py --dry-run
+    python scripts/backfill_window_counters.py
+"""
+
+import argparse
+import os
+import sys
+from datetime import datetime, timedelta
+
+import boto3
+from boto3.dynamodb.conditions import Attr
+from botocore.exceptions import ClientError
+from dotenv import load_dotenv
+from pymongo import MongoClient
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from geo_cluster import pest_key
+from sliding_window import COUNTED_ATTRIBUTE, WINDOW_HOURS, DynamoWindowCounter, MongoWindowCounter, counter_key
+
+def backfill_report_counters(table, counter: DynamoWindowCounter, since: datetime, dry_run: bool) -> int:
+    scan_kwargs = {"FilterExpression": Attr("timestamp").gte(since.isoformat()) & Attr(COUNTED_ATTRIBUTE).not_exists()}
+    counted = 0
+    while True:
+        response = table.scan(**scan_kwargs)
+        for report in response.get("Items", []):
+            if dry_run:
+                counted += 1
+                continue
+            try:
+                table.update_item(
+                    Key={"report_id": report["report_id"]},
+                    UpdateExpression="SET #counted = :true",
+                    ConditionExpression="attribute_exists(report_id) AND attribute_not_exists(#counted)",
+                    ExpressionAttributeNames={"#counted": COUNTED_ATTRIBUTE},
+                    ExpressionAttributeValues={":true": True},
+                )
+            except ClientError as e:
+                if e.response["Error"]["Code"] != "ConditionalCheckFailedException":
+                    raise
+                continue  # deleted or counted meanwhile
+            village_id = report.get("village_id", "Unknown")
+            counter.increment(counter_key(village_id, report.get("report_type")), datetime.fromisoformat(report["timestamp"]))
+            counted += 1
+        if not response.get("LastEvaluatedKey"):
+            return counted
+        scan_kwargs["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+
+def backfill_pest_counters(collection, counter: MongoWindowCounter, since: datetime, dry_run: bool) -> int:
+    # Outbreaks with coordinates are counted by a geo query instead
+    query = {"timestamp": {"$gte": since}, "geo": {"$exists": False}, COUNTED_ATTRIBUTE: {"$exists": False}}
+    counted = 0
+    for outbreak in collection.find(query, {"location": 1, "pest_name": 1, "timestamp": 1}):
+        if dry_run:
+            counted += 1
+            continue
+        marked = collection.update_one({"_id": outbreak["_id"], COUNTED_ATTRIBUTE: {"$exists": False}},
+                                       {"$set": {COUNTED_ATTRIBUTE: True}})
+        if not marked.modified_count:
+            continue  # counted meanwhile
+        location = (outbreak.get("location") or "Unknown").split(",")[0]
+        counter.increment(counter_key(location, pest_key(outbreak.get("pest_name"))), outbreak["timestamp"])
+        counted += 1
+    return counted
+
+if __name__ == "__main__":
+    load_dotenv()
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--reports-table", default="gramvaani_community_reports")
+    parser.add_argument("--counters-table", default="gramvaani_report_counters")
+    parser.add_argument("--region", default="ap-south-1")
+    parser.add_argument("--mongo-url", default=os.getenv("MONGO_URL"))
+    parser.add_argument("--dry-run", action="store_true", help="count what would be added without writing")
+    args = parser.parse_args()
+
+    since = datetime.utcnow() - timedelta(hours=WINDOW_HOURS)
+    dynamodb = boto3.resource("dynamodb", region_name=args.region)
+    reports = backfill_report_counters(
+        dynamodb.Table(args.reports_table), DynamoWindowCounter(dynamodb.Table(args.counters_table)), since, args.dry_run)
+    db = MongoClient(args.mongo_url).gramvani
+    outbreaks = backfill_pest_counters(db.pest_outbreaks, MongoWindowCounter(db.pest_outbreak_counters), since, args.dry_run)
+
+    action = "would count" if args.dry_run else "counted"
+    print(f"{action} {reports:,} community reports and {outbreaks:,} pest outbreaks from the last {WINDOW_HOURS // 24} days")
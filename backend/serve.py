@@ -0,0 +1,78 @@
+"""
+Serve - start uvicorn, with several workers sharing one cache when asked
+WEB_CONCURRENCY sets the worker count. With more than one worker and no
+CACHE_URL, a private redis-server is started on a unix socket so the workers
+share cached context, LLM output, TTS clips, geocoded cells and the Nominatim
+rate limit, and Prometheus runs in multiprocess mode so /metrics sums all
+workers. Without a shared cache the Nominatim limit is per worker (N workers
+can send N req/s), so keep one worker if redis-server isn't available.
+Still per worker: the leaderboard, outbreak clusters, crop catalogue and
+village index (each rebuilt in every worker) and in-flight de-duplication
+of strategy generation
+"""
+
+import os
+import shutil
+import subprocess
+import tempfile
+import time
+
+import uvicorn
+
+from structured_log import flush_logging, get_logger
+
+log = get_logger("serve")
+
+HOST = os.getenv("HOST", "0.0.0.0")
+PORT = int(os.getenv("PORT", "8000"))
+CACHE_MAX_MEMORY = os.getenv("CACHE_MAX_MEMORY", "256mb")  # least recently used entries are evicted beyond this
+CACHE_SERVER_WAIT = 5  # seconds for redis-server to create its socket
+
+def start_cache_server(socket_path: str):
+    """redis-server listening only on a private unix socket, without persistence; None if unavailable"""
+    binary = shutil.which("redis-server") or shutil.which("valkey-server")
+    if binary is None:
+        return None
+    process = subprocess.Popen(
+        [binary, "--port", "0", "--unixsocket", socket_path, "--unixsocketperm", "700",
+         "--save", "", "--appendonly", "no",
+         "--maxmemory", CACHE_MAX_MEMORY, "--maxmemory-policy", "allkeys-lru"],
+        stdout=subprocess.DEVNULL
+    )
+    deadline = time.monotonic() + CACHE_SERVER_WAIT
+    while not os.path.exists(socket_path):
+        if process.poll() is not None or time.monotonic() > deadline:
+            process.kill()
+            return None
+        time.sleep(0.05)
+    return process
+
+if __name__ == "__main__":
+    workers = max(1, int(os.getenv("WEB_CONCURRENCY", "1")))
+    cache_server = None
+    if workers > 1 and not os.getenv("CACHE_URL"):
+        socket_path = os.path.join(tempfile.mkdtemp(prefix="gramvaani-cache-"), "cache.sock")
+        cache_server = start_cache_server(socket_path)
+        if cache_server is not None:
+            os.environ["CACHE_URL"] = f"unix://{socket_path}"  # inherited by the workers
+            log.info("cache_server_started", socket=socket_path, max_memory=CACHE_MAX_MEMORY)
+        else:
+            log.warning("cache_not_shared", workers=workers,
+                        reason="redis-server not found; each worker keeps its own caches and Nominatim rate limit")
+
+    metrics_dir = None
+    if workers > 1 and not os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        # Must be set (and empty) before the workers import prometheus_client
+        metrics_dir = tempfile.mkdtemp(prefix="gramvaani-metrics-")
+        os.environ["PROMETHEUS_MULTIPROC_DIR"] = metrics_dir
+
+    log.info("serving", host=HOST, port=PORT, workers=workers, shared_cache=bool(os.getenv("CACHE_URL")))
+    try:
+        uvicorn.run("main:app", host=HOST, port=PORT, workers=workers)
+    finally:
+        if cache_server is not None:
+            cache_server.terminate()
+            cache_server.wait()
+        if metrics_dir is not None:
+            shutil.rmtree(metrics_dir, ignore_errors=True)
+        flush_logging()
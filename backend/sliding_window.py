@@ -0,0 +1,94 @@
+"""
+Sliding Window Counters - hourly buckets over a rolling window
+One small item/document per (key, hour): writes are an atomic increment and a
+window count reads at most window_hours buckets, however many reports exist
+"""
+
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from boto3.dynamodb.conditions import Key
+from pymongo import ASCENDING
+
+WINDOW_HOURS = 7 * 24
+BUCKET_FORMAT = "%Y-%m-%dT%H"
+COUNTED_ATTRIBUTE = "window_counted"  # on records already counted; scripts/backfill_window_counters.py skips them
+
+def bucket_id(ts: datetime) -> str:
+    """Hour bucket for a timestamp, sortable as a string"""
+    return ts.strftime(BUCKET_FORMAT)
+
+def as_utc(ts: Optional[datetime] = None) -> datetime:
+    """Timezone-aware UTC `ts` (naive values are UTC, as from utcnow()), or now"""
+    if ts is None:
+        return datetime.now(timezone.utc)
+    return ts.replace(tzinfo=timezone.utc) if ts.tzinfo is None else ts.astimezone(timezone.utc)
+
+def window_start(now: datetime, window_hours: int) -> str:
+    """First bucket still inside the window ending at `now`"""
+    return bucket_id(now - timedelta(hours=window_hours - 1))
+
+def counter_key(*parts: str) -> str:
+    """Stable key from free-text parts (case and surrounding spaces ignored)"""
+    return "#".join((p or "").strip().lower() for p in parts)
+
+class DynamoWindowCounter:
+    """Counters in a DynamoDB table keyed by counter_key (hash) + bucket (range), with TTL on expires_at"""
+
+    def __init__(self, table, window_hours: int = WINDOW_HOURS):
+        self.table = table
+        self.window_hours = window_hours
+
+    def increment(self, key: str, ts: Optional[datetime] = None):
+        ts = as_utc(ts)
+        self.table.update_item(
+            Key={"counter_key": key, "bucket": bucket_id(ts)},
+            UpdateExpression="ADD #count :one SET expires_at = if_not_exists(expires_at, :exp)",
+            ExpressionAttributeNames={"#count": "count"},
+            ExpressionAttributeValues={
+                ":one": 1,
+                ":exp": int((ts + timedelta(hours=self.window_hours + 1)).timestamp())
+            }
+        )
+
+    def count(self, key: str, now: Optional[datetime] = None) -> int:
+        now = as_utc(now)
+        query_kwargs = {
+            "KeyConditionExpression": Key("counter_key").eq(key) & Key("bucket").gte(window_start(now, self.window_hours)),
+            "ProjectionExpression": "#count",
+            "ExpressionAttributeNames": {"#count": "count"}
+        }
+        total = 0
+        while True:
+            response = self.table.query(**query_kwargs)
+            total += sum(int(item.get("count", 0)) for item in response.get("Items", []))
+            if not response.get("LastEvaluatedKey"):
+                return total
+            query_kwargs["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+
+class MongoWindowCounter:
+    """Counters in a Mongo collection of {key, bucket, count} documents, expired by a TTL index"""
+
+    def __init__(self, collection, window_hours: int = WINDOW_HOURS):
+        self.collection = collection
+        self.window_hours = window_hours
+
+    def ensure_indexes(self):
+        self.collection.create_index([("key", ASCENDING), ("bucket", ASCENDING)], unique=True)
+        self.collection.create_index("expires_at", expireAfterSeconds=0)
+
+    def increment(self, key: str, ts: Optional[datetime] = None):
+        ts = as_utc(ts)
+        self.collection.update_one(
+            {"key": key, "bucket": bucket_id(ts)},
+            {"$inc": {"count": 1}, "$setOnInsert": {"expires_at": ts + timedelta(hours=self.window_hours + 1)}},
+            upsert=True
+        )
+
+    def count(self, key: str, now: Optional[datetime] = None) -> int:
+        now = as_utc(now)
+        buckets = self.collection.find(
+            {"key": key, "bucket": {"$gte": window_start(now, self.window_hours)}},
+            {"count": 1, "_id": 0}
+        )
+        return sum(b.get("count", 0) for b in buckets)
@@ -0,0 +1,95 @@
+"""
+Strategies - cached, structured-output generation of farming optimization strategies
+Strategies depend on a coarse location/profile/crop bucket, so they are
+generated once per bucket, served from cache and refreshed in the background
+"""
+
+import asyncio
+import json
+import time
+
+from data_aggregator import get_cache_key, get_cached, set_cached
+from structured_log import get_logger
+
+log = get_logger("strategies")
+
+STRATEGY_REFRESH_AFTER = 6 * 3600  # serve as fresh for 6 hours
+STRATEGY_TTL = 24 * 3600  # then serve stale while refreshing, up to a day
+
+STRATEGY_SCHEMA = {
+    "name": "optimization_strategies",
+    "strict": True,
+    "schema": {
+        "type": "object",
+        "properties": {
+            "strategies": {
+                "type": "array",
+                "items": {
+                    "type": "object",
+                    "properties": {
+                        "strategy_name": {"type": "string"},
+                        "impact_level": {"type": "string", "enum": ["High", "Medium", "Low"]},
+                        "difficulty": {"type": "string", "enum": ["Low", "Medium", "High"]},
+                        "cost_effectiveness": {"type": "string"},
+                        "badge": {"type": "string", "enum": ["Minimal", "Moderate", "Peak"]}
+                    },
+                    "required": ["strategy_name", "impact_level", "difficulty", "cost_effectiveness", "badge"],
+                    "additionalProperties": False
+                }
+            }
+        },
+        "required": ["strategies"],
+        "additionalProperties": False
+    }
+}
+
+def _quantize(value, step):
+    """Round to the nearest step so similar profiles share a bucket"""
+    return round(float(value) / step) * step
+
+def strategy_profile(location: str, profile: dict, crop_names: list) -> dict:
+    """Coarse inputs the strategies are generated from (and cached by)"""
+    profile = profile or {}
+    return {
+        "location": location.split(",")[0].strip().title() or "India",
+        "soil_ph": _quantize(profile.get("soil_ph", 7.0), 0.5),
+        "temperature": int(_quantize(profile.get("temperature", 25), 5)),
+        "humidity": int(_quantize(profile.get("humidity", 60), 10)),
+        "rainfall": int(_quantize(profile.get("rainfall", 100), 50)),
+        "crops": sorted(c for c in crop_names if c)
+    }
+
+class StrategyCache:
+    def __init__(self, generate):
+        """generate(bucket) -> list of strategies; blocking, run in a worker thread"""
+        self.generate = generate
+        self._inflight = {}  # cache key -> generation task, so a bucket is generated once at a time
+
+    async def get(self, bucket: dict) -> list:
+        key = get_cache_key("strategies", json.dumps(bucket, sort_keys=True))
+        cached = get_cached(key)
+        if cached:
+            if time.time() >= cached["refresh_at"]:
+                self._start_refresh(key, bucket)  # stale: refresh in the background
+            return cached["strategies"]
+        # Shielded: a caller that stops waiting (e.g. a dashboard deadline) must not cancel
+        # the generation every other caller for this bucket is waiting on
+        return await asyncio.shield(self._start_refresh(key, bucket))
+
+    def _start_refresh(self, key: str, bucket: dict) -> asyncio.Task:
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(self._refresh(key, bucket))
+            self._inflight[key] = task
+            task.add_done_callback(lambda t: self._finish(key, t))
+        return task
+
+    def _finish(self, key: str, task: asyncio.Task):
+        self._inflight.pop(key, None)
+        if not task.cancelled() and task.exception():
+            log.error("strategy_generation_error", error=task.exception())
+
+    async def _refresh(self, key: str, bucket: dict) -> list:
+        strategies = await asyncio.to_thread(self.generate, bucket)
+        set_cached(key, {"strategies": strategies, "refresh_at": time.time() + STRATEGY_REFRESH_AFTER}, STRATEGY_TTL)
+        return strategies
@@ -0,0 +1,205 @@
+"""
+Structured Log - queue-backed JSON event logging off the request path
+Handlers only check the level, apply per-event sampling and enqueue a tuple;
+a background thread redacts secrets and phone numbers and writes one JSON
+object per line
+"""
+
+import atexit
+import json
+import os
+import queue
+import random
+import re
+import sys
+import threading
+import time
+import traceback
+from datetime import datetime, timezone
+
+DEBUG, INFO, WARNING, ERROR = 10, 20, 30, 40
+LEVEL_NAMES = {DEBUG: "debug", INFO: "info", WARNING: "warning", ERROR: "error"}
+LOG_LEVEL = {name.upper(): level for level, name in LEVEL_NAMES.items()}.get(os.getenv("LOG_LEVEL", "INFO").upper(), INFO)
+LOG_QUEUE_SIZE = 10000  # records waiting for the writer; beyond this they're dropped, not waited for
+# Fraction of each (chatty) event that is kept; override with LOG_SAMPLE_RATES="event=rate,..."
+DEFAULT_SAMPLE_RATES = {
+    "webhook_received": 0.1,
+    "whatsapp_message": 0.1,
+    "whatsapp_reply_sent": 0.1,
+    "tts_request": 0.1,
+    "auth_error": 0.1,  # expired tokens arrive in bursts
+}
+SECRET_FIELD = re.compile(r"pass(word)?|secret|token|api_?key|authorization|appid|credential", re.IGNORECASE)
+PHONE_FIELDS = {"phone", "phone_number", "user_phone", "sender", "from", "to", "wa_id", "whatsapp_id"}
+SECRET_PATTERNS = (
+    (re.compile(r"([?&](?:appid|api_key|apikey|key|token|access_token)=)[^&\s\"']+", re.IGNORECASE), r"\1[redacted]"),
+    (re.compile(r"(Bearer\s+)[\w\-.~+/=]+", re.IGNORECASE), r"\1[redacted]"),
+)
+# Indian mobile numbers, optionally with the 91 country code WhatsApp sends
+PHONE_PATTERN = re.compile(r"(?<!\d)(?:\+?91[\-\s]?)?[6-9]\d{9}(?!\d)")
+SECRET_ENV = re.compile(r"KEY|SECRET|TOKEN|PASSWORD")
+
+def _parse_sample_rates(value: str) -> dict:
+    rates = dict(DEFAULT_SAMPLE_RATES)
+    for part in value.split(","):
+        event, _, rate = part.partition("=")
+        try:
+            rates[event.strip()] = min(1.0, max(0.0, float(rate)))
+        except ValueError:
+            continue
+    return rates
+
+SAMPLE_RATES = _parse_sample_rates(os.getenv("LOG_SAMPLE_RATES", ""))
+
+def mask_phone(value) -> str:
+    digits = re.sub(r"\D", "", str(value))
+    return f"***{digits[-2:]}" if len(digits) >= 6 else str(value)
+
+class Redactor:
+    """Removes secrets (by field name, URL/header pattern and secret env values) and masks phone numbers"""
+
+    def __init__(self):
+        self._env_size = -1
+        self._secret_values = None
+
+    def _refresh_secret_values(self):
+        # Re-read when the environment grows (load_dotenv runs after the first log lines)
+        if len(os.environ) == self._env_size:
+            return
+        self._env_size = len(os.environ)
+        values = sorted({v for k, v in os.environ.items() if SECRET_ENV.search(k) and len(v) >= 8}, key=len, reverse=True)
+        self._secret_values = re.compile("|".join(map(re.escape, values))) if values else None
+
+    def text(self, value: str) -> str:
+        self._refresh_secret_values()
+        if self._secret_values:
+            value = self._secret_values.sub("[redacted]", value)
+        for pattern, replacement in SECRET_PATTERNS:
+            value = pattern.sub(replacement, value)
+        return PHONE_PATTERN.sub(lambda m: mask_phone(m.group()), value)
+
+    def value(self, value, key: str = ""):
+        if key and SECRET_FIELD.search(key):
+            return "[redacted]"
+        if key.lower() in PHONE_FIELDS and isinstance(value, (str, int)):
+            return mask_phone(value)
+        if isinstance(value, dict):
+            return {str(k): self.value(v, str(k)) for k, v in value.items()}
+        if isinstance(value, (list, tuple, set)):
+            return [self.value(v) for v in value]
+        if isinstance(value, (int, float, bool)) or value is None:
+            return value
+        if isinstance(value, BaseException):
+            return self.text(f"{type(value).__name__}: {value}")
+        return self.text(str(value))
+
+def format_entry(redactor: Redactor, created: float, level: int, logger: str, event: str, fields: dict,
+                 sample_rate=None, exc_info=None, dropped: int = 0) -> str:
+    """One JSON log line"""
+    entry = {
+        "ts": datetime.fromtimestamp(created, timezone.utc).isoformat(timespec="milliseconds"),
+        "level": LEVEL_NAMES.get(level, str(level)),
+        "logger": logger,
+        "event": event,
+    }
+    entry.update(redactor.value(fields))
+    if sample_rate is not None:
+        entry["sample_rate"] = sample_rate
+    if dropped:
+        entry["dropped_before"] = dropped
+    if exc_info:
+        entry["traceback"] = redactor.text("".join(traceback.format_exception(*exc_info)))
+    return json.dumps(entry, ensure_ascii=False, default=str)
+
+class LogWriter:
+    """Background thread draining queued entries to a stream; enqueueing never blocks"""
+
+    def __init__(self, stream=None, size: int = LOG_QUEUE_SIZE):
+        self.stream = stream or sys.stdout
+        self.queue = queue.SimpleQueue()  # C implementation: a put is a fraction of a microsecond
+        self.size = size
+        self.redactor = Redactor()
+        self.dropped = 0  # since the last entry that got through
+        self._thread = threading.Thread(target=self._run, name="log-writer", daemon=True)
+        self._thread.start()
+
+    def put(self, entry: tuple):
+        if self.queue.qsize() >= self.size:
+            self.dropped += 1
+            return
+        if self.dropped:
+            entry, self.dropped = entry + (self.dropped,), 0
+        self.queue.put(entry)
+
+    def _run(self):
+        while True:
+            entry = self.queue.get()
+            if entry is None:
+                break
+            try:
+                self.stream.write(format_entry(self.redactor, *entry[:7], dropped=entry[7] if len(entry) > 7 else 0) + "\n")
+                if self.queue.empty():
+                    self.stream.flush()
+            except Exception as e:
+                sys.stderr.write(f"log writer error: {e}\n")
+
+    def stop(self):
+        """Write out everything queued, then end the thread"""
+        self.queue.put(None)
+        self._thread.join()
+        self.stream.flush()
+
+class EventLogger:
+    """logger.info("event_name", field=value, ...): an event name plus structured fields"""
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def _log(self, level: int, event: str, fields: dict, exc_info=None):
+        if level < LOG_LEVEL:
+            return
+        rate = SAMPLE_RATES.get(event)
+        if rate is not None and rate < 1.0 and random.random() >= rate:
+            return
+        writer = _writer
+        if writer is not None:
+            writer.put((time.time(), level, self.name, event, fields, rate, exc_info))
+
+    def debug(self, event: str, **fields):
+        self._log(DEBUG, event, fields)
+
+    def info(self, event: str, **fields):
+        self._log(INFO, event, fields)
+
+    def warning(self, event: str, **fields):
+        self._log(WARNING, event, fields)
+
+    def error(self, event: str, **fields):
+        self._log(ERROR, event, fields)
+
+    def exception(self, event: str, **fields):
+        """error() with the traceback of the exception being handled"""
+        self._log(ERROR, event, fields, exc_info=sys.exc_info())
+
+_configure_lock = threading.Lock()
+_writer = None
+
+def configure_logging(stream=None):
+    """Start the writer thread (idempotent)"""
+    global _writer
+    with _configure_lock:
+        if _writer is None:
+            _writer = LogWriter(stream)
+            atexit.register(flush_logging)
+
+def flush_logging():
+    """Write out everything queued and stop the writer thread"""
+    global _writer
+    with _configure_lock:
+        writer, _writer = _writer, None
+    if writer is not None:
+        writer.stop()
+
+def get_logger(name: str) -> EventLogger:
+    configure_logging()
+    return EventLogger(name)
@@ -0,0 +1,33 @@
+import os
+import sys
+import tempfile
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND)
+sys.path.insert(0, os.path.join(BACKEND, "benchmarks"))
+
+import fakes
+import structured_log
+
+# The writer thread outlives pytest's captured sys.stdout; give it the real one
+structured_log.configure_logging(sys.__stdout__)
+
+# Before any test module imports app code: modules bind MongoClient, boto3 clients etc. at import
+_main = fakes.install(fakes.Faults(latency_ms={}), tempfile.mkdtemp(prefix="gramvaani-tests-"))
+
+@pytest.fixture(scope="session")
+def app_main():
+    """main, imported with every external service replaced by the in-process fakes"""
+    return _main
+
+@pytest.fixture
+def auth_headers(app_main):
+    """Bearer headers for a freshly registered farmer"""
+    phone = f"9{uuid.uuid4().int % 10**9:09d}"
+    app_main.users_table.put_item(Item={"phone_number": phone, "name": "Test Farmer", "language": "en", "location": "Pune, Maharashtra"})
+    token = app_main.jwt.encode({"sub": phone, "exp": datetime.utcnow() + timedelta(hours=1)}, app_main.SECRET_KEY, algorithm=app_main.ALGORITHM)
+    return {"Authorization": f"Bearer {token}"}
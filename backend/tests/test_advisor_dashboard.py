@@ -0,0 +1,31 @@
+import threading
+
+from fastapi.testclient import TestClient
+
+def test_strategy_timeout_still_fills_the_cache(app_main, auth_headers, monkeypatch):
+    release = threading.Event()
+    calls = []
+
+    def slow_generate(bucket):
+        calls.append(bucket)
+        release.wait(5)
+        return [{"strategy_name": "Drip irrigation", "impact_level": "High", "difficulty": "Medium",
+                 "cost_effectiveness": "High", "badge": "Peak"}]
+
+    monkeypatch.setitem(app_main.ADVISOR_SECTION_TIMEOUTS, "optimization_strategies", 0.2)
+    monkeypatch.setattr(app_main.strategy_cache, "generate", slow_generate)
+
+    with TestClient(app_main.app) as client:
+        first = client.get("/api/advisor-dashboard", headers=auth_headers).json()
+        assert first["errors"].get("optimization_strategies") == "timeout"
+
+        release.set()  # the generation the timed-out section started keeps running
+        for _ in range(50):
+            if not app_main.strategy_cache._inflight:
+                break
+            client.get("/health/live")  # lets the app's event loop run the finishing task
+            threading.Event().wait(0.02)
+
+        second = client.get("/api/advisor-dashboard", headers=auth_headers).json()
+        assert second["sections"]["optimization_strategies"][0]["strategy_name"] == "Drip irrigation"
+    assert len(calls) == 1
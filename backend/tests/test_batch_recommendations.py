@@ -0,0 +1,39 @@
+import json
+from datetime import datetime, timedelta
+
+from fastapi.testclient import TestClient
+
+SOIL = {"nitrogen": 60, "phosphorus": 40, "potassium": 45, "temperature": 28, "humidity": 65, "ph": 6.8, "rainfall": 120}
+
+def token_for(app_main, user: dict) -> dict:
+    app_main.users_table.put_item(Item=user)
+    token = app_main.jwt.encode({"sub": user["phone_number"], "exp": datetime.utcnow() + timedelta(hours=1)},
+                                app_main.SECRET_KEY, algorithm=app_main.ALGORITHM)
+    return {"Authorization": f"Bearer {token}"}
+
+def test_rows_fail_alone_and_profiles_match_the_read_path(app_main):
+    app_main.crop_catalogue.collection.insert_one({"crop_name": "Soybean", "optimal_conditions": {"ph_min": 6, "ph_max": 7.5}})
+    app_main.crop_catalogue.refresh()
+    advisor = token_for(app_main, {"phone_number": "8100000001", "role": "advisor", "location": "Indore",
+                                   "linked_farmers": ["918100000002", "8100000003"]})
+    farmer = token_for(app_main, {"phone_number": "8100000002", "location": "Dewas, Madhya Pradesh", "language": "hi"})
+
+    rows = [
+        dict(SOIL, farmer_id=8100000001),      # the advisor's own, sent as a JSON number
+        dict(SOIL, farmer_id="918100000002"),  # linked farmer, registered without the 91 prefix
+        dict(SOIL, farmer_id="8100000003"),    # linked, but never registered
+        dict(SOIL, farmer_id="8100000009"),    # not linked
+        {"nitrogen": "lots"},                  # invalid
+        dict(SOIL),                            # scored only
+    ]
+    with TestClient(app_main.app) as client:
+        response = client.post("/api/batch-crop-recommendations", json={"profiles": rows}, headers=advisor)
+        assert response.status_code == 200
+        lines = [json.loads(line) for line in response.text.splitlines()]
+        assert [("error" in line) for line in lines] == [False, False, True, True, True, False]
+        assert lines[0]["recommendations"][0]["crop_name"] == "Soybean"
+
+        profile = client.get("/api/environmental-profile", headers=farmer).json()
+    assert profile["nitrogen"] == 60 and profile["soil_ph"] == 6.8
+    assert profile["location"] == "Dewas, Madhya Pradesh"  # signup default, set on insert
+    assert app_main.mongo_db.environmental_profiles.count_documents({"user_phone": "918100000002"}) == 0
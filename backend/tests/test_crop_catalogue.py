@@ -0,0 +1,53 @@
+import time
+
+import mongomock
+
+from crop_catalogue import CropCatalogue
+
+def test_refresh_picks_up_in_place_edits():
+    collection = mongomock.MongoClient().db.crop_recommendations
+    collection.insert_many([
+        {"crop_name": "Rice", "suitable_regions": ["Punjab"], "optimal_conditions": {"ph_min": 5.5, "ph_max": 7.0}},
+        {"crop_name": "Wheat", "suitable_regions": ["Haryana"], "optimal_conditions": {"ph_min": 6.0, "ph_max": 7.5}},
+    ])
+    catalogue = CropCatalogue(collection)
+    assert catalogue.refresh()
+    assert not catalogue.refresh()  # nothing changed: the snapshot is kept
+
+    # Same count, same newest _id, no updated_at: only the content differs
+    collection.update_one({"crop_name": "Rice"}, {"$set": {"optimal_conditions.ph_max": 6.5}})
+    assert catalogue.refresh()
+    rice = next(c for c in catalogue.snapshot.crops if c["crop_name"] == "Rice")
+    assert rice["optimal_conditions"]["ph_max"] == 6.5
+
+class BurstStream:
+    """Change stream stand-in: a burst of events, then a few idle polls, then closed"""
+
+    def __init__(self, events: int, idle_polls: int):
+        self.events = events
+        self.idle_polls = idle_polls
+        self.alive = True
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def try_next(self):
+        if self.events:
+            self.events -= 1
+            return {"operationType": "insert"}
+        self.idle_polls -= 1
+        self.alive = self.idle_polls > 0
+        time.sleep(0.02)
+        return None
+
+def test_watch_folds_a_burst_of_changes_into_one_reload():
+    collection = mongomock.MongoClient().db.crop_recommendations
+    collection.watch = lambda **kwargs: BurstStream(events=500, idle_polls=10)
+    catalogue = CropCatalogue(collection, debounce=0.05)
+    reloads = []
+    catalogue.refresh = lambda: reloads.append(time.monotonic())
+    catalogue._watch()
+    assert len(reloads) == 1
@@ -0,0 +1,28 @@
+import random
+
+import pytest
+
+from crop_scoring import CropScoringEngine, calculate_compatibility, score_batch
+from crop_scoring_bench import random_crop, random_params, reference_logging_off
+
+@pytest.mark.parametrize("seed", range(10))
+def test_engine_matches_reference_scorer(seed):
+    """Property: for random catalogues (missing bounds, bad values, empty conditions)
+    and soil parameters, engine scores and top-k order equal calculate_compatibility's"""
+    rng = random.Random(seed)
+    crops = [random_crop(rng, i) for i in range(200)]
+    engine = CropScoringEngine(crops)
+    for _ in range(20):
+        params = random_params(rng)
+        with reference_logging_off():
+            expected = [calculate_compatibility(params, crop) for crop in crops]
+        assert engine.score(params).tolist() == expected, f"score mismatch for {params}"
+
+        ranked = sorted(range(len(crops)), key=lambda i: expected[i], reverse=True)[:10]
+        assert [i for i, _ in engine.top_k(params, 10)] == ranked, f"top-k mismatch for {params}"
+
+def test_batch_scoring_matches_one_at_a_time():
+    rng = random.Random(99)
+    engine = CropScoringEngine([random_crop(rng, i) for i in range(300)])
+    rows = [random_params(rng) for _ in range(50)]
+    assert score_batch(engine, rows, 5) == [engine.top_k(params, 5) for params in rows]
@@ -0,0 +1,28 @@
+import asyncio
+import json
+
+from geocode_cache import ReverseGeocodeCache, geohash_center, geohash_encode
+
+def test_full_queue_answers_coarse_instead_of_waiting(tmp_path):
+    area = geohash_encode(20.0, 73.8, 5)  # one ~5 km cell around Nashik
+    cells = [area + suffix for suffix in ("00", "11", "22", "33", "44", "55", "66")]
+    path = tmp_path / "reverse_geocode_cache.json"
+    path.write_text(json.dumps({cells[0]: {"village": "Gangapur", "state_district": "Nashik", "state": "Maharashtra"}}))
+
+    fetched = []
+
+    def fetch(latitude, longitude):
+        fetched.append((latitude, longitude))
+        return {"village": "Somewhere", "state_district": "Nashik", "state": "Maharashtra"}
+
+    async def scenario():
+        cache = ReverseGeocodeCache(fetch, path=str(path), rate=5, max_queue=2)
+        started = asyncio.get_running_loop().time()
+        answers = await asyncio.gather(*(cache.lookup(*geohash_center(cell)) for cell in cells[1:]))
+        return answers, asyncio.get_running_loop().time() - started
+
+    answers, elapsed = asyncio.run(scenario())
+    # One call goes straight out, two wait for their slot, the rest are shed
+    assert len(fetched) == 3
+    assert answers.count({"state_district": "Nashik", "state": "Maharashtra"}) == 3
+    assert elapsed < 1.0
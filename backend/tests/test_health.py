@@ -0,0 +1,21 @@
+import time
+
+from fastapi.testclient import TestClient
+
+from crop_catalogue import CatalogueSnapshot
+
+def test_not_ready_until_the_crop_catalogue_has_loaded(app_main, monkeypatch):
+    app_main.crop_catalogue.collection.insert_one({"crop_name": "Ragi", "suitable_regions": ["Karnataka"]})
+    with TestClient(app_main.app) as client:
+        deadline = time.monotonic() + 5
+        while client.get("/health/ready").status_code != 200 and time.monotonic() < deadline:
+            time.sleep(0.05)
+        ready = client.get("/health/ready")
+        assert ready.status_code == 200
+        assert ready.json()["crop_catalogue"]["status"] == "loaded"
+
+        # As just after startup, before the background load has finished
+        monkeypatch.setattr(app_main.crop_catalogue, "_snapshot", CatalogueSnapshot([], None))
+        loading = client.get("/health/ready")
+        assert loading.status_code == 503
+        assert loading.json()["crop_catalogue"]["status"] == "loading"
@@ -0,0 +1,29 @@
+from decimal import Decimal
+
+from fastapi.testclient import TestClient
+
+from leaderboard import VillageLeaderboard
+
+def leaderboard_with(scores: dict) -> VillageLeaderboard:
+    board = VillageLeaderboard(table=None)
+    for village_id, score in scores.items():
+        board.update({"village_id": village_id, "trust_score": Decimal(str(score))})
+    return board
+
+def test_etag_follows_content_not_process_state(app_main, monkeypatch):
+    with TestClient(app_main.app) as client:
+        monkeypatch.setattr(app_main, "village_leaderboard", leaderboard_with({"a": 90, "b": 70}))
+        first = client.get("/api/village-leaderboard")
+        assert first.status_code == 200
+
+        # Another worker (or a restarted one) with a different ranking must not match
+        monkeypatch.setattr(app_main, "village_leaderboard", leaderboard_with({"a": 50, "b": 70}))
+        other = client.get("/api/village-leaderboard", headers={"If-None-Match": first.headers["etag"]})
+        assert other.status_code == 200
+        assert other.headers["etag"] != first.headers["etag"]
+
+        # ... while one holding the same ranking, built in a different order, does
+        monkeypatch.setattr(app_main, "village_leaderboard", leaderboard_with({"b": 70, "a": 90}))
+        same = client.get("/api/village-leaderboard", headers={"If-None-Match": first.headers["etag"]})
+        assert same.status_code == 304
+        assert same.headers["cache-control"] == "public, max-age=60"
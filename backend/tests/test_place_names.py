@@ -0,0 +1,56 @@
+import json
+import multiprocessing
+
+from place_names import PlaceNameMemory
+
+def _translate(names, language):
+    return {name: f"{name} ({language})" for name in names}
+
+def _worker(path, worker, count):
+    memory = PlaceNameMemory(_translate, path=path)
+    for i in range(count):
+        memory.lookup(f"village {worker}-{i}", "hi")
+        memory.fill_pending()
+
+def test_workers_saving_together_keep_every_translation(tmp_path):
+    path = str(tmp_path / "place_names.json")
+    workers = [multiprocessing.Process(target=_worker, args=(path, w, 40)) for w in range(4)]
+    for p in workers:
+        p.start()
+    for p in workers:
+        p.join()
+    assert [p.exitcode for p in workers] == [0] * 4
+    with open(path, encoding="utf-8") as f:
+        assert len(json.load(f)["hi"]) == 160
+    assert not list(tmp_path.glob("*.tmp"))
+
+def test_names_another_worker_translated_cost_no_call(tmp_path):
+    path = str(tmp_path / "place_names.json")
+    PlaceNameMemory(_translate, path=path).prefill(["Nashik"], ["hi"])
+
+    calls = []
+    memory = PlaceNameMemory(lambda names, language: calls.append(names) or {}, path=str(tmp_path / "empty.json"))
+    memory.path = path  # loaded before the other worker saved
+    assert memory.lookup("Nashik", "hi") == "Nashik"
+    memory.fill_pending()
+    assert calls == []
+    assert memory.lookup("Nashik", "hi") == "Nashik (hi)"
+
+def test_failed_translations_back_off():
+    calls = []
+    memory = PlaceNameMemory(lambda names, language: calls.append(names) or {"Wardha": 7}, path="/nonexistent/place_names.json")
+    memory.lookup("Wardha", "mr")
+    memory.fill_pending()
+    memory.lookup("Wardha", "mr")
+    assert not memory.has_pending()
+    assert len(calls) == 1
+
+def test_only_one_worker_prefills(app_main, monkeypatch):
+    from cache_backend import MemoryCache
+
+    prefills = []
+    monkeypatch.setattr(app_main, "cache_backend", MemoryCache())  # stands in for the workers' shared cache
+    monkeypatch.setattr(app_main.place_names, "prefill", lambda names, languages: prefills.append(names))
+    app_main.prefill_place_names()
+    app_main.prefill_place_names()  # a second worker starting up
+    assert len(prefills) == 1
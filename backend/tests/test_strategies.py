@@ -0,0 +1,32 @@
+import asyncio
+import threading
+import uuid
+
+from strategies import StrategyCache
+
+def test_cancelled_waiter_does_not_cancel_shared_generation():
+    release = threading.Event()
+    calls = []
+
+    def generate(bucket):
+        calls.append(bucket)
+        release.wait(5)
+        return [{"strategy_name": "Mulching"}]
+
+    async def scenario():
+        cache = StrategyCache(generate)
+        bucket = {"location": f"test-{uuid.uuid4()}"}
+        impatient = asyncio.create_task(asyncio.wait_for(cache.get(bucket), 0.05))
+        patient = asyncio.create_task(cache.get(bucket))
+        try:
+            await impatient
+            raise AssertionError("expected the impatient waiter to time out")
+        except asyncio.TimeoutError:
+            pass
+        release.set()
+        assert await patient == [{"strategy_name": "Mulching"}]
+        # filled the cache: served without generating again
+        assert await cache.get(bucket) == [{"strategy_name": "Mulching"}]
+
+    asyncio.run(scenario())
+    assert len(calls) == 1
@@ -4,11 +4,16 @@ import uuid
 import os
 from typing import Optional
 from fastapi import HTTPException
+from metrics import http_session, instrument_boto3, span
+from structured_log import get_logger
+
+log = get_logger("transcribe_service")
 
 class TranscribeService:
     def __init__(self):
-        self.s3_client = boto3.client("s3", region_name="ap-south-1")
-        self.transcribe_client = boto3.client("transcribe", region_name="ap-south-1")
+        self.s3_client = instrument_boto3(boto3.client("s3", region_name="ap-south-1"))
+        self.transcribe_client = instrument_boto3(boto3.client("transcribe", region_name="ap-south-1"))
+        self.http = http_session()
         self.bucket_name = os.getenv("AWS_S3_BUCKET")
         
         if not self.bucket_name:
@@ -53,8 +58,7 @@ class TranscribeService:
                 
                 if status == "COMPLETED":
                     transcript_uri = response["TranscriptionJob"]["Transcript"]["TranscriptFileUri"]
-                    import requests
-                    transcript_data = requests.get(transcript_uri).json()
+                    transcript_data = self.http.get(transcript_uri).json()
                     return transcript_data["results"]["transcripts"][0]["transcript"]
                 
                 elif status == "FAILED":
@@ -74,7 +78,7 @@ class TranscribeService:
         try:
             self.s3_client.delete_object(Bucket=self.bucket_name, Key=file_key)
         except Exception as e:
-            print(f"S3 cleanup failed: {e}")
+            log.error("s3_cleanup_error", error=e)
     
     async def transcribe_audio(self, file_bytes: bytes, file_extension: str, language: str = "hi") -> str:
         """Complete transcription workflow"""
@@ -95,10 +99,14 @@ class TranscribeService:
         file_key = None
         
         try:
-            s3_uri, file_key = self.upload_to_s3(file_bytes, file_extension)
-            self.start_transcription_job(job_name, s3_uri, language_code)
-            transcript = self.get_transcription_result(job_name)
+            with span("s3_upload"):
+                s3_uri, file_key = self.upload_to_s3(file_bytes, file_extension)
+            with span("transcribe_start"):
+                self.start_transcription_job(job_name, s3_uri, language_code)
+            with span("transcribe_wait"):
+                transcript = self.get_transcription_result(job_name)
             return transcript
         finally:
             if file_key:
-                self.cleanup_s3_file(file_key)
+                with span("s3_cleanup"):
+                    self.cleanup_s3_file(file_key)
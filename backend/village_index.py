@@ -0,0 +1,178 @@
+"""
+Village Index - offline nearest-village lookup over a local coordinate dataset
+Village centroids (CSV: village, district, state, latitude, longitude) are
+loaded into a KD-tree over unit-sphere points, so coordinates resolve to the
+nearest village without calling a geocoding service
+"""
+
+import csv
+import math
+import os
+from typing import Optional
+
+import numpy as np
+
+from structured_log import get_logger
+
+log = get_logger("village_index")
+
+VILLAGES_CSV_PATH = os.getenv("VILLAGES_CSV_PATH", "villages.csv")
+VILLAGE_MATCH_KM = float(os.getenv("VILLAGE_MATCH_KM", "5"))  # farther than this is "no nearby village"
+EARTH_RADIUS_KM = 6371.0
+LEAF_SIZE = 16
+# Accepted header spellings for each column
+COLUMN_ALIASES = {
+    "village": ("village", "village_name", "name"),
+    "district": ("district", "district_name"),
+    "state": ("state", "state_name"),
+    "latitude": ("latitude", "lat"),
+    "longitude": ("longitude", "lon", "lng"),
+}
+
+def unit_vectors(latitudes, longitudes) -> np.ndarray:
+    """(n, 3) points on the unit sphere; straight-line nearest == great-circle nearest"""
+    lat = np.radians(np.asarray(latitudes, dtype=np.float64))
+    lon = np.radians(np.asarray(longitudes, dtype=np.float64))
+    return np.column_stack((np.cos(lat) * np.cos(lon), np.cos(lat) * np.sin(lon), np.sin(lat)))
+
+def chord_to_km(chord: float) -> float:
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, chord / 2))
+
+def km_to_chord(km: float) -> float:
+    return 2 * math.sin(min(math.pi, km / EARTH_RADIUS_KM) / 2)
+
+class VillageKDTree:
+    """Immutable KD-tree; nodes are stored in flat lists indexed by node id"""
+
+    def __init__(self, villages: list, latitudes: list, longitudes: list, leaf_size: int = LEAF_SIZE):
+        self.villages = villages  # (village, district, state) per point
+        self.latitudes = latitudes
+        self.longitudes = longitudes
+        points = unit_vectors(latitudes, longitudes)
+        order = np.arange(len(villages))
+
+        # node -> split axis (-1 for a leaf), split value, left child, right child, start, end (into order)
+        self._axis, self._split, self._left, self._right, self._start, self._end = [], [], [], [], [], []
+        root = self._new_node(0, len(order))
+        stack = [root] if len(order) else []
+        while stack:
+            node = stack.pop()
+            start, end = self._start[node], self._end[node]
+            if end - start <= leaf_size:
+                continue
+            segment = points[order[start:end]]
+            axis = int(np.argmax(segment.max(axis=0) - segment.min(axis=0)))
+            middle = (end - start) // 2
+            part = np.argpartition(segment[:, axis], middle)
+            order[start:end] = order[start:end][part]
+            self._axis[node] = axis
+            self._split[node] = float(points[order[start + middle], axis])
+            self._left[node] = self._new_node(start, start + middle)
+            self._right[node] = self._new_node(start + middle, end)
+            stack.extend((self._left[node], self._right[node]))
+
+        self._order = order.tolist()
+        self._points = points.tolist()  # plain floats: faster than NumPy scalars in the query loop
+
+    def _new_node(self, start: int, end: int) -> int:
+        self._axis.append(-1)
+        self._split.append(0.0)
+        self._left.append(-1)
+        self._right.append(-1)
+        self._start.append(start)
+        self._end.append(end)
+        return len(self._axis) - 1
+
+    def __len__(self) -> int:
+        return len(self.villages)
+
+    def nearest(self, latitude: float, longitude: float, max_km: float = VILLAGE_MATCH_KM) -> Optional[dict]:
+        """Nearest village within max_km, or None"""
+        if not self.villages:
+            return None
+        lat, lon = math.radians(latitude), math.radians(longitude)
+        query = (math.cos(lat) * math.cos(lon), math.cos(lat) * math.sin(lon), math.sin(lat))
+        best_index = -1
+        best_d2 = km_to_chord(max_km) ** 2
+        stack = [(0, 0.0)]  # (node, lower bound on its squared distance)
+        while stack:
+            node, bound = stack.pop()
+            if bound >= best_d2:
+                continue
+            axis = self._axis[node]
+            if axis < 0:
+                for i in self._order[self._start[node]:self._end[node]]:
+                    p = self._points[i]
+                    d2 = (p[0] - query[0]) ** 2 + (p[1] - query[1]) ** 2 + (p[2] - query[2]) ** 2
+                    if d2 < best_d2:
+                        best_index, best_d2 = i, d2
+                continue
+            diff = query[axis] - self._split[node]
+            near, far = (self._left[node], self._right[node]) if diff < 0 else (self._right[node], self._left[node])
+            stack.append((far, diff * diff))
+            stack.append((near, bound))  # searched first, so `far` is usually pruned
+
+        if best_index < 0:
+            return None
+        village, district, state = self.villages[best_index]
+        return {
+            "village": village,
+            "district": district,
+            "state": state,
+            "latitude": self.latitudes[best_index],
+            "longitude": self.longitudes[best_index],
+            "distance_km": round(chord_to_km(math.sqrt(best_d2)), 3)
+        }
+
+def _column(header: list, name: str) -> Optional[int]:
+    lowered = [h.strip().lower() for h in header]
+    for alias in COLUMN_ALIASES[name]:
+        if alias in lowered:
+            return lowered.index(alias)
+    return None
+
+def load_villages_csv(path: str) -> VillageKDTree:
+    """Build the tree from a CSV with village, district, state, latitude and longitude columns"""
+    villages, latitudes, longitudes = [], [], []
+    with open(path, "r", encoding="utf-8-sig", newline="") as f:
+        reader = csv.reader(f)
+        header = next(reader)
+        columns = {name: _column(header, name) for name in COLUMN_ALIASES}
+        missing = [name for name in ("village", "latitude", "longitude") if columns[name] is None]
+        if missing:
+            raise ValueError(f"{path} has no {', '.join(missing)} column")
+        for row in reader:
+            try:
+                latitude = float(row[columns["latitude"]])
+                longitude = float(row[columns["longitude"]])
+            except (ValueError, IndexError):
+                continue
+            if not (-90 <= latitude <= 90 and -180 <= longitude <= 180):
+                continue
+            villages.append(tuple(
+                row[columns[name]].strip() if columns[name] is not None and columns[name] < len(row) else ""
+                for name in ("village", "district", "state")
+            ))
+            latitudes.append(latitude)
+            longitudes.append(longitude)
+    return VillageKDTree(villages, latitudes, longitudes)
+
+class VillageIndex:
+    """Holds the current tree; lookups return None until a dataset is loaded"""
+
+    def __init__(self, path: str = VILLAGES_CSV_PATH):
+        self.path = path
+        self.tree = None
+
+    def load(self):
+        """Build the tree from the dataset (blocking) and swap it in"""
+        if not os.path.exists(self.path):
+            log.warning("village_dataset_missing", path=self.path, fallback="nominatim")
+            return
+        tree = load_villages_csv(self.path)
+        self.tree = tree
+        log.info("village_index_loaded", villages=len(tree))
+
+    def nearest(self, latitude: float, longitude: float, max_km: float = VILLAGE_MATCH_KM) -> Optional[dict]:
+        tree = self.tree
+        return tree.nearest(latitude, longitude, max_km) if tree else None
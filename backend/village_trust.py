@@ -0,0 +1,101 @@
+"""
+Village Trust - atomic, coalesced trust counter updates
+Feedback from the same village inside a short window is folded into a single
+DynamoDB ADD; the score is derived from the counters, never read-modify-written
+"""
+
+import asyncio
+from datetime import datetime
+from decimal import Decimal
+from typing import Callable, Optional
+
+from botocore.exceptions import ClientError
+
+from structured_log import get_logger
+
+log = get_logger("village_trust")
+
+COALESCE_WINDOW = 2.0  # seconds
+
+def compute_trust_score(total: int, helpful_count: int) -> float:
+    """Percentage of helpful responses, rounded like the stored score"""
+    return round((helpful_count / total) * 100, 2) if total > 0 else 0
+
+def with_trust_score(item: dict) -> dict:
+    """Recompute trust_score from the counters on read"""
+    total = int(item.get("total_responses", 0))
+    helpful_count = int(item.get("helpful_count", 0))
+    item["trust_score"] = compute_trust_score(total, helpful_count)
+    return item
+
+class VillageTrustUpdater:
+    def __init__(self, table, window: float = COALESCE_WINDOW, on_update: Optional[Callable[[dict], None]] = None):
+        self.table = table
+        self.window = window
+        self.on_update = on_update
+        self._pending = {}  # village_id -> [total, helpful]
+        self._tasks = set()  # running flushes; the loop only keeps weak references to tasks
+
+    def record(self, village_id: str, helpful: bool):
+        """Queue one feedback; the first one in a window schedules the flush"""
+        counts = self._pending.get(village_id)
+        if counts is None:
+            self._pending[village_id] = [1, 1 if helpful else 0]
+            loop = asyncio.get_running_loop()
+            loop.call_later(self.window, self._start_flush, village_id)
+        else:
+            counts[0] += 1
+            counts[1] += 1 if helpful else 0
+
+    def _start_flush(self, village_id: str):
+        task = asyncio.create_task(self._flush_village(village_id))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def flush_all(self):
+        """Write every pending village now and wait for flushes already running (used on shutdown)"""
+        flushes = [self._flush_village(v) for v in list(self._pending)] + list(self._tasks)
+        await asyncio.gather(*flushes, return_exceptions=True)
+
+    async def _flush_village(self, village_id: str):
+        counts = self._pending.pop(village_id, None)
+        if not counts:
+            return
+        try:
+            await asyncio.to_thread(self.apply, village_id, counts[0], counts[1])
+        except Exception as e:
+            log.error("village_trust_update_error", error=e)
+
+    def apply(self, village_id: str, total: int, helpful_count: int) -> dict:
+        """Atomically add to the counters, then store the score if nobody raced us"""
+        response = self.table.update_item(
+            Key={"village_id": village_id},
+            UpdateExpression="ADD total_responses :t, helpful_count :h SET last_updated = :now",
+            ExpressionAttributeValues={
+                ":t": total,
+                ":h": helpful_count,
+                ":now": datetime.utcnow().isoformat()
+            },
+            ReturnValues="ALL_NEW"
+        )
+        item = with_trust_score(response["Attributes"])
+
+        # Only the writer that produced these counters stores the score; a newer writer will overwrite it
+        try:
+            self.table.update_item(
+                Key={"village_id": village_id},
+                UpdateExpression="SET trust_score = :s",
+                ConditionExpression="total_responses = :t AND helpful_count = :h",
+                ExpressionAttributeValues={
+                    ":s": Decimal(str(item["trust_score"])),
+                    ":t": item["total_responses"],
+                    ":h": item["helpful_count"]
+                }
+            )
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") != "ConditionalCheckFailedException":
+                raise
+
+        if self.on_update:
+            self.on_update(item)
+        return item
@@ -41,31 +41,33 @@ function Advisor({ user, onLogout, onNavigate, onOpenVoiceAssistant }) {
 
   useEffect(() => {
     fetchAdvisorData()
-    fetchNews()
   }, [])
 
   const fetchAdvisorData = async () => {
+    setLoadingNews(true)
     try {
       const token = localStorage.getItem('token')
       
-      // Fetch weather
-      const weatherRes = await axios.get('http://localhost:8000/api/weather', {
+      // One round-trip for every Advisor section; sections that time out are simply missing
+      const res = await axios.get('http://localhost:8000/api/advisor-dashboard', {
         headers: { Authorization: `Bearer ${token}` }
       })
+      const { sections, errors } = res.data
+      if (Object.keys(errors).length) {
+        console.warn('Advisor sections unavailable:', errors)
+      }
+      
+      const weatherData = sections.weather_info || { temperature: 28, humidity: 65, rainfall: 0, condition: 'partly cloudy' }
       setWeather({
         location: user?.location?.split(',')[0] || t('yourLocation'),
-        temperature: weatherRes.data.temperature,
-        humidity: weatherRes.data.humidity,
-        rainfall: weatherRes.data.rainfall || t('none'),
-        description: weatherRes.data.condition,
-        hasRain: weatherRes.data.rainfall > 0
+        temperature: weatherData.temperature,
+        humidity: weatherData.humidity,
+        rainfall: weatherData.rainfall || t('none'),
+        description: weatherData.condition,
+        hasRain: weatherData.rainfall > 0
       })
       
-      // Fetch crops
-      const cropsRes = await axios.get('http://localhost:8000/api/crop-recommendations', {
-        headers: { Authorization: `Bearer ${token}` }
-      })
-      const cropsData = cropsRes.data.map(crop => ({
+      const cropsData = (sections.crop_recommendations || []).map(crop => ({
         name: crop.crop_name,
         explanation: crop.climate_match,
         water_requirement: crop.water_requirement,
@@ -73,11 +75,7 @@ function Advisor({ user, onLogout, onNavigate, onOpenVoiceAssistant }) {
       }))
       setCrops(cropsData)
       
-      // Fetch strategies
-      const stratRes = await axios.get('http://localhost:8000/api/optimization-strategies', {
-        headers: { Authorization: `Bearer ${token}` }
-      })
-      const stratData = stratRes.data.map((s, idx) => {
+      const stratData = (sections.optimization_strategies || []).map((s, idx) => {
         const icons = ['💧', '🌱', '🚜', '📊', '🌾', '⚡']
         return {
           icon: icons[idx % icons.length],
@@ -89,6 +87,15 @@ function Advisor({ user, onLogout, onNavigate, onOpenVoiceAssistant }) {
       })
       setStrategies(stratData)
       
+      const newsData = (sections.agriculture_news || []).map(n => ({
+        title: n.title,
+        summary: n.summary,
+        source: n.source,
+        url: n.link,
+        image: n.image || `https://source.unsplash.com/400x200/?agriculture,farming,${encodeURIComponent(n.title.split(' ')[0])}`
+      }))
+      setNews(newsData)
+      
     } catch (err) {
       console.error('Advisor data error:', err)
       setWeather({
@@ -101,6 +108,7 @@ function Advisor({ user, onLogout, onNavigate, onOpenVoiceAssistant }) {
       })
     } finally {
       setLoading(false)
+      setLoadingNews(false)
     }
   }
 
@@ -108,28 +116,6 @@ function Advisor({ user, onLogout, onNavigate, onOpenVoiceAssistant }) {
   const displayedStrategies = showAllStrategies ? strategies : strategies.slice(0, 3)
   const displayedNews = showAllNews ? news : news.slice(0, 3)
 
-  const fetchNews = async () => {
-    setLoadingNews(true)
-    try {
-      const token = localStorage.getItem('token')
-      const response = await axios.get('http://localhost:8000/api/agriculture-news', {
-        headers: { Authorization: `Bearer ${token}` }
-      })
-      const newsData = response.data.map(n => ({
-        title: n.title,
-        summary: n.summary,
-        source: n.source,
-        url: n.link,
-        image: n.image || `https://source.unsplash.com/400x200/?agriculture,farming,${encodeURIComponent(n.title.split(' ')[0])}`
-      }))
-      setNews(newsData)
-    } catch (err) {
-      console.error('News fetch error:', err)
-    } finally {
-      setLoadingNews(false)
-    }
-  }
-
   if (loading) {
     return (
       <div className="advisor-container">
@@ -11,6 +11,9 @@ import Navbar from './Navbar'
 import { API_URL } from './config'
 import { getTranslation } from './translations'
 
+// Connection type (slow-2g/2g/3g/4g) so the server can pick a smaller audio format on slow links
+const audioProfile = () => navigator.connection?.effectiveType || ''
+
 function App() {
   const [showLanding, setShowLanding] = useState(true)
   const [isAuthenticated, setIsAuthenticated] = useState(false)
@@ -160,7 +163,8 @@ function App() {
           const token = localStorage.getItem('token')
           const res = await axios.post(`${API_URL}/process-text`, {
             text: response.transcript,
-            language: uiLanguage
+            language: uiLanguage,
+            audio_profile: audioProfile()
           }, {
             headers: { 
               'Content-Type': 'application/json',
@@ -172,10 +176,8 @@ function App() {
             response_text: res.data.response_text || res.data,
             query_id: res.data.query_id
           })
-          if (res.data.audio_data) {
-            const audioBlob = new Blob([Uint8Array.from(atob(res.data.audio_data), c => c.charCodeAt(0))], { type: 'audio/wav' })
-            const audioUrl = URL.createObjectURL(audioBlob)
-            setAudioUrl(audioUrl)
+          if (res.data.audio_url) {
+            setAudioUrl(`${API_URL}${res.data.audio_url}`)
           }
         } catch (err) {
           console.error('Error regenerating response:', err)
@@ -286,7 +288,7 @@ function App() {
 
       console.log('Sending audio with language:', language)
       
-      const response = await axios.post(`${API_URL}/process-audio?language=${language}`, formData, {
+      const response = await axios.post(`${API_URL}/process-audio?language=${language}&audio_profile=${audioProfile()}`, formData, {
         headers: { 
           'Content-Type': 'multipart/form-data',
           'Authorization': `Bearer ${token}`
@@ -299,10 +301,8 @@ function App() {
       })
       setCurrentQueryId(response.data.query_id)
       setTimeout(() => setShowFeedbackModal(true), 2000)
-      if (response.data.audio_data) {
-        const audioBlob = new Blob([Uint8Array.from(atob(response.data.audio_data), c => c.charCodeAt(0))], { type: 'audio/wav' })
-        const audioUrl = URL.createObjectURL(audioBlob)
-        setAudioUrl(audioUrl)
+      if (response.data.audio_url) {
+        setAudioUrl(`${API_URL}${response.data.audio_url}`)
       }
     } catch (err) {
       const errorMessage = err.response?.data?.detail || 'Failed to process audio'
@@ -326,7 +326,8 @@ function App() {
       const token = localStorage.getItem('token')
       const response = await axios.post(`${API_URL}/process-text`, {
         text: textInput.trim(),
-        language
+        language,
+        audio_profile: audioProfile()
       }, {
         headers: { 
           'Content-Type': 'application/json',
@@ -340,10 +341,8 @@ function App() {
       })
       setCurrentQueryId(response.data.query_id)
       setTimeout(() => setShowFeedbackModal(true), 2000)
-      if (response.data.audio_data) {
-        const audioBlob = new Blob([Uint8Array.from(atob(response.data.audio_data), c => c.charCodeAt(0))], { type: 'audio/wav' })
-        const audioUrl = URL.createObjectURL(audioBlob)
-        setAudioUrl(audioUrl)
+      if (response.data.audio_url) {
+        setAudioUrl(`${API_URL}${response.data.audio_url}`)
       }
     } catch (err) {
       const errorMessage = err.response?.data?.detail || 'Failed to process text. Please try again.'
@@ -433,7 +432,8 @@ function App() {
       const token = localStorage.getItem('token')
       const res = await axios.post(`${API_URL}/api/weather`, { 
         city: 'current',
-        language 
+        language,
+        audio_profile: audioProfile()
       }, {
         headers: { 'Authorization': `Bearer ${token}` }
       })
@@ -443,10 +443,8 @@ function App() {
         response_text: res.data.text 
       })
       
-      if (res.data.audio_data) {
-        const audioBlob = new Blob([Uint8Array.from(atob(res.data.audio_data), c => c.charCodeAt(0))], { type: 'audio/wav' })
-        const audioUrl = URL.createObjectURL(audioBlob)
-        setAudioUrl(audioUrl)
+      if (res.data.audio_url) {
+        setAudioUrl(`${API_URL}${res.data.audio_url}`)
       }
     } catch (err) {
       setError('Unable to fetch weather information for your location.')
@@ -466,7 +464,8 @@ function App() {
         const token = localStorage.getItem('token')
         const res = await axios.post(`${API_URL}/api/crop-prices`, { 
           crop: cropName,
-          language 
+          language,
+          audio_profile: audioProfile()
         }, {
           headers: { 'Authorization': `Bearer ${token}` }
         })
@@ -476,10 +475,8 @@ function App() {
           response_text: res.data.text 
         })
         
-        if (res.data.audio_data) {
-          const audioBlob = new Blob([Uint8Array.from(atob(res.data.audio_data), c => c.charCodeAt(0))], { type: 'audio/wav' })
-          const audioUrl = URL.createObjectURL(audioBlob)
-          setAudioUrl(audioUrl)
+        if (res.data.audio_url) {
+          setAudioUrl(`${API_URL}${res.data.audio_url}`)
         }
       } catch (err) {
         setError(`Unable to fetch ${cropName} prices for your area.`)
@@ -504,27 +501,26 @@ function App() {
       const token = localStorage.getItem('token')
       let res
       if (modalType === 'weather') {
-        res = await axios.post(`${API_URL}/api/weather`, { city: modalInput, language }, {
+        res = await axios.post(`${API_URL}/api/weather`, { city: modalInput, language, audio_profile: audioProfile() }, {
           headers: { 'Authorization': `Bearer ${token}` }
         })
       } else if (modalType === 'crop') {
         res = await axios.post(`${API_URL}/api/crop-prices`, { 
           crop: modalInput, 
           market: modalLocation || undefined,
-          language 
+          language,
+          audio_profile: audioProfile()
         }, {
           headers: { 'Authorization': `Bearer ${token}` }
         })
       } else if (modalType === 'schemes') {
-        res = await axios.post(`${API_URL}/api/gov-schemes`, { topic: modalInput, language }, {
+        res = await axios.post(`${API_URL}/api/gov-schemes`, { topic: modalInput, language, audio_profile: audioProfile() }, {
           headers: { 'Authorization': `Bearer ${token}` }
         })
       }
       setResponse({ transcript: modalInput, response_text: res.data.text })
-      if (res.data.audio_data) {
-        const audioBlob = new Blob([Uint8Array.from(atob(res.data.audio_data), c => c.charCodeAt(0))], { type: 'audio/wav' })
-        const audioUrl = URL.createObjectURL(audioBlob)
-        setAudioUrl(audioUrl)
+      if (res.data.audio_url) {
+        setAudioUrl(`${API_URL}${res.data.audio_url}`)
       }
     } catch {
       setError(`Unable to fetch ${modalType} information.`)
@@ -187,7 +187,7 @@ const CropCalendar = ({ language = 'en' }) => {
   const fetchCalendar = async () => {
     try {
       const token = localStorage.getItem('token');
-      const response = await axios.get(`http://localhost:8000/api/crop-calendar?language=${language}&t=${Date.now()}`, {
+      const response = await axios.get(`http://localhost:8000/api/crop-calendar?language=${language}`, {
         headers: { Authorization: `Bearer ${token}` }
       });
       console.log('Calendar data received:', response.data);